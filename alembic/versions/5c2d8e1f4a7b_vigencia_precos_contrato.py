@@ -0,0 +1,72 @@
+"""vigencia dos precos de contrato
+
+Revision ID: 5c2d8e1f4a7b
+Revises: 9e90f77d4d8c
+Create Date: 2026-10-17 10:12:03.418220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2d8e1f4a7b'
+down_revision: Union[str, None] = '9e90f77d4d8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Preços existentes passam a valer "desde sempre" (VIGENCIA_INICIAL).
+    # batch_alter_table: no SQLite, trocar a constraint única recria a tabela.
+    with op.batch_alter_table('contrato_hh_precos') as batch_op:
+        batch_op.add_column(sa.Column('valido_de', sa.Date(), nullable=False, server_default='1900-01-01'))
+        batch_op.add_column(sa.Column('valido_ate', sa.Date(), nullable=True))
+        batch_op.drop_constraint('uq_contrato_maquina_tipo', type_='unique')
+        batch_op.create_unique_constraint(
+            'uq_contrato_maquina_tipo_vigencia', ['contrato_id', 'maquina_id', 'tipo_hh', 'valido_de']
+        )
+    with op.batch_alter_table('contrato_hh_precos') as batch_op:
+        batch_op.alter_column('valido_de', server_default=None)
+
+    with op.batch_alter_table('contrato_material_precos') as batch_op:
+        batch_op.add_column(sa.Column('valido_de', sa.Date(), nullable=False, server_default='1900-01-01'))
+        batch_op.add_column(sa.Column('valido_ate', sa.Date(), nullable=True))
+        batch_op.drop_constraint('uq_contrato_material', type_='unique')
+        batch_op.create_unique_constraint(
+            'uq_contrato_material_vigencia', ['contrato_id', 'material_id', 'valido_de']
+        )
+    with op.batch_alter_table('contrato_material_precos') as batch_op:
+        batch_op.alter_column('valido_de', server_default=None)
+
+
+def downgrade() -> None:
+    # Mantém só o registro mais recente de cada chave antes de voltar à chave sem data.
+    op.execute(
+        "DELETE FROM contrato_hh_precos WHERE EXISTS ("
+        " SELECT 1 FROM contrato_hh_precos p"
+        " WHERE p.contrato_id = contrato_hh_precos.contrato_id"
+        " AND p.maquina_id = contrato_hh_precos.maquina_id"
+        " AND p.tipo_hh = contrato_hh_precos.tipo_hh"
+        " AND p.valido_de > contrato_hh_precos.valido_de)"
+    )
+    op.execute(
+        "DELETE FROM contrato_material_precos WHERE EXISTS ("
+        " SELECT 1 FROM contrato_material_precos p"
+        " WHERE p.contrato_id = contrato_material_precos.contrato_id"
+        " AND p.material_id = contrato_material_precos.material_id"
+        " AND p.valido_de > contrato_material_precos.valido_de)"
+    )
+    with op.batch_alter_table('contrato_material_precos') as batch_op:
+        batch_op.drop_constraint('uq_contrato_material_vigencia', type_='unique')
+        batch_op.create_unique_constraint('uq_contrato_material', ['contrato_id', 'material_id'])
+        batch_op.drop_column('valido_ate')
+        batch_op.drop_column('valido_de')
+
+    with op.batch_alter_table('contrato_hh_precos') as batch_op:
+        batch_op.drop_constraint('uq_contrato_maquina_tipo_vigencia', type_='unique')
+        batch_op.create_unique_constraint('uq_contrato_maquina_tipo', ['contrato_id', 'maquina_id', 'tipo_hh'])
+        batch_op.drop_column('valido_ate')
+        batch_op.drop_column('valido_de')
@@ -8,7 +8,7 @@ from app.deps.pagination import get_pagination
 
 from typing import List
 from app.schemas.user import UserOut
-from app.deps.db import get_db
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
 from app.schemas.user import (
     LoginInput, TokenPair, UserCreate, UserOut, UserUpdateSelf,
@@ -16,7 +16,7 @@ from app.schemas.user import (
 
 from app.deps.auth import bearer_scheme, get_current_user
 from app.repositories import user as repo
-from app.core.security import verify_password, create_access_token, create_refresh_token, decode_token
+from app.core.security import verify_password_async, create_access_token, create_refresh_token, decode_token
 
 router = APIRouter()
 
@@ -53,11 +53,12 @@ async def refresh(authorization: str | None = Header(default=None)):
 @router.patch("/users/me", response_model=UserOut, dependencies=[])
 async def update_me(
     payload: UserUpdateSelf,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
     current = Depends(get_current_user),
 ):
+    user = await repo.get_by_id(db, current.id)  # current é snapshot (cache)
     try:
-        updated = await repo.update_self(db, current, payload)
+        updated = await repo.update_self(db, user, payload)
         return updated
     except ValueError as e:
         if str(e) == "email_taken":
@@ -67,12 +68,13 @@ async def update_me(
 @router.patch("/users/me/password")
 async def change_my_password(
     payload: PasswordChangeSelf,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
     current = Depends(get_current_user),
 ):
-    if not verify_password(payload.current_password, current.hashed_password):
+    user = await repo.get_by_id(db, current.id)  # current é snapshot (cache)
+    if not await verify_password_async(payload.current_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Senha atual incorreta")
-    await repo.set_password(db, current, payload.new_password)
+    await repo.set_password(db, user, payload.new_password)
     return {
         "detail": f"Senha alterada com sucesso, {current.full_name}.",
         "user": {"id": current.id, "full_name": current.full_name, "email": current.email},
@@ -81,7 +83,7 @@ async def change_my_password(
 @router.post("/users", response_model=UserOut, status_code=201)
 async def create_user(
     payload: UserCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
     credentials: HTTPAuthorizationCredentials | None = Security(bearer_scheme),
 ):
     """
@@ -123,8 +125,8 @@ async def list_users(
     pagination = Depends(get_pagination),
     db: AsyncSession = Depends(get_db),
 ):
-    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit)
-    meta = {"page": pagination.page, "size": pagination.size, "count": len(items)}
+    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit, after=pagination.cursor)
+    meta = pagination.meta(items, repo.ORDEM)
     return ok(data=[
         {
             "id": u.id,
@@ -141,7 +143,7 @@ async def list_users(
 async def admin_update_user(
     user_id: int,
     payload: UserUpdateAdmin,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     user = await repo.get_by_id(db, user_id)
     if not user:
@@ -160,7 +162,7 @@ async def admin_update_user(
 async def admin_set_password(
     user_id: int,
     payload: PasswordSetAdmin,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     user = await repo.get_by_id(db, user_id)
     if not user:
@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.api import ok
 from app.deps.pagination import get_pagination
 
-from app.deps.db import get_db
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
 from app.schemas.cliente import ClienteCreate, ClienteOut, ClienteUpdate
 from app.repositories import cliente as repo
@@ -18,7 +18,7 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(require_roles("ADMIN", "OPERACAO"))],
 )
-async def create_cliente(payload: ClienteCreate, db: AsyncSession = Depends(get_db)):
+async def create_cliente(payload: ClienteCreate, db: AsyncSession = Depends(get_uow)):
     return await repo.create(db, payload)
 
 @router.get("/clientes", response_model=None)  # removemos o response_model para não “brigar” com o envelope
@@ -28,8 +28,8 @@ async def list_clientes(
     db: AsyncSession = Depends(get_db),
     user = Depends(get_current_user),
 ):
-    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit)
-    meta = {"page": pagination.page, "size": pagination.size, "count": len(items)}
+    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit, after=pagination.cursor)
+    meta = pagination.meta(items, repo.ORDEM)
     return ok(data=[  # convertemos para dict simples (Pydantic model -> dict) via from_attributes já funciona, mas aqui garantimos
         {
             "id": i.id,
@@ -60,7 +60,7 @@ async def get_cliente(
 async def update_cliente(
     cliente_id: int,
     payload: ClienteUpdate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.update(db, cliente_id, payload)
     if not obj:
@@ -74,7 +74,7 @@ async def update_cliente(
 )
 async def delete_cliente(
     cliente_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     ok = await repo.delete(db, cliente_id)
     if not ok:
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.deps.db import get_db
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
 from app.deps.pagination import get_pagination
 from app.core.api import ok, created
 from app.repositories import contrato_hh_preco as repo
+from app.repositories import contrato as repo_contrato
+from app.services.importacao import ler_registros, resposta_importacao
 from app.schemas.contrato_hh_preco import (
     ContratoHHPrecoCreate, ContratoHHPrecoUpdate, ContratoHHPrecoOut
 )
@@ -22,7 +24,7 @@ async def create_contrato_hh_preco(
     contrato_id: int,
     payload: ContratoHHPrecoCreate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     # Garante que usaremos o contrato_id da rota (ignora o que vier no body)
     data = ContratoHHPrecoCreate(
@@ -31,6 +33,8 @@ async def create_contrato_hh_preco(
         tipo_hh=payload.tipo_hh,
         uom_id=payload.uom_id,
         preco_hora=payload.preco_hora,
+        valido_de=payload.valido_de,
+        valido_ate=payload.valido_ate,
     )
     obj = await repo.create(db, data)
     out = {
@@ -40,11 +44,40 @@ async def create_contrato_hh_preco(
         "tipo_hh": obj.tipo_hh,
         "uom_id": obj.uom_id,
         "preco_hora": float(obj.preco_hora),
+        "valido_de": obj.valido_de.isoformat(),
+        "valido_ate": obj.valido_ate.isoformat() if obj.valido_ate else None,
         "created_at": obj.created_at.isoformat() if obj.created_at else None,
         "updated_at": obj.updated_at.isoformat() if obj.updated_at else None,
     }
     return created(data=out, message="Preço de HH por máquina criado com sucesso.", request=request)
 
+# IMPORT (CSV em streaming; upsert por máquina + tipo_hh)
+@router.post(
+    "/contratos/{contrato_id}/hh-precos:import",
+    response_model=None,
+    dependencies=[Depends(require_roles("ADMIN", "OPERACAO"))],
+)
+async def import_contrato_hh_precos(
+    contrato_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_uow),
+    atomico: bool = Query(False, description="Se true, qualquer linha inválida cancela a importação inteira."),
+):
+    """
+    Corpo: o CSV cru (Content-Type: text/csv), lido em streaming, ex.:
+        maquina,tipo_hh,preco_hora,uom
+        Torno CNC,REGULAR,120.50,h
+    Aceita maquina_id/uom_id no lugar de nome/símbolo e ";" como separador.
+    Colunas opcionais valido_de/valido_ate (AAAA-MM-DD ou DD/MM/AAAA).
+    Linha existente (mesma máquina + tipo_hh + valido_de) tem preço, UoM e
+    valido_ate atualizados; outro valido_de cria uma nova vigência.
+    """
+    if not await repo_contrato.get(db, contrato_id):
+        raise HTTPException(status_code=404, detail="Contrato não encontrado")
+    registros = ler_registros(request.headers.get("content-type"), request.stream())
+    res = await repo.importar(db, contrato_id, registros, atomico=atomico)
+    return resposta_importacao(res, "Tabela de HH importada.", request=request)
+
 # LIST (sempre por contrato; filtros opcionais)
 @router.get("/contratos/{contrato_id}/hh-precos", response_model=None)
 async def list_contrato_hh_precos(
@@ -62,9 +95,10 @@ async def list_contrato_hh_precos(
         limit=pagination.limit,
         contrato_id=contrato_id,
         maquina_id=maquina_id,
-        tipo_hh=tipo_hh
+        tipo_hh=tipo_hh,
+        after=pagination.cursor,
     )
-    meta = {"page": pagination.page, "size": pagination.size, "count": len(items)}
+    meta = pagination.meta(items, repo.ORDEM)
     data = [
         {
             "id": i.id,
@@ -73,6 +107,8 @@ async def list_contrato_hh_precos(
             "tipo_hh": i.tipo_hh,
             "uom_id": i.uom_id,
             "preco_hora": float(i.preco_hora),
+            "valido_de": i.valido_de.isoformat(),
+            "valido_ate": i.valido_ate.isoformat() if i.valido_ate else None,
             "created_at": i.created_at.isoformat() if i.created_at else None,
             "updated_at": i.updated_at.isoformat() if i.updated_at else None,
         } for i in items
@@ -103,7 +139,7 @@ async def update_contrato_hh_preco(
     preco_id: int,
     payload: ContratoHHPrecoUpdate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.get(db, preco_id)
     if not obj or obj.contrato_id != contrato_id:
@@ -116,6 +152,8 @@ async def update_contrato_hh_preco(
         "tipo_hh": obj.tipo_hh,
         "uom_id": obj.uom_id,
         "preco_hora": float(obj.preco_hora),
+        "valido_de": obj.valido_de.isoformat(),
+        "valido_ate": obj.valido_ate.isoformat() if obj.valido_ate else None,
         "created_at": obj.created_at.isoformat() if obj.created_at else None,
         "updated_at": obj.updated_at.isoformat() if obj.updated_at else None,
     }
@@ -132,7 +170,7 @@ async def delete_contrato_hh_preco(
     contrato_id: int,
     preco_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.get(db, preco_id)
     if not obj or obj.contrato_id != contrato_id:
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.deps.db import get_db
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
 from app.deps.pagination import get_pagination
 from app.core.api import ok, created
 from app.repositories import contrato_material_preco as repo
+from app.repositories import contrato as repo_contrato
+from app.services.importacao import ler_registros, resposta_importacao
 from app.schemas.contrato_material_preco import (
     ContratoMaterialPrecoCreate, ContratoMaterialPrecoUpdate, ContratoMaterialPrecoOut
 )
@@ -21,13 +23,15 @@ async def create_contrato_material_preco(
     contrato_id: int,
     payload: ContratoMaterialPrecoCreate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     data = ContratoMaterialPrecoCreate(
         contrato_id=contrato_id,
         material_id=payload.material_id,
         uom_id=payload.uom_id,
         preco_unitario=payload.preco_unitario,
+        valido_de=payload.valido_de,
+        valido_ate=payload.valido_ate,
     )
     obj = await repo.create(db, data)
     out = {
@@ -36,11 +40,39 @@ async def create_contrato_material_preco(
         "material_id": obj.material_id,
         "uom_id": obj.uom_id,
         "preco_unitario": float(obj.preco_unitario),
+        "valido_de": obj.valido_de.isoformat(),
+        "valido_ate": obj.valido_ate.isoformat() if obj.valido_ate else None,
         "created_at": obj.created_at.isoformat() if obj.created_at else None,
         "updated_at": obj.updated_at.isoformat() if obj.updated_at else None,
     }
     return created(data=out, message="Preço de material do contrato criado com sucesso.", request=request)
 
+@router.post(
+    "/contratos/{contrato_id}/material-precos:import",
+    response_model=None,
+    dependencies=[Depends(require_roles("ADMIN", "OPERACAO"))],
+)
+async def import_contrato_material_precos(
+    contrato_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_uow),
+    atomico: bool = Query(False, description="Se true, qualquer linha inválida cancela a importação inteira."),
+):
+    """
+    Corpo cru em streaming: CSV (text/csv) ou NDJSON (application/x-ndjson).
+    CSV:    material,preco_unitario,uom
+            Aço 1045,12.80,kg
+    NDJSON: {"material_id": 7, "preco_unitario": 12.8, "valido_de": "2026-01-01"}
+    Campos opcionais valido_de/valido_ate (AAAA-MM-DD ou DD/MM/AAAA).
+    Material existente com o mesmo valido_de tem preço, UoM e valido_ate
+    atualizados; outro valido_de cria uma nova vigência.
+    """
+    if not await repo_contrato.get(db, contrato_id):
+        raise HTTPException(status_code=404, detail="Contrato não encontrado")
+    registros = ler_registros(request.headers.get("content-type"), request.stream(), formatos=("csv", "ndjson"))
+    res = await repo.importar(db, contrato_id, registros, atomico=atomico)
+    return resposta_importacao(res, "Tabela de materiais importada.", request=request)
+
 @router.get("/contratos/{contrato_id}/material-precos", response_model=None)
 async def list_contrato_material_precos(
     contrato_id: int,
@@ -55,9 +87,10 @@ async def list_contrato_material_precos(
         skip=pagination.skip,
         limit=pagination.limit,
         contrato_id=contrato_id,
-        material_id=material_id
+        material_id=material_id,
+        after=pagination.cursor,
     )
-    meta = {"page": pagination.page, "size": pagination.size, "count": len(items)}
+    meta = pagination.meta(items, repo.ORDEM)
     data = [
         {
             "id": i.id,
@@ -65,6 +98,8 @@ async def list_contrato_material_precos(
             "material_id": i.material_id,
             "uom_id": i.uom_id,
             "preco_unitario": float(i.preco_unitario),
+            "valido_de": i.valido_de.isoformat(),
+            "valido_ate": i.valido_ate.isoformat() if i.valido_ate else None,
             "created_at": i.created_at.isoformat() if i.created_at else None,
             "updated_at": i.updated_at.isoformat() if i.updated_at else None,
         } for i in items
@@ -93,7 +128,7 @@ async def update_contrato_material_preco(
     preco_id: int,
     payload: ContratoMaterialPrecoUpdate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.get(db, preco_id)
     if not obj or obj.contrato_id != contrato_id:
@@ -105,6 +140,8 @@ async def update_contrato_material_preco(
         "material_id": obj.material_id,
         "uom_id": obj.uom_id,
         "preco_unitario": float(obj.preco_unitario),
+        "valido_de": obj.valido_de.isoformat(),
+        "valido_ate": obj.valido_ate.isoformat() if obj.valido_ate else None,
         "created_at": obj.created_at.isoformat() if obj.created_at else None,
         "updated_at": obj.updated_at.isoformat() if obj.updated_at else None,
     }
@@ -120,7 +157,7 @@ async def delete_contrato_material_preco(
     contrato_id: int,
     preco_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.get(db, preco_id)
     if not obj or obj.contrato_id != contrato_id:
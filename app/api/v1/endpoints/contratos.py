@@ -1,11 +1,13 @@
+from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.deps.db import get_db
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
 from app.deps.pagination import get_pagination
 from app.schemas.contrato import ContratoCreate, ContratoUpdate, ContratoOut
 from app.repositories import contrato as repo
+from app.services.reprecificacao import reprecificar
 from app.core.api import ok, created
 
 router = APIRouter()
@@ -19,7 +21,7 @@ router = APIRouter()
 async def create_contrato(
     payload: ContratoCreate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.create(db, payload)
     data = {
@@ -47,8 +49,8 @@ async def list_contratos(
     user = Depends(get_current_user),
     cliente_id: int | None = Query(None, ge=1),
 ):
-    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit, cliente_id=cliente_id)
-    meta = {"page": pagination.page, "size": pagination.size, "count": len(items)}
+    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit, after=pagination.cursor, cliente_id=cliente_id)
+    meta = pagination.meta(items, repo.ORDEM)
     data = [
         {
             "id": i.id,
@@ -88,7 +90,7 @@ async def update_contrato(
     contrato_id: int,
     payload: ContratoUpdate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.update(db, contrato_id, payload)
     if not obj:
@@ -110,6 +112,30 @@ async def update_contrato(
     }
     return ok(data=data, message="Contrato atualizado com sucesso.", request=request)
 
+@router.post(
+    "/contratos/{contrato_id}:repricing",
+    response_model=None,
+    dependencies=[Depends(require_roles("ADMIN", "OPERACAO"))],
+)
+async def repricing_contrato(
+    contrato_id: int,
+    request: Request,
+    dry_run: bool = Query(False, description="Só calcula o relatório, sem gravar"),
+    as_of: date | None = Query(None, description="Data de referência dos preços (AAAA-MM-DD); padrão: hoje."),
+    db: AsyncSession = Depends(get_uow),
+):
+    """
+    Reaplica os preços do contrato vigentes em as_of (específicos e defaults) aos itens
+    HH/MATERIAL dos orçamentos RASCUNHO e recalcula os totais.
+    Responde com a diferença por orçamento (só os que mudam ou têm itens sem preço).
+    """
+    res = await reprecificar(db, contrato_id, dry_run=dry_run, as_of=as_of)
+    if dry_run:
+        msg = "Simulação de reprecificação (nada foi gravado)."
+    else:
+        msg = f"{res['itens_alterados']} item(ns) reprecificado(s)."
+    return ok(data=res, message=msg, request=request)
+
 @router.delete(
     "/contratos/{contrato_id}",
     status_code=status.HTTP_200_OK,
@@ -119,7 +145,7 @@ async def update_contrato(
 async def delete_contrato(
     contrato_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     removed = await repo.delete(db, contrato_id)
     if not removed:
@@ -1,12 +1,16 @@
+from datetime import date
 from fastapi import APIRouter, Depends, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.deps.db import get_db
 from app.deps.auth import get_current_user  # VIEWER pode ler
 from app.core.api import ok
-from app.services.precos_contrato import resolve_preco_hh, resolve_preco_material
+from app.schemas.precos_contrato import PrecosResolveInput
+from app.services.precos_contrato import resolve_preco_hh, resolve_preco_material, resolve_precos_lote
 
 router = APIRouter()
 
+_AS_OF = "Data de referência dos preços (AAAA-MM-DD); padrão: hoje."
+
 @router.get("/contratos/{contrato_id}/precos/hh", response_model=None)
 async def preview_preco_hh(
     contrato_id: int,
@@ -15,9 +19,13 @@ async def preview_preco_hh(
     user = Depends(get_current_user),
     maquina_id: int = Query(..., ge=1),
     tipo_hh: str = Query(..., pattern="^(REGULAR|EXTRA|FERIADO)$"),
+    as_of: date | None = Query(None, description=_AS_OF),
 ):
-    resolved = await resolve_preco_hh(db, contrato_id=contrato_id, maquina_id=maquina_id, tipo_hh=tipo_hh)  # type: ignore
-    return ok(data=resolved, message="Preço de HH resolvido.", request=request)
+    as_of = as_of or date.today()
+    resolved = await resolve_preco_hh(
+        db, contrato_id=contrato_id, maquina_id=maquina_id, tipo_hh=tipo_hh, as_of=as_of  # type: ignore
+    )
+    return ok(data=resolved, meta={"as_of": as_of.isoformat()}, message="Preço de HH resolvido.", request=request)
 
 @router.get("/contratos/{contrato_id}/precos/material", response_model=None)
 async def preview_preco_material(
@@ -26,6 +34,44 @@ async def preview_preco_material(
     db: AsyncSession = Depends(get_db),
     user = Depends(get_current_user),
     material_id: int = Query(..., ge=1),
+    as_of: date | None = Query(None, description=_AS_OF),
+):
+    as_of = as_of or date.today()
+    resolved = await resolve_preco_material(db, contrato_id=contrato_id, material_id=material_id, as_of=as_of)
+    return ok(data=resolved, meta={"as_of": as_of.isoformat()}, message="Preço de material resolvido.", request=request)
+
+@router.post("/contratos/{contrato_id}/precos:resolve", response_model=None)
+async def resolve_precos(
+    contrato_id: int,
+    payload: PrecosResolveInput,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    user = Depends(get_current_user),
+    as_of: date | None = Query(None, description=_AS_OF),
 ):
-    resolved = await resolve_preco_material(db, contrato_id=contrato_id, material_id=material_id)
-    return ok(data=resolved, message="Preço de material resolvido.", request=request)
+    """
+    Resolve vários preços do contrato em uma chamada (grade de preços do front).
+    Mesma regra dos previews (específico vigente em as_of -> default), com 'fonte' por chave:
+    'especifico' | 'default' | 'nao_configurado'.
+    Chaves da resposta: HH = "<maquina_id>:<tipo_hh>", materiais = "<material_id>".
+    """
+    as_of = as_of or date.today()
+    resolved = await resolve_precos_lote(
+        db,
+        contrato_id=contrato_id,
+        hh=[(k.maquina_id, k.tipo_hh) for k in payload.hh],
+        materiais=payload.material_ids,
+        as_of=as_of,
+    )
+    data = {
+        "hh": {f"{maquina_id}:{tipo_hh}": v for (maquina_id, tipo_hh), v in resolved["hh"].items()},
+        "materiais": {str(material_id): v for material_id, v in resolved["materiais"].items()},
+    }
+    nao_configurados = sum(
+        1 for grupo in resolved.values() for v in grupo.values() if v["fonte"] == "nao_configurado"
+    )
+    meta = {
+        "hh": len(data["hh"]), "materiais": len(data["materiais"]),
+        "nao_configurados": nao_configurados, "as_of": as_of.isoformat(),
+    }
+    return ok(data=data, meta=meta, message="Preços resolvidos.", request=request)
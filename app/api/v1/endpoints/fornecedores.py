@@ -1,7 +1,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.deps.db import get_db
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
 from app.schemas.fornecedor import FornecedorCreate, FornecedorUpdate, FornecedorOut
 from app.repositories import fornecedor as repo
@@ -19,7 +19,7 @@ router = APIRouter()
 async def create_fornecedor(
     payload: FornecedorCreate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.create(db, payload)
     data = {
@@ -42,8 +42,8 @@ async def list_fornecedores(
     db: AsyncSession = Depends(get_db),
     user = Depends(get_current_user),
 ):
-    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit)
-    meta = {"page": pagination.page, "size": pagination.size, "count": len(items)}
+    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit, after=pagination.cursor)
+    meta = pagination.meta(items, repo.ORDEM)
     data = [
         {
             "id": i.id,
@@ -80,7 +80,7 @@ async def update_fornecedor(
     fornecedor_id: int,
     payload: FornecedorUpdate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.update(db, fornecedor_id, payload)
     if not obj:
@@ -107,7 +107,7 @@ async def update_fornecedor(
 async def delete_fornecedor(
     fornecedor_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     ok_del = await repo.delete(db, fornecedor_id)
     if not ok_del:
@@ -1,10 +1,20 @@
+import asyncio
+import time
 from fastapi import APIRouter, Depends
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from starlette.responses import JSONResponse
+from app.core.settings import get_settings
 from app.deps.db import get_db
+from app.db.session import SessionLocal, pool_stats
+from app.services.precos_contrato import cache_stats as precos_cache_stats
+from app.repositories.user import auth_cache_stats
+from app.core.security import password_pool_stats
+from app.core.loop_lag import monitor as loop_lag
 
 router = APIRouter()
+settings = get_settings()
 
 @router.get("/health")
 async def healthcheck(db: AsyncSession = Depends(get_db)):
@@ -18,5 +28,85 @@ async def healthcheck(db: AsyncSession = Depends(get_db)):
         "status": "ok",
         "service": "usinagem-backend",
         "db_ok": db_ok,
+        "db_pool": pool_stats(),
+        "caches": {
+            "precos_contrato": precos_cache_stats(),
+            "auth_users": auth_cache_stats(),
+        },
+        "password_pool": password_pool_stats(),
         "timestamp": datetime.utcnow().isoformat() + "Z",
     }
+
+# ---- Readiness ----
+# Resultado em cache por READY_CACHE_SECONDS; o lock garante um único probe
+# por vez mesmo com vários balanceadores consultando ao mesmo tempo.
+_ready_cache: tuple[float, int, dict] | None = None  # (expira_em, status, corpo)
+_ready_lock = asyncio.Lock()
+
+async def _db_latency_ms() -> float | None:
+    """SELECT 1 pelo pool da aplicação; None se falhar ou passar do limite."""
+    async def _probe():
+        async with SessionLocal() as s:
+            await s.scalar(text("SELECT 1"))
+    inicio = time.perf_counter()
+    try:
+        await asyncio.wait_for(_probe(), timeout=settings.READY_DB_LATENCY_MS_MAX / 1000)
+    except Exception:
+        return None
+    return (time.perf_counter() - inicio) * 1000
+
+async def _run_ready_checks() -> tuple[int, dict]:
+    loop_lag.iniciar()
+    lag = loop_lag.max_recente()
+    lag_acima = loop_lag.acima(settings.READY_LOOP_LAG_MS_MAX)
+    db_ms = await _db_latency_ms()
+    pool = pool_stats()
+    saturacao = None
+    if "checked_out" in pool:
+        capacidade = pool["size"] + pool["max_overflow"]
+        saturacao = round(pool["checked_out"] / capacidade, 3) if capacidade else None
+
+    motivos = []
+    if db_ms is None:
+        motivos.append(f"db: SELECT 1 falhou ou passou de {settings.READY_DB_LATENCY_MS_MAX:g} ms")
+    if saturacao is not None and saturacao >= settings.READY_POOL_SATURATION_MAX:
+        motivos.append(f"pool: saturação {saturacao} >= {settings.READY_POOL_SATURATION_MAX:g}")
+    if lag_acima >= settings.READY_LOOP_LAG_SUSTAINED:
+        motivos.append(
+            f"event loop: lag >= {settings.READY_LOOP_LAG_MS_MAX:g} ms em {lag_acima}"
+            f" das últimas {settings.LOOP_LAG_SAMPLES} amostras"
+        )
+
+    corpo = {
+        "status": "not_ready" if motivos else "ready",
+        "reasons": motivos,
+        "checks": {
+            "db_latency_ms": round(db_ms, 2) if db_ms is not None else None,
+            "pool_saturation": saturacao,
+            "pool_timeouts": pool.get("timeouts"),
+            "loop_lag_ms": round(lag, 2) if lag is not None else None,  # máximo das últimas amostras
+            "loop_lag_samples_over_limit": lag_acima,
+            "cache_hit_ratio": {
+                "precos_contrato": precos_cache_stats()["hit_ratio"],
+                "auth_users": auth_cache_stats()["hit_ratio"],
+            },
+        },
+        "checked_at": datetime.utcnow().isoformat() + "Z",
+    }
+    return (503 if motivos else 200), corpo
+
+@router.get("/health/ready")
+async def readiness():
+    """
+    Readiness para o balanceador: 503 se o banco estiver lento/fora, o pool
+    saturado ou o event loop com atraso sustentado (app/core/loop_lag).
+    Não usa get_db, para não segurar conexão quando a resposta vem do cache.
+    """
+    global _ready_cache
+    if _ready_cache is None or _ready_cache[0] <= time.monotonic():
+        async with _ready_lock:
+            if _ready_cache is None or _ready_cache[0] <= time.monotonic():
+                status_code, corpo = await _run_ready_checks()
+                _ready_cache = (time.monotonic() + settings.READY_CACHE_SECONDS, status_code, corpo)
+    _, status_code, corpo = _ready_cache
+    return JSONResponse(status_code=status_code, content=corpo)
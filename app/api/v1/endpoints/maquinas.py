@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.deps.db import get_db
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
 from app.deps.pagination import get_pagination
 from app.schemas.maquina import MaquinaCreate, MaquinaUpdate, MaquinaOut
@@ -15,7 +15,7 @@ router = APIRouter()
     response_model=None,
     dependencies=[Depends(require_roles("ADMIN", "OPERACAO"))],
 )
-async def create_maquina(payload: MaquinaCreate, request: Request, db: AsyncSession = Depends(get_db)):
+async def create_maquina(payload: MaquinaCreate, request: Request, db: AsyncSession = Depends(get_uow)):
     obj = await repo.create(db, payload)
     data = {
         "id": obj.id, "nome": obj.nome, "descricao": obj.descricao, "uom_hh_id": obj.uom_hh_id,
@@ -26,8 +26,8 @@ async def create_maquina(payload: MaquinaCreate, request: Request, db: AsyncSess
 
 @router.get("/maquinas", response_model=None)
 async def list_maquinas(request: Request, pagination = Depends(get_pagination), db: AsyncSession = Depends(get_db), user = Depends(get_current_user)):
-    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit)
-    meta = {"page": pagination.page, "size": pagination.size, "count": len(items)}
+    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit, after=pagination.cursor)
+    meta = pagination.meta(items, repo.ORDEM)
     data = [
         {
             "id": i.id, "nome": i.nome, "descricao": i.descricao, "uom_hh_id": i.uom_hh_id,
@@ -49,7 +49,7 @@ async def get_maquina(maquina_id: int, db: AsyncSession = Depends(get_db), user
     response_model=None,
     dependencies=[Depends(require_roles("ADMIN", "OPERACAO"))],
 )
-async def update_maquina(maquina_id: int, payload: MaquinaUpdate, request: Request, db: AsyncSession = Depends(get_db)):
+async def update_maquina(maquina_id: int, payload: MaquinaUpdate, request: Request, db: AsyncSession = Depends(get_uow)):
     obj = await repo.update(db, maquina_id, payload)
     if not obj:
         raise HTTPException(status_code=404, detail="Máquina não encontrada")
@@ -66,7 +66,7 @@ async def update_maquina(maquina_id: int, payload: MaquinaUpdate, request: Reque
     response_model=None,
     dependencies=[Depends(require_roles("ADMIN", "OPERACAO"))],
 )
-async def delete_maquina(maquina_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+async def delete_maquina(maquina_id: int, request: Request, db: AsyncSession = Depends(get_uow)):
     removed = await repo.delete(db, maquina_id)
     if not removed:
         raise HTTPException(status_code=404, detail="Máquina não encontrada")
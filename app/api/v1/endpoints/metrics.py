@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from starlette.responses import PlainTextResponse
+
+from app.core.metrics import render_prometheus
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Métricas no formato texto do Prometheus (ver app/core/metrics.py)."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
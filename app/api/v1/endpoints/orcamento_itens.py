@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from starlette.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.deps.db import get_db
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
-from app.core.api import ok, created
+from app.core.api import ok, created, fail
 from app.schemas.orcamento_item import OrcamentoItemCreate, OrcamentoItemUpdate, OrcamentoItemOut
 from app.repositories import orcamento_item as repo
 
 router = APIRouter()
 
+MAX_ITENS_LOTE = 1000
+
 @router.post(
     "/orcamentos/{orcamento_id}/itens",
     status_code=status.HTTP_201_CREATED,
@@ -18,7 +22,7 @@ async def create_orc_item(
     orcamento_id: int,
     payload: OrcamentoItemCreate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.create(db, orcamento_id, payload)
     return created(
@@ -41,6 +45,69 @@ async def create_orc_item(
         request=request,
     )
 
+@router.post(
+    "/orcamentos/{orcamento_id}/itens:batch",
+    status_code=status.HTTP_201_CREATED,
+    response_model=None,
+    dependencies=[Depends(require_roles("ADMIN", "OPERACAO"))],
+)
+async def create_orc_itens_lote(
+    orcamento_id: int,
+    payload: List[OrcamentoItemCreate],
+    request: Request,
+    db: AsyncSession = Depends(get_uow),
+    atomico: bool = Query(False, description="Se true, qualquer linha inválida cancela o lote inteiro."),
+):
+    """
+    Inserção de vários itens com um único commit e um único recálculo de totais.
+    Retorna um resultado por linha (mesma ordem do corpo).
+    """
+    if not payload:
+        raise HTTPException(status_code=422, detail="Envie ao menos um item.")
+    if len(payload) > MAX_ITENS_LOTE:
+        raise HTTPException(status_code=422, detail=f"Máximo de {MAX_ITENS_LOTE} itens por lote.")
+
+    resultados = await repo.create_lote(db, orcamento_id, payload, atomico=atomico)
+    erros = [{"index": r["index"], "message": r["error"]} for r in resultados if not r["success"]]
+    inseridos = [r for r in resultados if r.get("item") is not None]
+
+    if not inseridos:
+        payload_erro = fail(
+            message="Nenhum item foi inserido. Corrija as linhas indicadas.",
+            errors=erros,
+            status_code=422,
+            request=request,
+        )
+        return JSONResponse(status_code=422, content=payload_erro)
+
+    data = []
+    for r in resultados:
+        obj = r.get("item")
+        if obj is None:
+            data.append({"index": r["index"], "success": False, "error": r["error"]})
+            continue
+        data.append({
+            "index": r["index"],
+            "success": True,
+            "item": {
+                "id": obj.id,
+                "orcamento_id": obj.orcamento_id,
+                "item_tipo": obj.item_tipo,
+                "maquina_id": obj.maquina_id,
+                "tipo_hh": obj.tipo_hh,
+                "material_id": obj.material_id,
+                "descricao": obj.descricao,
+                "uom_id": obj.uom_id,
+                "quantidade": float(obj.quantidade),
+                "preco_unitario": float(obj.preco_unitario),
+                "total_item": float(obj.total_item),
+                "created_at": obj.created_at.isoformat() if obj.created_at else None,
+                "updated_at": obj.updated_at.isoformat() if obj.updated_at else None,
+            },
+        })
+    meta = {"recebidos": len(payload), "inseridos": len(inseridos), "rejeitados": len(erros)}
+    return created(data=data, meta=meta, message="Itens adicionados ao orçamento.", request=request)
+
 @router.get("/orcamentos/{orcamento_id}/itens", response_model=None)
 async def list_orc_itens(
     orcamento_id: int,
@@ -90,7 +157,7 @@ async def update_orc_item(
     item_id: int,
     payload: OrcamentoItemUpdate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.update(db, orcamento_id, item_id, payload)
     if not obj:
@@ -125,7 +192,7 @@ async def delete_orc_item(
     orcamento_id: int,
     item_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     removed = await repo.delete(db, orcamento_id, item_id)
     if not removed:
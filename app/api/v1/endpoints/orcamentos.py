@@ -1,10 +1,18 @@
+import csv
+import io
+from datetime import date, datetime
+from typing import Literal
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from starlette.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.deps.db import get_db
+from app.db.session import SessionLocal
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
 from app.deps.pagination import get_pagination
-from app.core.api import ok, created
-from app.schemas.orcamento import OrcamentoCreate, OrcamentoUpdate, OrcamentoOut
+from app.core.api import ok, created, dumps
+from app.schemas.orcamento import (
+    OrcamentoCreate, OrcamentoUpdate, OrcamentoOut, OrcamentoCloneInput, OrcamentoDocumentoResposta, StatusOrc,
+)
 from app.repositories import orcamento as repo
 
 router = APIRouter()
@@ -18,7 +26,7 @@ router = APIRouter()
 async def create_orcamento(
     payload: OrcamentoCreate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.create(db, payload)
     return created(
@@ -51,8 +59,8 @@ async def list_orcamentos(
     cliente_id: int | None = Query(None, ge=1),
     tipo: str | None = Query(None),
 ):
-    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit, cliente_id=cliente_id, tipo=tipo)
-    meta = {"page": pagination.page, "size": pagination.size, "count": len(items)}
+    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit, after=pagination.cursor, cliente_id=cliente_id, tipo=tipo)
+    meta = pagination.meta(items, repo.ORDEM)
     data = [
         {
             "id": i.id,
@@ -73,6 +81,60 @@ async def list_orcamentos(
     ]
     return ok(data=data, meta=meta, request=request)
 
+def _iso(v):
+    return v.isoformat() if v else None
+
+# Declarada antes de /orcamentos/{orcamento_id} (senão "export" casaria como id)
+@router.get("/orcamentos/export", response_model=None)
+async def export_orcamentos(
+    user = Depends(get_current_user),  # mesmo acesso da listagem
+    formato: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    de: date | None = Query(None, alias="from", description="created_at a partir de (AAAA-MM-DD)"),
+    ate: date | None = Query(None, alias="to", description="created_at até (inclusive)"),
+    cliente_id: int | None = Query(None, ge=1),
+    status_orc: StatusOrc | None = Query(None, alias="status"),
+):
+    """
+    Export de orçamentos com itens (uma linha por item) em CSV ou NDJSON,
+    enviado em chunks à medida que o cursor do banco avança — memória
+    constante, sem paginação no cliente.
+    """
+    if de and ate and de > ate:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="'from' deve ser anterior ou igual a 'to'.",
+        )
+    nomes = [nome for nome, _ in repo.EXPORT_COLUNAS]
+    filtros = dict(de=de, ate=ate, cliente_id=cliente_id, status_orc=status_orc)
+
+    async def corpo():
+        # sessão própria: a do get_db é fechada antes de o corpo ser enviado
+        async with SessionLocal() as db:
+            blocos = repo.stream_export(db, **filtros)
+            if formato == "ndjson":
+                async for bloco in blocos:
+                    yield b"".join(dumps(dict(zip(nomes, linha))) + b"\n" for linha in bloco)
+                return
+            buf = io.StringIO()
+            w = csv.writer(buf)
+            w.writerow(nomes)
+            async for bloco in blocos:
+                w.writerows(
+                    [v.isoformat() if isinstance(v, datetime) else v for v in linha] for linha in bloco
+                )
+                yield buf.getvalue().encode("utf-8")
+                buf.seek(0)
+                buf.truncate()
+            if buf.tell():  # sem linhas: só o cabeçalho
+                yield buf.getvalue().encode("utf-8")
+
+    periodo = "_".join(str(d) for d in (de, ate) if d) or "todos"
+    return StreamingResponse(
+        corpo(),
+        media_type="text/csv; charset=utf-8" if formato == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="orcamentos_{periodo}.{formato}"'},
+    )
+
 @router.get("/orcamentos/{orcamento_id}", response_model=OrcamentoOut)
 async def get_orcamento(
     orcamento_id: int,
@@ -84,6 +146,109 @@ async def get_orcamento(
         raise HTTPException(status_code=404, detail="Orçamento não encontrado")
     return obj
 
+@router.get(
+    "/orcamentos/{orcamento_id}/documento",
+    response_model=None,
+    responses={200: {"model": OrcamentoDocumentoResposta}},
+)
+async def get_orcamento_documento(
+    orcamento_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    user = Depends(get_current_user),
+    expand: str | None = Query(
+        None,
+        description="Relações a incluir, separadas por vírgula (padrão: todas): " + ",".join(repo.EXPAND_VALIDOS),
+    ),
+):
+    """
+    Documento único no envelope padrão — cabeçalho + itens e lookups
+    resolvidos (nomes de máquina/material e símbolo da UoM também embutidos
+    em cada item), com número fixo de queries. `expand` restringe as relações.
+    """
+    if not expand:
+        expand = ",".join(repo.EXPAND_VALIDOS)
+    pedidos = {e.strip() for e in expand.split(",") if e.strip()}
+    invalidos = pedidos - set(repo.EXPAND_VALIDOS)
+    if invalidos:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"expand inválido: {', '.join(sorted(invalidos))}. Use: {', '.join(repo.EXPAND_VALIDOS)}.",
+        )
+    res = await repo.get_detalhe(db, orcamento_id, pedidos)
+    if not res:
+        raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+
+    obj = res["orcamento"]
+    maquinas = res.get("maquinas", {})
+    materiais = res.get("materiais", {})
+    uoms = res.get("uoms", {})
+    data = {
+        "id": obj.id,
+        "cliente_id": obj.cliente_id,
+        "tipo": obj.tipo,
+        "status": obj.status,
+        "contrato_id": obj.contrato_id,
+        "moeda": obj.moeda,
+        "titulo": obj.titulo,
+        "observacoes": obj.observacoes,
+        "subtotal": float(obj.subtotal),
+        "desconto": float(obj.desconto),
+        "acrescimo": float(obj.acrescimo),
+        "total": float(obj.total),
+        "created_at": _iso(obj.created_at),
+        "updated_at": _iso(obj.updated_at),
+    }
+    if "itens" in res:
+        data["itens"] = [
+            {
+                "id": i.id,
+                "item_tipo": i.item_tipo,
+                "maquina_id": i.maquina_id,
+                "maquina_nome": maquinas[i.maquina_id].nome if i.maquina_id in maquinas else None,
+                "tipo_hh": i.tipo_hh,
+                "material_id": i.material_id,
+                "material_nome": materiais[i.material_id].nome if i.material_id in materiais else None,
+                "descricao": i.descricao,
+                "uom_id": i.uom_id,
+                "uom_simbolo": uoms[i.uom_id].simbolo if i.uom_id in uoms else None,
+                "quantidade": float(i.quantidade),
+                "preco_unitario": float(i.preco_unitario),
+                "total_item": float(i.total_item),
+                "created_at": _iso(i.created_at),
+                "updated_at": _iso(i.updated_at),
+            } for i in res["itens"]
+        ]
+    if "maquinas" in res:
+        data["maquinas"] = [
+            {"id": m.id, "nome": m.nome, "descricao": m.descricao, "uom_hh_id": m.uom_hh_id}
+            for m in maquinas.values()
+        ]
+    if "materiais" in res:
+        data["materiais"] = [
+            {"id": m.id, "nome": m.nome, "descricao": m.descricao, "uom_base_id": m.uom_base_id}
+            for m in materiais.values()
+        ]
+    if "uoms" in res:
+        data["uoms"] = [
+            {"id": u.id, "nome": u.nome, "simbolo": u.simbolo, "categoria": u.categoria}
+            for u in uoms.values()
+        ]
+    if "cliente" in res:
+        c = res["cliente"]
+        data["cliente"] = {"id": c.id, "nome": c.nome, "email": c.email, "telefone": c.telefone} if c else None
+    if "contrato" in res:
+        c = res["contrato"]
+        data["contrato"] = {
+            "id": c.id,
+            "cliente_id": c.cliente_id,
+            "moeda": c.moeda,
+            "ativo": c.ativo,
+            "data_inicio": _iso(c.data_inicio),
+            "data_fim": _iso(c.data_fim),
+        } if c else None
+    return ok(data=data, meta={"expand": sorted(pedidos)}, request=request)
+
 @router.put(
     "/orcamentos/{orcamento_id}",
     response_model=None,
@@ -93,7 +258,7 @@ async def update_orcamento(
     orcamento_id: int,
     payload: OrcamentoUpdate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.update(db, orcamento_id, payload)
     if not obj:
@@ -119,6 +284,82 @@ async def update_orcamento(
         request=request,
     )
 
+@router.post(
+    "/orcamentos/{orcamento_id}:recalcular",
+    response_model=None,
+    dependencies=[Depends(require_roles("ADMIN", "OPERACAO"))],
+)
+async def recalcular_orcamento(
+    orcamento_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_uow),
+):
+    """
+    Reconciliação completa de subtotal/total a partir dos itens (reparo).
+    No dia a dia os totais são mantidos de forma incremental pelos itens.
+    """
+    res = await repo.recalcular_totais(db, orcamento_id)
+    if not res:
+        raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+    obj = res["orcamento"]
+    return ok(
+        data={
+            "id": obj.id,
+            "subtotal": float(obj.subtotal),
+            "desconto": float(obj.desconto),
+            "acrescimo": float(obj.acrescimo),
+            "total": float(obj.total),
+            "updated_at": obj.updated_at.isoformat() if obj.updated_at else None,
+        },
+        meta={"antes": res["antes"], "depois": res["depois"], "alterado": res["antes"] != res["depois"]},
+        message="Totais do orçamento recalculados.",
+        request=request,
+    )
+
+@router.post(
+    "/orcamentos/{orcamento_id}:clone",
+    status_code=status.HTTP_201_CREATED,
+    response_model=None,
+    dependencies=[Depends(require_roles("ADMIN", "OPERACAO"))],
+)
+async def clone_orcamento(
+    orcamento_id: int,
+    request: Request,
+    payload: OrcamentoCloneInput | None = None,
+    db: AsyncSession = Depends(get_uow),
+):
+    """
+    Novo orçamento (RASCUNHO) a partir de outro, com todos os itens copiados
+    no servidor. Corpo opcional: cliente/tipo/contrato/título de destino e
+    `reprecificar` (+ `as_of`) para aplicar os preços atuais do contrato.
+    """
+    payload = payload or OrcamentoCloneInput()
+    res = await repo.clonar(db, orcamento_id, payload)
+    if not res:
+        raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+    obj = res["orcamento"]
+    return created(
+        data={
+            "id": obj.id,
+            "cliente_id": obj.cliente_id,
+            "tipo": obj.tipo,
+            "status": obj.status,
+            "contrato_id": obj.contrato_id,
+            "moeda": obj.moeda,
+            "titulo": obj.titulo,
+            "observacoes": obj.observacoes,
+            "subtotal": float(obj.subtotal),
+            "desconto": float(obj.desconto),
+            "acrescimo": float(obj.acrescimo),
+            "total": float(obj.total),
+            "created_at": obj.created_at.isoformat() if obj.created_at else None,
+            "updated_at": obj.updated_at.isoformat() if obj.updated_at else None,
+        },
+        meta={"origem_id": orcamento_id, "itens": res["itens"], "reprecificado": payload.reprecificar},
+        message="Orçamento clonado com sucesso.",
+        request=request,
+    )
+
 @router.delete(
     "/orcamentos/{orcamento_id}",
     status_code=status.HTTP_200_OK,
@@ -128,7 +369,7 @@ async def update_orcamento(
 async def delete_orcamento(
     orcamento_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     removed = await repo.delete(db, orcamento_id)
     if not removed:
@@ -2,7 +2,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.deps.db import get_db
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
 from app.deps.pagination import get_pagination
 from app.schemas.tipo_servico import TipoServicoCreate, TipoServicoUpdate, TipoServicoOut
@@ -20,7 +20,7 @@ router = APIRouter()
 async def create_tipo_servico(
     payload: TipoServicoCreate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.create(db, payload)
     data = {
@@ -37,8 +37,8 @@ async def list_tipos_servico(
     db: AsyncSession = Depends(get_db),
     user = Depends(get_current_user),
 ):
-    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit)
-    meta = {"page": pagination.page, "size": pagination.size, "count": len(items)}
+    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit, after=pagination.cursor)
+    meta = pagination.meta(items, repo.ORDEM)
     data = [
         {
             "id": i.id, "nome": i.nome, "descricao": i.descricao,
@@ -68,7 +68,7 @@ async def update_tipo_servico(
     tipo_id: int,
     payload: TipoServicoUpdate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.update(db, tipo_id, payload)
     if not obj:
@@ -89,7 +89,7 @@ async def update_tipo_servico(
 async def delete_tipo_servico(
     tipo_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     ok_del = await repo.delete(db, tipo_id)
     if not ok_del:
@@ -2,7 +2,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.deps.db import get_db
+from app.deps.db import get_db, get_uow
 from app.deps.auth import get_current_user, require_roles
 from app.deps.pagination import get_pagination
 from app.schemas.unidade_medida import UoMCreate, UoMUpdate, UoMOut
@@ -20,7 +20,7 @@ router = APIRouter()
 async def create_uom(
     payload: UoMCreate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.create(db, payload)
     data = {
@@ -37,8 +37,8 @@ async def list_uom(
     db: AsyncSession = Depends(get_db),
     user = Depends(get_current_user),
 ):
-    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit)
-    meta = {"page": pagination.page, "size": pagination.size, "count": len(items)}
+    items = await repo.list_(db, skip=pagination.skip, limit=pagination.limit, after=pagination.cursor)
+    meta = pagination.meta(items, repo.ORDEM)
     data = [
         {
             "id": i.id, "nome": i.nome, "simbolo": i.simbolo, "categoria": i.categoria,
@@ -68,7 +68,7 @@ async def update_uom(
     uom_id: int,
     payload: UoMUpdate,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     obj = await repo.update(db, uom_id, payload)
     if not obj:
@@ -89,7 +89,7 @@ async def update_uom(
 async def delete_uom(
     uom_id: int,
     request: Request,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     removed = await repo.delete(db, uom_id)
     if not removed:
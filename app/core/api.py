@@ -1,5 +1,53 @@
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Any, Optional, Dict
+import json
+from uuid import UUID
+
 from fastapi import Request
+from starlette.responses import JSONResponse
+
+from app.core.metrics import request_db_stats
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+# orjson é opcional: sem ele, cai no json da stdlib (mesma saída, mais lento)
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+def _default(obj: Any) -> Any:
+    """Tipos que aparecem nos dados e o encoder não serializa sozinho."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, UUID):
+        return str(obj)
+    if hasattr(obj, "model_dump"):  # schemas Pydantic
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Tipo não serializável: {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """JSON compacto em UTF-8 (orjson, se instalado); usado também no export NDJSON."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+class EnvelopeResponse(JSONResponse):
+    """
+    Resposta do envelope padrão serializada direto (orjson, se instalado).
+    Ao retornar uma Response pronta, o FastAPI não passa o conteúdo pelo
+    jsonable_encoder — em páginas grandes esse passeio era o maior custo.
+    datetime/date/Decimal/UUID são tratados pelo encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
 
 def _rid(request: Optional[Request]) -> Optional[str]:
     try:
@@ -7,33 +55,42 @@ def _rid(request: Optional[Request]) -> Optional[str]:
     except Exception:
         return None
 
+def _meta(meta: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Em debug, anexa as queries do request à meta (deixa N+1 visível)."""
+    meta = meta or {}
+    if settings.DEBUG:
+        stats = request_db_stats()
+        if stats is not None:
+            meta = {**meta, "debug": {"db_queries": stats.queries, "db_time_ms": round(stats.seconds * 1000, 2)}}
+    return meta
+
 def ok(
     data: Any = None,
     message: Optional[str] = None,
     meta: Optional[Dict[str, Any]] = None,
     request: Optional[Request] = None,
-):
-    return {
+) -> EnvelopeResponse:
+    return EnvelopeResponse({
         "success": True,
         "message": message,
         "data": data,
-        "meta": meta or {},
+        "meta": _meta(meta),
         "request_id": _rid(request),
-    }
+    })
 
 def created(
     data: Any = None,
     message: Optional[str] = "Criado com sucesso.",
     meta: Optional[Dict[str, Any]] = None,
     request: Optional[Request] = None,
-):
-    return {
+) -> EnvelopeResponse:
+    return EnvelopeResponse({
         "success": True,
         "message": message,
         "data": data,
-        "meta": meta or {},
+        "meta": _meta(meta),
         "request_id": _rid(request),
-    }
+    }, status_code=201)
 
 def fail(
     message: str,
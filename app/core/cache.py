@@ -0,0 +1,94 @@
+"""
+Cache em memória (por processo) com TTL e tamanho máximo.
+
+- LRU simples sobre OrderedDict; expiração verificada na leitura.
+- Contadores de hit/miss/evicção para observabilidade (health/metrics).
+- `versao` é incrementada a cada invalidação: quem leu do banco ANTES de uma
+  invalidação passa a versão observada para `set` e a escrita é descartada,
+  evitando repopular o cache com dado velho.
+
+Cada worker (processo) tem o seu cache; por isso o TTL deve ser curto o
+suficiente para tolerar escritas feitas em outro worker.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+# Sentinela para diferenciar "não está no cache" de "valor None cacheado"
+MISS = object()
+
+
+class TTLCache:
+    def __init__(self, nome: str, maxsize: int, ttl: float) -> None:
+        self.nome = nome
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.versao = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: Hashable) -> Any:
+        """Retorna o valor ou `MISS` (inclusive quando expirado)."""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return MISS
+        expira_em, value = item
+        if expira_em < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return MISS
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, versao: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+        if versao is not None and versao != self.versao:
+            # houve invalidação entre a leitura no banco e esta escrita
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self.versao += 1
+        self.invalidations += 1
+        self._data.pop(key, None)
+
+    def invalidate_where(self, pred: Callable[[Hashable], bool]) -> int:
+        self.versao += 1
+        self.invalidations += 1
+        keys = [k for k in self._data if pred(k)]
+        for k in keys:
+            del self._data[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        self.versao += 1
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "nome": self.nome,
+            "enabled": self.enabled,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,94 @@
+"""
+Paginação por cursor (keyset).
+
+Em vez de OFFSET, a próxima página começa DEPOIS da chave de ordenação do
+último item devolvido: `WHERE (col1, col2) > (:v1, :v2) ORDER BY col1, col2`.
+O custo não cresce com a profundidade e inserções concorrentes não fazem
+itens pularem/repetirem entre páginas.
+
+O cursor é opaco para o cliente: base64url de um JSON com os valores da chave.
+A ordenação (`ordem`) precisa ser única — use a PK como desempate se preciso.
+Os valores decodificados são conferidos contra o tipo Python de cada coluna
+antes de irem para a query: cursor adulterado/velho é 400, não erro do driver.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def encode_cursor(valores: Sequence[Any]) -> str:
+    raw = json.dumps(list(valores), separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """Decodifica o cursor; 400 se estiver malformado."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(raw)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+    if not isinstance(valores, list) or not valores:
+        raise HTTPException(status_code=400, detail="Cursor de paginação inválido")
+    return valores
+
+
+def _invalido() -> HTTPException:
+    return HTTPException(status_code=400, detail="Cursor de paginação inválido")
+
+
+def _valor_da_coluna(col: InstrumentedAttribute, valor: Any) -> Any:
+    """
+    Valor do cursor no tipo Python da coluna; 400 se não bater. Datas e
+    Decimal chegam como texto (encode_cursor usa str) e são convertidos.
+    """
+    try:
+        tipo = col.type.python_type
+    except NotImplementedError:
+        return valor
+    if isinstance(valor, str) and tipo in (date, datetime, Decimal):
+        try:
+            return Decimal(valor) if tipo is Decimal else tipo.fromisoformat(valor)
+        except (ValueError, InvalidOperation):
+            raise _invalido()
+    if tipo is float and isinstance(valor, int) and not isinstance(valor, bool):
+        return float(valor)
+    if not isinstance(valor, tipo) or (isinstance(valor, bool) and tipo is not bool):
+        raise _invalido()
+    return valor
+
+
+def apply_page(
+    stmt: Select,
+    ordem: Sequence[InstrumentedAttribute],
+    skip: int,
+    limit: int,
+    after: Optional[list] = None,
+) -> Select:
+    """
+    Ordena por `ordem` e pagina: keyset se `after` (valores decodificados do
+    cursor) vier preenchido, senão OFFSET/LIMIT (modo página, legado).
+    """
+    stmt = stmt.order_by(*ordem).limit(limit)
+    if after is None:
+        return stmt.offset(skip)
+    if len(after) != len(ordem):
+        raise _invalido()
+    after = [_valor_da_coluna(col, v) for col, v in zip(ordem, after)]
+    if len(ordem) == 1:
+        return stmt.where(ordem[0] > after[0])
+    return stmt.where(tuple_(*ordem) > tuple_(*after))
+
+
+def next_cursor(items: Sequence[Any], ordem: Sequence[InstrumentedAttribute], limit: int) -> Optional[str]:
+    """Cursor para a página seguinte (None quando a página veio incompleta)."""
+    if len(items) < limit:
+        return None
+    ultimo = items[-1]
+    return encode_cursor([getattr(ultimo, col.key) for col in ordem])
@@ -12,9 +12,9 @@ from app.core.api import fail
 def _msg_unique(e_msg: str) -> str:
     txt = (e_msg or "").lower()
     if "contrato_hh_precos" in txt:
-        return "Já existe um preço de HH para esta combinação (Contrato, Máquina, Tipo de Hora)."
+        return "Já existe um preço de HH para esta combinação (Contrato, Máquina, Tipo de Hora, Início de vigência)."
     if "contrato_material_precos" in txt:
-        return "Já existe um preço de material para esta combinação (Contrato, Material)."
+        return "Já existe um preço de material para esta combinação (Contrato, Material, Início de vigência)."
     if "unique" in txt or "duplicate key" in txt:
         return "Registro duplicado: violação de unicidade."
     return "Violação de unicidade."
@@ -31,7 +31,8 @@ def register_error_handlers(app: FastAPI) -> None:
             status_code=exc.status_code,
             request=request,
         )
-        return JSONResponse(status_code=exc.status_code, content=payload)
+        # preserva headers da exceção (ex.: Retry-After no 429, WWW-Authenticate)
+        return JSONResponse(status_code=exc.status_code, content=payload, headers=getattr(exc, "headers", None))
 
     @app.exception_handler(RequestValidationError)
     async def validation_exc_handler(request: Request, exc: RequestValidationError):
@@ -80,9 +81,9 @@ def register_error_handlers(app: FastAPI) -> None:
         if "unique" in msg_lower or "duplicate key" in msg_lower:
             friendly = "Registro duplicado: violação de unicidade."
             if "contrato_hh_precos" in msg_lower:
-                friendly = "Já existe um preço de HH para esta combinação (Contrato, Máquina, Tipo de Hora)."
+                friendly = "Já existe um preço de HH para esta combinação (Contrato, Máquina, Tipo de Hora, Início de vigência)."
             if "contrato_material_precos" in msg_lower:
-                friendly = "Já existe um preço de material para esta combinação (Contrato, Material)."
+                friendly = "Já existe um preço de material para esta combinação (Contrato, Material, Início de vigência)."
             status_code = 409
         elif "foreign key" in msg_lower or ("constraint failed" in msg_lower and "references" in msg_lower):
             friendly = "Violação de integridade referencial: verifique se os IDs relacionados existem."
@@ -98,18 +99,3 @@ def register_error_handlers(app: FastAPI) -> None:
             request=request,
         )
         return JSONResponse(status_code=status_code, content=payload)
-
-    @app.middleware("http")
-    async def catch_all_exceptions(request: Request, call_next):
-        try:
-            return await call_next(request)
-        except (IntegrityError, RequestValidationError, StarletteHTTPException):
-            raise
-        except Exception as e:
-            payload = fail(
-                message="Erro interno no servidor",
-                errors=str(e),
-                status_code=500,
-                request=request,
-            )
-            return JSONResponse(status_code=500, content=payload)
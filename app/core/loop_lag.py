@@ -0,0 +1,62 @@
+"""
+Monitor de atraso (lag) do event loop, em segundo plano.
+
+Uma task dorme `intervalo` segundos em laço e mede quanto o despertar atrasou:
+se alguma coisa bloqueou o loop (CPU, I/O síncrono), o atraso aparece na
+amostra seguinte. Guarda as últimas `n` amostras; o readiness (/health/ready)
+só reprova com lag SUSTENTADO — pelo menos K das N acima do limite. Um pico
+isolado (pausa de GC, uma serialização grande) não tira o worker de rotação,
+e um bloqueio entre dois probes continua visível nas amostras.
+
+Um monitor por processo (`monitor`). Iniciado no startup da app (lifespan)
+e, por garantia, no primeiro readiness (clientes ASGI em processo não
+disparam o lifespan).
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import suppress
+from typing import Optional
+
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+
+class LoopLagMonitor:
+    def __init__(self, intervalo: float, n: int) -> None:
+        self.intervalo = intervalo
+        self._amostras: deque[float] = deque(maxlen=n)  # lag em ms, mais recente no fim
+        self._task: Optional[asyncio.Task] = None
+
+    def iniciar(self) -> None:
+        """Inicia a amostragem no loop atual (idempotente)."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._amostras.clear()  # amostras de outro loop não valem para este
+        self._task = loop.create_task(self._rodar(), name="loop-lag-monitor")
+
+    async def parar(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    async def _rodar(self) -> None:
+        while True:
+            inicio = time.monotonic()
+            await asyncio.sleep(self.intervalo)
+            self._amostras.append(max(0.0, (time.monotonic() - inicio - self.intervalo) * 1000))
+
+    def max_recente(self) -> Optional[float]:
+        """Maior lag (ms) entre as últimas amostras; None se ainda não há nenhuma."""
+        return max(self._amostras, default=None)
+
+    def acima(self, limite_ms: float) -> int:
+        """Quantas das últimas amostras passaram de `limite_ms`."""
+        return sum(1 for lag in self._amostras if lag >= limite_ms)
+
+
+monitor = LoopLagMonitor(settings.LOOP_LAG_SAMPLE_SECONDS, settings.LOOP_LAG_SAMPLES)
@@ -0,0 +1,205 @@
+"""
+Métricas da aplicação no formato texto do Prometheus (sem dependência extra).
+
+- MetricsMiddleware (ASGI puro): latência por rota (histograma), contagem por
+  status e requests em andamento. A rota é o template ("/orcamentos/{orcamento_id}"),
+  não o path cru, para não explodir a cardinalidade.
+- instrument_engine(): eventos do SQLAlchemy contam queries, commits e tempo de banco,
+  no agregado por rota e no gravador do request atual (app/core/query_recorder.py,
+  que também aplica os orçamentos de queries e detecta N+1).
+- request_db_stats(): consultas/tempo do request em andamento (usado pelo ok()
+  em modo debug para deixar N+1 visível no próprio envelope).
+
+Tudo roda na thread do event loop (os eventos do engine rodam no greenlet do
+mesmo request), então contadores simples bastam.
+"""
+import time
+from collections import defaultdict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.query_recorder import QueryRecorder, current_recorder, start_recording, stop_recording
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+UNMATCHED = "<unmatched>"
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.total += 1
+        self.sum += value
+        for i, limite in enumerate(self.buckets):
+            if value <= limite:
+                self.counts[i] += 1
+                break
+
+
+# ---- registro ----
+_http_duration: dict[tuple[str, str], Histogram] = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+_http_status: dict[tuple[str, str, int], int] = defaultdict(int)
+_http_in_flight = 0
+_db_queries: dict[str, int] = defaultdict(int)
+_db_seconds: dict[str, float] = defaultdict(float)
+_db_commits: dict[str, int] = defaultdict(int)
+_db_query_duration = Histogram(QUERY_BUCKETS)
+
+
+def request_db_stats() -> Optional[QueryRecorder]:
+    return current_recorder()
+
+
+def _route_of(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED
+
+
+class MetricsMiddleware:
+    """Instrumentação HTTP (ASGI puro, mesmo padrão de app/core/middlewares.py)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        global _http_in_flight
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500  # se a app estourar sem responder
+        # request_id já está no scope: RequestIDMiddleware roda por fora
+        stats, token = start_recording(scope.get("state", {}).get("request_id"))
+
+        async def send_capturing_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        _http_in_flight += 1
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_capturing_status)
+        finally:
+            duracao = time.perf_counter() - inicio
+            _http_in_flight -= 1
+            stop_recording(token)
+            route, method = _route_of(scope), scope["method"]
+            stats.check(method, route)
+            _http_duration[(method, route)].observe(duracao)
+            _http_status[(method, route, status_code)] += 1
+            _db_queries[route] += stats.queries
+            _db_seconds[route] += stats.seconds
+            _db_commits[route] += stats.commits
+
+
+# ---- SQLAlchemy ----
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_t0", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info["_metrics_t0"].pop()
+    duracao = time.perf_counter() - inicio
+    _db_query_duration.observe(duracao)
+    rec = current_recorder()
+    if rec is not None:
+        rec.record(statement, parameters, duracao)
+
+
+def _commit(conn):
+    rec = current_recorder()
+    if rec is not None:
+        rec.commits += 1
+
+
+def _handle_error(exception_context):
+    pilha = exception_context.connection.info.get("_metrics_t0") if exception_context.connection else None
+    if pilha:
+        pilha.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra os hooks no engine (sync_engine, no caso do AsyncEngine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    event.listen(engine, "commit", _commit)
+
+
+# ---- exposição ----
+def _esc(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**kv) -> str:
+    return "{" + ",".join(f'{k}="{_esc(str(v))}"' for k, v in kv.items()) + "}"
+
+
+def _histogram_lines(nome: str, hist: Histogram, **labels) -> list[str]:
+    linhas = []
+    acumulado = 0
+    for limite, n in zip(hist.buckets, hist.counts):
+        acumulado += n
+        linhas.append(f"{nome}_bucket{_labels(**labels, le=f'{limite:g}')} {acumulado}")
+    linhas.append(f"{nome}_bucket{_labels(**labels, le='+Inf')} {hist.total}")
+    sufixo = _labels(**labels) if labels else ""
+    linhas.append(f"{nome}_sum{sufixo} {hist.sum}")
+    linhas.append(f"{nome}_count{sufixo} {hist.total}")
+    return linhas
+
+
+def render_prometheus() -> str:
+    linhas = [
+        "# HELP http_requests_in_flight Requests HTTP em andamento.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {_http_in_flight}",
+        "# HELP http_requests_total Requests HTTP por rota e status.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status_code), n in sorted(_http_status.items()):
+        linhas.append(f"http_requests_total{_labels(method=method, route=route, status=status_code)} {n}")
+
+    linhas += [
+        "# HELP http_request_duration_seconds Latência dos requests HTTP por rota.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), hist in sorted(_http_duration.items()):
+        linhas += _histogram_lines("http_request_duration_seconds", hist, method=method, route=route)
+
+    linhas += [
+        "# HELP db_queries_total Queries SQL executadas, por rota HTTP.",
+        "# TYPE db_queries_total counter",
+    ]
+    for route, n in sorted(_db_queries.items()):
+        linhas.append(f"db_queries_total{_labels(route=route)} {n}")
+
+    linhas += [
+        "# HELP db_query_seconds_total Tempo gasto em queries SQL, por rota HTTP.",
+        "# TYPE db_query_seconds_total counter",
+    ]
+    for route, s in sorted(_db_seconds.items()):
+        linhas.append(f"db_query_seconds_total{_labels(route=route)} {s}")
+
+    linhas += [
+        "# HELP db_commits_total Commits de transação, por rota HTTP.",
+        "# TYPE db_commits_total counter",
+    ]
+    for route, n in sorted(_db_commits.items()):
+        linhas.append(f"db_commits_total{_labels(route=route)} {n}")
+
+    linhas += [
+        "# HELP db_query_duration_seconds Duração de cada query SQL.",
+        "# TYPE db_query_duration_seconds histogram",
+    ]
+    linhas += _histogram_lines("db_query_duration_seconds", _db_query_duration)
+    return "\n".join(linhas) + "\n"
@@ -1,16 +1,83 @@
 import uuid
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.api import fail
+
+# Middlewares em ASGI puro (sem BaseHTTPMiddleware): não criam task/stream
+# extra por request e não quebram StreamingResponse.
+
+class RequestIDMiddleware:
+    """
+    Lê o X-Request-Id do cliente (ou gera um UUID), guarda em
+    scope["state"]["request_id"] (→ request.state.request_id) e devolve o
+    mesmo valor no header da resposta.
+    """
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
     def __init__(self, app: ASGIApp, header_name: str = "X-Request-Id") -> None:
-        super().__init__(app)
+        self.app = app
         self.header_name = header_name
+        self._header_key = header_name.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = None
+        for k, v in scope["headers"]:
+            if k == self._header_key:
+                rid = v.decode("latin-1")
+                break
+        if not rid:
+            rid = str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = rid
+        raw_rid = rid.encode("latin-1")
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = [h for h in message.get("headers", []) if h[0].lower() != self._header_key]
+                headers.append((self._header_key, raw_rid))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
+
+
+class ExceptionEnvelopeMiddleware:
+    """
+    Catch-all: exceção não tratada vira 500 no envelope padrão (fail).
+    HTTPException/validação/IntegrityError já são convertidas antes, pelos
+    exception handlers. Se a resposta já começou (streaming), não há como
+    trocar o status: a exceção é repassada e a conexão é encerrada.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
-    async def dispatch(self, request, call_next):
-        rid = request.headers.get(self.header_name) or str(uuid.uuid4())
-        request.state.request_id = rid
-        response: Response = await call_next(request)
-        response.headers[self.header_name] = rid
-        return response
+        try:
+            await self.app(scope, receive, send_tracking)
+        except Exception as e:
+            if response_started:
+                raise
+            payload = fail(
+                message="Erro interno no servidor",
+                errors=str(e),
+                status_code=500,
+                request=Request(scope),
+            )
+            await JSONResponse(status_code=500, content=payload)(scope, receive, send)
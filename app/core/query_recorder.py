@@ -0,0 +1,122 @@
+"""
+Gravador de queries por request (ligado ao request_id do RequestIDMiddleware).
+
+Alimentado pelos eventos do engine (app/core/metrics.py). No fim do request,
+check() loga UM warning estruturado (JSON, logger "usinagem.queries") se:
+- o request passou do orçamento de queries (QUERY_BUDGET_COUNT) ou de tempo
+  de banco (QUERY_BUDGET_MS);
+- alguma query isolada passou de SLOW_QUERY_MS;
+- o mesmo SQL rodou com N_PLUS_ONE_MIN_REPEATS ou mais parâmetros
+  diferentes (candidato a N+1: busca item a item em vez de IN/JOIN).
+
+O SQL do SQLAlchemy já vem parametrizado, então "mesmo statement" = mesmo texto.
+"""
+import json
+import logging
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from app.core.settings import get_settings
+
+settings = get_settings()
+logger = logging.getLogger("usinagem.queries")
+
+_SQL_MAX = 300  # caracteres de SQL no log
+
+
+class _Statement:
+    __slots__ = ("execucoes", "params", "segundos")
+
+    def __init__(self) -> None:
+        self.execucoes = 0
+        self.params: set[str] = set()
+        self.segundos = 0.0
+
+
+class QueryRecorder:
+    def __init__(self, request_id: Optional[str] = None) -> None:
+        self.request_id = request_id
+        self.queries = 0
+        self.seconds = 0.0
+        self.commits = 0
+        self._por_sql: dict[str, _Statement] = {}
+        self._lentas: list[tuple[str, float]] = []
+
+    def record(self, statement: str, parameters: Any, duracao: float) -> None:
+        self.queries += 1
+        self.seconds += duracao
+        if not settings.QUERY_RECORDER_ENABLED:
+            return
+        st = self._por_sql.get(statement)
+        if st is None:
+            st = self._por_sql[statement] = _Statement()
+        st.execucoes += 1
+        st.segundos += duracao
+        # basta saber se passou do limite; não guarda parâmetros além disso
+        if len(st.params) < settings.N_PLUS_ONE_MIN_REPEATS:
+            st.params.add(repr(parameters))
+        if settings.SLOW_QUERY_MS and duracao * 1000 >= settings.SLOW_QUERY_MS:
+            self._lentas.append((statement, duracao))
+
+    def n_plus_one(self) -> list[dict]:
+        return [
+            {
+                "sql": sql[:_SQL_MAX],
+                "executions": st.execucoes,
+                "db_time_ms": round(st.segundos * 1000, 2),
+            }
+            for sql, st in self._por_sql.items()
+            if settings.N_PLUS_ONE_MIN_REPEATS and len(st.params) >= settings.N_PLUS_ONE_MIN_REPEATS
+        ]
+
+    def check(self, method: str, route: str) -> Optional[dict]:
+        """Loga e devolve o evento se algum limite foi violado (senão None)."""
+        if not settings.QUERY_RECORDER_ENABLED:
+            return None
+        problemas = []
+        if settings.QUERY_BUDGET_COUNT and self.queries > settings.QUERY_BUDGET_COUNT:
+            problemas.append("query_count")
+        if settings.QUERY_BUDGET_MS and self.seconds * 1000 > settings.QUERY_BUDGET_MS:
+            problemas.append("query_time")
+        if self._lentas:
+            problemas.append("slow_query")
+        n1 = self.n_plus_one()
+        if n1:
+            problemas.append("n_plus_one")
+        if not problemas:
+            return None
+
+        evento = {
+            "event": "query_budget",
+            "problems": problemas,
+            "request_id": self.request_id,
+            "method": method,
+            "route": route,
+            "queries": self.queries,
+            "db_time_ms": round(self.seconds * 1000, 2),
+            "budget": {"queries": settings.QUERY_BUDGET_COUNT, "db_time_ms": settings.QUERY_BUDGET_MS},
+            "slow_queries": [
+                {"sql": sql[:_SQL_MAX], "ms": round(d * 1000, 2)}
+                for sql, d in sorted(self._lentas, key=lambda x: -x[1])[:5]
+            ],
+            "n_plus_one": n1,
+        }
+        logger.warning(json.dumps(evento, ensure_ascii=False))
+        return evento
+
+
+_current: ContextVar[Optional[QueryRecorder]] = ContextVar("query_recorder", default=None)
+
+
+def current_recorder() -> Optional[QueryRecorder]:
+    return _current.get()
+
+
+def start_recording(request_id: Optional[str] = None):
+    """Inicia o gravador do request; devolve (recorder, token p/ reset)."""
+    rec = QueryRecorder(request_id)
+    return rec, _current.set(rec)
+
+
+def stop_recording(token) -> None:
+    _current.reset(token)
@@ -1,6 +1,10 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 
@@ -16,6 +20,96 @@ def hash_password(plain: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+class _PoolSenhas:
+    """
+    Pool dedicado (e limitado) para bcrypt, fora do event loop.
+    - `workers` threads (o bcrypt libera o GIL durante o hash).
+    - No máximo `max_queue` tarefas esperando; acima disso → 429 com Retry-After,
+      em vez de acumular logins e estourar a latência de todo mundo.
+    - O executor é criado sob demanda (seguro com workers que fazem fork).
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0       # executando + na fila
+        self.max_in_flight = 0
+        self.submitted = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self._exec_total = 0.0
+        self._done = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="senha")
+        return self._executor
+
+    def _release(self, espera: float, execucao: float) -> None:
+        self.in_flight -= 1
+        self._done += 1
+        self._wait_total += espera
+        self._exec_total += execucao
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Servidor ocupado. Tente novamente em instantes.",
+                headers={"Retry-After": "1"},
+            )
+
+        loop = asyncio.get_running_loop()
+        enfileirado = time.perf_counter()
+
+        def _job():
+            inicio = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                fim = time.perf_counter()
+                # a contagem só cai quando o hash termina de fato (mesmo se o
+                # request for cancelado), senão a fila real passaria do limite
+                loop.call_soon_threadsafe(self._release, inicio - enfileirado, fim - inicio)
+
+        self.in_flight += 1
+        self.submitted += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            fut = self._get_executor().submit(_job)
+        except BaseException:
+            self.in_flight -= 1
+            raise
+        return await asyncio.wrap_future(fut)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "max_in_flight": self.max_in_flight,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._wait_total / self._done * 1000, 2) if self._done else None,
+            "avg_exec_ms": round(self._exec_total / self._done * 1000, 2) if self._done else None,
+        }
+
+_pool_senhas = _PoolSenhas(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
+async def hash_password_async(plain: str) -> str:
+    """hash_password no pool de senhas (não bloqueia o event loop)."""
+    return await _pool_senhas.run(hash_password, plain)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """verify_password no pool de senhas (não bloqueia o event loop)."""
+    return await _pool_senhas.run(verify_password, plain, hashed)
+
+def password_pool_stats() -> dict:
+    return _pool_senhas.stats()
+
 # ---- JWT ----
 def _expire_in(minutes: int = 15) -> datetime:
     return datetime.now(tz=timezone.utc) + timedelta(minutes=minutes)
@@ -1,5 +1,11 @@
 # Sessão assíncrona da aplicação (Alembic continua sync)
+import time
+
+from sqlalchemy import event, exc as sa_exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.metrics import instrument_engine
 from app.core.settings import get_settings
 
 settings = get_settings()
@@ -22,13 +28,117 @@ def _to_async_url(url: str) -> str:
 
 ASYNC_DATABASE_URL = _to_async_url(settings.DATABASE_URL)
 
+
+class MeteredPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool que mede o checkout (espera por conexão livre +
+    abertura/pre-ping) e conta timeouts. Lido por pool_stats() no /health.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conn = super().connect()
+        except sa_exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        espera = time.perf_counter() - inicio
+        self.checkouts += 1
+        self.wait_total += espera
+        self.wait_max = max(self.wait_max, espera)
+        return conn
+
+
+def _engine_kwargs(url: str) -> dict:
+    """Opções de pool/driver conforme o backend (ver DB_* em Settings)."""
+    u = make_url(url)
+    kwargs: dict = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+
+    if u.get_backend_name() == "sqlite" and u.database in (None, "", ":memory:"):
+        # SQLite em memória: StaticPool (conexão única) — sem tamanho de pool
+        return kwargs
+
+    kwargs.update(
+        poolclass=MeteredPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+
+    if u.get_driver_name() == "asyncpg":
+        connect_args: dict = {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+        if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+        kwargs["connect_args"] = connect_args
+
+    return kwargs
+
+
 engine = create_async_engine(
     ASYNC_DATABASE_URL,
-    pool_pre_ping=True,
+    **_engine_kwargs(ASYNC_DATABASE_URL),
 )
 
+instrument_engine(engine.sync_engine)  # contagem/tempo de queries (/metrics)
+
 SessionLocal = async_sessionmaker(
     bind=engine,
     expire_on_commit=False,
     class_=AsyncSession,
 )
+
+
+def pool_stats() -> dict:
+    """Estado do pool para o /health."""
+    pool = engine.pool
+    if not isinstance(pool, MeteredPool):
+        return {"class": type(pool).__name__}
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout_seconds": settings.DB_POOL_TIMEOUT,
+        "pre_ping": settings.DB_POOL_PRE_PING,
+        "checkouts": pool.checkouts,
+        "timeouts": pool.timeouts,
+        "avg_wait_ms": round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else None,
+        "max_wait_ms": round(pool.wait_max * 1000, 3),
+    }
+
+
+def apos_commit(db: AsyncSession, fn, *args) -> None:
+    """
+    Agenda fn(*args) para depois do commit da transação atual da sessão
+    (descartado em rollback). Repositórios só dão flush; efeitos fora do
+    banco — como invalidar caches — esperam o commit da unidade de trabalho,
+    senão outro request poderia recarregar o cache com o valor antigo.
+    """
+    pendentes = db.info.get("apos_commit")
+    if pendentes is None:
+        pendentes = db.info["apos_commit"] = []
+        event.listen(db.sync_session, "after_commit", _rodar_apos_commit)
+        event.listen(db.sync_session, "after_rollback", _descartar_apos_commit)
+    pendentes.append((fn, args))
+
+
+def _rodar_apos_commit(session) -> None:
+    pendentes, session.info["apos_commit"] = session.info["apos_commit"], []
+    for fn, args in pendentes:
+        fn(*args)
+
+
+def _descartar_apos_commit(session) -> None:
+    session.info["apos_commit"] = []
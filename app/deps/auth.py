@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import decode_token
 from app.deps.db import get_db
-from app.repositories.user import get_by_email
+from app.repositories.user import get_auth_user
 
 # Security scheme (faz o Swagger enviar Authorization: Bearer <token>)
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -30,7 +30,9 @@ async def get_current_user(
     if not email:
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
-    user = await get_by_email(db, email)
+    # Snapshot em cache (AuthUser): papéis e is_active sem ir ao banco a cada
+    # request. Rotas que alteram o próprio usuário carregam o ORM por id.
+    user = await get_auth_user(db, email)
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="Inactive or not found")
     return user
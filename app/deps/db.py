@@ -1,8 +1,28 @@
-# Dependência FastAPI para injetar sessão de DB nas rotas/serviços
+# Dependências FastAPI para injetar sessão de DB nas rotas/serviços
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import SessionLocal
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Sessão sem commit automático: para leituras, e a válvula de escape das
+    rotas que precisam de commits intermediários (chamam db.commit() elas mesmas).
+    """
     async with SessionLocal() as session:
         yield session
+
+async def get_uow() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Unidade de trabalho do request: os repositórios só dão flush e o commit
+    acontece uma vez, aqui, quando a rota termina sem erro (antes de a
+    resposta ser enviada — erro no commit ainda vira resposta de erro).
+    Qualquer exceção, inclusive HTTPException, desfaz tudo.
+    """
+    async with SessionLocal() as session:
+        try:
+            yield session
+        except BaseException:
+            await session.rollback()
+            raise
+        if session.in_transaction():
+            await session.commit()
@@ -1,25 +1,51 @@
 from pydantic import BaseModel, Field
 from fastapi import Query
-from typing import Optional
+from typing import Any, Optional, Sequence
+
+from app.core.cursor import decode_cursor, next_cursor
 
 DEFAULT_PAGE = 1
 DEFAULT_SIZE = 50
 MAX_SIZE = 200
 
 class PageParams(BaseModel):
+    """
+    Dois modos:
+    - página (legado): ?page=&size= → OFFSET/LIMIT
+    - cursor: ?after=<cursor>&size= → keyset (page é ignorado)
+    """
     page: int = Field(DEFAULT_PAGE, ge=1)
     size: int = Field(DEFAULT_SIZE, ge=1, le=MAX_SIZE)
+    after: Optional[str] = None
 
     @property
     def skip(self) -> int:
-        return (self.page - 1) * self.size
+        return 0 if self.after else (self.page - 1) * self.size
 
     @property
     def limit(self) -> int:
         return self.size
 
+    @property
+    def cursor(self) -> Optional[list]:
+        """Valores decodificados de `after` (None no modo página)."""
+        return decode_cursor(self.after) if self.after else None
+
+    def meta(self, items: Sequence[Any], ordem: Sequence[Any]) -> dict:
+        """meta do envelope ok(), com next_cursor para a página seguinte."""
+        base = {"after": self.after} if self.after else {"page": self.page}
+        return {
+            **base,
+            "size": self.size,
+            "count": len(items),
+            "next_cursor": next_cursor(items, ordem, self.size),
+        }
+
 def get_pagination(
     page: int = Query(DEFAULT_PAGE, ge=1),
     size: int = Query(DEFAULT_SIZE, ge=1, le=MAX_SIZE),
+    after: Optional[str] = Query(None, description="Cursor opaco (meta.next_cursor da página anterior)"),
 ) -> PageParams:
-    return PageParams(page=page, size=size)
+    if after:
+        decode_cursor(after)  # valida cedo → 400
+    return PageParams(page=page, size=size, after=after)
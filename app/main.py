@@ -1,8 +1,11 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.settings import get_settings
 from app.api.v1.endpoints.health import router as health_router
+from app.api.v1.endpoints.metrics import router as metrics_router
 from app.api.v1.endpoints.clientes import router as clientes_router
 from app.api.v1.endpoints.auth import router as auth_router
 from app.api.v1.endpoints.fornecedores import router as fornecedores_router
@@ -18,10 +21,19 @@ from app.api.v1.endpoints.orcamentos import router as orcamentos_router
 from app.api.v1.endpoints.orcamento_itens import router as orcamento_itens_router
 
 from app.core.error_handlers import register_error_handlers
-from app.core.middlewares import RequestIDMiddleware
+from app.core.middlewares import ExceptionEnvelopeMiddleware, RequestIDMiddleware
+from app.core.metrics import MetricsMiddleware
+from app.core.loop_lag import monitor as loop_lag_monitor
 
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # amostragem do lag do event loop para o /health/ready
+    loop_lag_monitor.iniciar()
+    yield
+    await loop_lag_monitor.parar()
+
 def create_app() -> FastAPI:
     """
     Fábrica da aplicação para facilitar testes e futuras configurações.
@@ -30,11 +42,17 @@ def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.PROJECT_NAME,
         version=settings.VERSION,
-        description="Backend inicial do sistema de gestão de usinagem."
+        description="Backend inicial do sistema de gestão de usinagem.",
+        lifespan=lifespan,
     )
 
+    # Handlers globais
+    register_error_handlers(app)             # <-- registra handlers
+
+    # Middlewares (ASGI puro). add_middleware empilha por fora, então a ordem
+    # final é: RequestID → métricas → CORS → catch-all de exceções → rotas.
+    app.add_middleware(ExceptionEnvelopeMiddleware)
     # CORS: em dev liberado; em prod restrito (defina CORS_ORIGINS no ambiente)
-    app.add_middleware(RequestIDMiddleware)  # <-- Request ID
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.CORS_ORIGINS,
@@ -42,9 +60,11 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(MetricsMiddleware)    # <-- latência/status por rota (/metrics)
+    app.add_middleware(RequestIDMiddleware)  # <-- Request ID (mais externo)
 
-    # Handlers globais
-    register_error_handlers(app)             # <-- registra handlers
+    # Métricas (formato Prometheus), fora do prefixo versionado
+    app.include_router(metrics_router, tags=["Metrics"])
 
     # Rotas v1
     app.include_router(health_router, prefix="/api/v1", tags=["Health"])
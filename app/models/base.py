@@ -7,6 +7,11 @@ class Base(DeclarativeBase):
     pass
 
 class TimeStampedMixin:
+    # Busca created_at/updated_at (server defaults) no próprio INSERT/UPDATE
+    # via RETURNING (Postgres; SQLite >= 3.35), sem refresh depois do flush.
+    # Sem suporte a RETURNING, o SQLAlchemy cai para um SELECT após o flush.
+    __mapper_args__ = {"eager_defaults": True}
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
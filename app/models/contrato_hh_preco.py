@@ -1,5 +1,6 @@
+from datetime import date
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ForeignKey, String, Numeric, UniqueConstraint, Integer
+from sqlalchemy import ForeignKey, String, Numeric, UniqueConstraint, Integer, Date
 from app.models.base import Base, IDMixin, TimeStampedMixin
 
 # Tipos de hora: REGULAR | EXTRA | FERIADO
@@ -8,6 +9,10 @@ TIPO_HH_EXTRA = "EXTRA"
 TIPO_HH_FERIADO = "FERIADO"
 TIPOS_HH = (TIPO_HH_REGULAR, TIPO_HH_EXTRA, TIPO_HH_FERIADO)
 
+# Início de vigência de preço cadastrado sem data ("desde sempre").
+# Não é NULL para poder entrar na chave única (contrato, ..., valido_de).
+VIGENCIA_INICIAL = date(1900, 1, 1)
+
 class ContratoHHPreco(Base, IDMixin, TimeStampedMixin):
     __tablename__ = "contrato_hh_precos"
 
@@ -28,6 +33,14 @@ class ContratoHHPreco(Base, IDMixin, TimeStampedMixin):
         ForeignKey("unidades_medida.id", ondelete="RESTRICT"), nullable=False, index=True
     )
 
+    # Vigência: vale, entre os registros cujo [valido_de, valido_ate] contém a
+    # data (valido_ate inclusive e opcional), o de maior valido_de. Um preço
+    # temporário sobrepõe o permanente só no seu intervalo; fora dele, o
+    # permanente volta a valer.
+    valido_de: Mapped[date] = mapped_column(Date, nullable=False, default=VIGENCIA_INICIAL)
+    valido_ate: Mapped[date | None] = mapped_column(Date, nullable=True)
+
+    # A chave única também é o índice da busca "último valido_de <= data"
     __table_args__ = (
-        UniqueConstraint("contrato_id", "maquina_id", "tipo_hh", name="uq_contrato_maquina_tipo"),
+        UniqueConstraint("contrato_id", "maquina_id", "tipo_hh", "valido_de", name="uq_contrato_maquina_tipo_vigencia"),
     )
@@ -1,6 +1,8 @@
+from datetime import date
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import ForeignKey, Numeric, UniqueConstraint, Integer
+from sqlalchemy import ForeignKey, Numeric, UniqueConstraint, Integer, Date
 from app.models.base import Base, IDMixin, TimeStampedMixin
+from app.models.contrato_hh_preco import VIGENCIA_INICIAL
 
 class ContratoMaterialPreco(Base, IDMixin, TimeStampedMixin):
     __tablename__ = "contrato_material_precos"
@@ -17,6 +19,10 @@ class ContratoMaterialPreco(Base, IDMixin, TimeStampedMixin):
     )
     preco_unitario: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
 
+    # Vigência (mesma regra de ContratoHHPreco)
+    valido_de: Mapped[date] = mapped_column(Date, nullable=False, default=VIGENCIA_INICIAL)
+    valido_ate: Mapped[date | None] = mapped_column(Date, nullable=True)
+
     __table_args__ = (
-        UniqueConstraint("contrato_id", "material_id", name="uq_contrato_material"),
+        UniqueConstraint("contrato_id", "material_id", "valido_de", name="uq_contrato_material_vigencia"),
     )
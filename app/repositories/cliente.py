@@ -3,19 +3,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.cliente import Cliente
 from app.schemas.cliente import ClienteCreate, ClienteUpdate
+from app.core.cursor import apply_page
 
 async def create(db: AsyncSession, data: ClienteCreate) -> Cliente:
     obj = Cliente(nome=data.nome, email=data.email, telefone=data.telefone)
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def get(db: AsyncSession, cliente_id: int) -> Optional[Cliente]:
     return await db.get(Cliente, cliente_id)
 
-async def list_(db: AsyncSession, skip: int = 0, limit: int = 50) -> list[Cliente]:
-    res = await db.execute(select(Cliente).offset(skip).limit(limit))
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (Cliente.id,)
+
+async def list_(db: AsyncSession, skip: int = 0, limit: int = 50, after: list | None = None) -> list[Cliente]:
+    res = await db.execute(apply_page(select(Cliente), ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def update(db: AsyncSession, cliente_id: int, data: ClienteUpdate) -> Optional[Cliente]:
@@ -24,8 +27,7 @@ async def update(db: AsyncSession, cliente_id: int, data: ClienteUpdate) -> Opti
         return None
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(obj, field, value)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def delete(db: AsyncSession, cliente_id: int) -> bool:
@@ -33,5 +35,5 @@ async def delete(db: AsyncSession, cliente_id: int) -> bool:
     if not obj:
         return False
     await db.delete(obj)
-    await db.commit()
+    await db.flush()
     return True
@@ -3,22 +3,29 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.contrato import Contrato
 from app.schemas.contrato import ContratoCreate, ContratoUpdate
+from app.services.precos_contrato import invalidar_cache_contrato
+from app.db.session import apos_commit
+from app.core.cursor import apply_page
 
 async def create(db: AsyncSession, data: ContratoCreate) -> Contrato:
     obj = Contrato(**data.model_dump())
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def get(db: AsyncSession, contrato_id: int) -> Optional[Contrato]:
     return await db.get(Contrato, contrato_id)
 
-async def list_(db: AsyncSession, skip: int = 0, limit: int = 50, cliente_id: int | None = None) -> List[Contrato]:
-    stmt = select(Contrato).order_by(Contrato.id).offset(skip).limit(limit)
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (Contrato.id,)
+
+async def list_(
+    db: AsyncSession, skip: int = 0, limit: int = 50, cliente_id: int | None = None, after: list | None = None
+) -> List[Contrato]:
+    stmt = select(Contrato)
     if cliente_id:
-        stmt = select(Contrato).where(Contrato.cliente_id == cliente_id).order_by(Contrato.id).offset(skip).limit(limit)
-    res = await db.execute(stmt)
+        stmt = stmt.where(Contrato.cliente_id == cliente_id)
+    res = await db.execute(apply_page(stmt, ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def update(db: AsyncSession, contrato_id: int, data: ContratoUpdate) -> Optional[Contrato]:
@@ -27,8 +34,9 @@ async def update(db: AsyncSession, contrato_id: int, data: ContratoUpdate) -> Op
         return None
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(obj, k, v)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
+    # defaults de preço podem ter mudado
+    apos_commit(db, invalidar_cache_contrato, contrato_id)
     return obj
 
 async def delete(db: AsyncSession, contrato_id: int) -> bool:
@@ -36,5 +44,6 @@ async def delete(db: AsyncSession, contrato_id: int) -> bool:
     if not obj:
         return False
     await db.delete(obj)
-    await db.commit()
+    await db.flush()
+    apos_commit(db, invalidar_cache_contrato, contrato_id)
     return True
@@ -1,19 +1,29 @@
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
-from app.models.contrato_hh_preco import ContratoHHPreco
+from fastapi import HTTPException, status
+from app.models.contrato_hh_preco import ContratoHHPreco, VIGENCIA_INICIAL
+from app.models.maquina import Maquina
+from app.models.unidade_medida import UnidadeMedida
 from app.schemas.contrato_hh_preco import ContratoHHPrecoCreate, ContratoHHPrecoUpdate
+from app.services.precos_contrato import invalidar_cache_contrato
+from app.db.session import apos_commit
+from app.services.importacao import Catalogo, importar_tabela, numero, vigencia
+from app.core.cursor import apply_page
 
 async def create(db: AsyncSession, data: ContratoHHPrecoCreate) -> ContratoHHPreco:
     obj = ContratoHHPreco(**data.model_dump())
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
+    apos_commit(db, invalidar_cache_contrato, obj.contrato_id)
     return obj
 
 async def get(db: AsyncSession, preco_id: int) -> Optional[ContratoHHPreco]:
     return await db.get(ContratoHHPreco, preco_id)
 
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (ContratoHHPreco.id,)
+
 async def list_(
     db: AsyncSession,
     skip: int = 0,
@@ -21,8 +31,9 @@ async def list_(
     contrato_id: int | None = None,
     maquina_id: int | None = None,
     tipo_hh: str | None = None,
+    after: list | None = None,
 ) -> List[ContratoHHPreco]:
-    stmt = select(ContratoHHPreco).order_by(ContratoHHPreco.id).offset(skip).limit(limit)
+    stmt = select(ContratoHHPreco)
     if contrato_id or maquina_id or tipo_hh:
         conds = []
         if contrato_id:
@@ -31,8 +42,8 @@ async def list_(
             conds.append(ContratoHHPreco.maquina_id == maquina_id)
         if tipo_hh:
             conds.append(ContratoHHPreco.tipo_hh == tipo_hh)
-        stmt = select(ContratoHHPreco).where(and_(*conds)).order_by(ContratoHHPreco.id).offset(skip).limit(limit)
-    res = await db.execute(stmt)
+        stmt = stmt.where(and_(*conds))
+    res = await db.execute(apply_page(stmt, ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def update(db: AsyncSession, preco_id: int, data: ContratoHHPrecoUpdate) -> Optional[ContratoHHPreco]:
@@ -41,14 +52,67 @@ async def update(db: AsyncSession, preco_id: int, data: ContratoHHPrecoUpdate) -
         return None
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(obj, k, v)
-    await db.commit()
-    await db.refresh(obj)
+    if obj.valido_de is None:
+        obj.valido_de = VIGENCIA_INICIAL
+    if obj.valido_ate is not None and obj.valido_ate < obj.valido_de:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="valido_ate deve ser maior ou igual a valido_de.",
+        )
+    await db.flush()
+    apos_commit(db, invalidar_cache_contrato, obj.contrato_id)
     return obj
 
 async def delete(db: AsyncSession, preco_id: int) -> bool:
     obj = await db.get(ContratoHHPreco, preco_id)
     if not obj:
         return False
+    contrato_id = obj.contrato_id
     await db.delete(obj)
-    await db.commit()
+    await db.flush()
+    apos_commit(db, invalidar_cache_contrato, contrato_id)
     return True
+
+async def importar(
+    db: AsyncSession,
+    contrato_id: int,
+    registros: AsyncIterator[tuple[int, dict]],
+    atomico: bool = False,
+) -> dict:
+    """
+    Importa a tabela de HH do contrato (upsert por contrato+máquina+tipo_hh+valido_de).
+    Colunas: maquina (nome) ou maquina_id; tipo_hh; preco_hora; opcional
+    uom (símbolo) ou uom_id — sem UoM, usa a UoM de HH da máquina; opcionais
+    valido_de/valido_ate (sem valido_de, a vigência "desde sempre").
+    Laço, lotes e resumo: importacao.importar_tabela.
+    """
+    maquinas = Catalogo(
+        (await db.execute(select(Maquina.id, Maquina.nome, Maquina.uom_hh_id))).all(),
+        nome="nome", nao_encontrado="Máquina não encontrada",
+    )
+    uoms = Catalogo(
+        (await db.execute(select(UnidadeMedida.id, UnidadeMedida.simbolo))).all(),
+        nome="simbolo", nao_encontrado="Unidade de medida não encontrada",
+    )
+
+    def para_schema(reg: dict) -> ContratoHHPrecoCreate:
+        maq = maquinas.resolver(reg, "maquina")
+        uom = uoms.resolver(reg, "uom", opcional=True)
+        return ContratoHHPrecoCreate(
+            contrato_id=contrato_id,
+            maquina_id=maq.id,
+            tipo_hh=(reg.get("tipo_hh") or "").upper(),
+            uom_id=uom.id if uom else maq.uom_hh_id,
+            preco_hora=numero(reg.get("preco_hora")),
+            **vigencia(reg),
+        )
+
+    return await importar_tabela(
+        db, contrato_id, registros,
+        model=ContratoHHPreco,
+        chave=("contrato_id", "maquina_id", "tipo_hh", "valido_de"),
+        atualizar=("preco_hora", "uom_id", "valido_ate"),
+        obrigatorios=(("maquina", "maquina_id"), "tipo_hh", "preco_hora"),
+        para_schema=para_schema,
+        atomico=atomico,
+    )
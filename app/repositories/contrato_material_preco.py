@@ -1,37 +1,49 @@
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
+from fastapi import HTTPException, status
 from app.models.contrato_material_preco import ContratoMaterialPreco
+from app.models.contrato_hh_preco import VIGENCIA_INICIAL
+from app.models.material import Material
+from app.models.unidade_medida import UnidadeMedida
 from app.schemas.contrato_material_preco import (
     ContratoMaterialPrecoCreate, ContratoMaterialPrecoUpdate
 )
+from app.services.precos_contrato import invalidar_cache_contrato
+from app.db.session import apos_commit
+from app.services.importacao import Catalogo, importar_tabela, numero, vigencia
+from app.core.cursor import apply_page
 
 async def create(db: AsyncSession, data: ContratoMaterialPrecoCreate) -> ContratoMaterialPreco:
     obj = ContratoMaterialPreco(**data.model_dump())
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
+    apos_commit(db, invalidar_cache_contrato, obj.contrato_id)
     return obj
 
 async def get(db: AsyncSession, preco_id: int) -> Optional[ContratoMaterialPreco]:
     return await db.get(ContratoMaterialPreco, preco_id)
 
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (ContratoMaterialPreco.id,)
+
 async def list_(
     db: AsyncSession,
     skip: int = 0,
     limit: int = 50,
     contrato_id: int | None = None,
     material_id: int | None = None,
+    after: list | None = None,
 ) -> List[ContratoMaterialPreco]:
-    stmt = select(ContratoMaterialPreco).order_by(ContratoMaterialPreco.id).offset(skip).limit(limit)
+    stmt = select(ContratoMaterialPreco)
     if contrato_id or material_id:
         conds = []
         if contrato_id:
             conds.append(ContratoMaterialPreco.contrato_id == contrato_id)
         if material_id:
             conds.append(ContratoMaterialPreco.material_id == material_id)
-        stmt = select(ContratoMaterialPreco).where(and_(*conds)).order_by(ContratoMaterialPreco.id).offset(skip).limit(limit)
-    res = await db.execute(stmt)
+        stmt = stmt.where(and_(*conds))
+    res = await db.execute(apply_page(stmt, ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def update(db: AsyncSession, preco_id: int, data: ContratoMaterialPrecoUpdate) -> Optional[ContratoMaterialPreco]:
@@ -40,14 +52,66 @@ async def update(db: AsyncSession, preco_id: int, data: ContratoMaterialPrecoUpd
         return None
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(obj, k, v)
-    await db.commit()
-    await db.refresh(obj)
+    if obj.valido_de is None:
+        obj.valido_de = VIGENCIA_INICIAL
+    if obj.valido_ate is not None and obj.valido_ate < obj.valido_de:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="valido_ate deve ser maior ou igual a valido_de.",
+        )
+    await db.flush()
+    apos_commit(db, invalidar_cache_contrato, obj.contrato_id)
     return obj
 
 async def delete(db: AsyncSession, preco_id: int) -> bool:
     obj = await db.get(ContratoMaterialPreco, preco_id)
     if not obj:
         return False
+    contrato_id = obj.contrato_id
     await db.delete(obj)
-    await db.commit()
+    await db.flush()
+    apos_commit(db, invalidar_cache_contrato, contrato_id)
     return True
+
+async def importar(
+    db: AsyncSession,
+    contrato_id: int,
+    registros: AsyncIterator[tuple[int, dict]],
+    atomico: bool = False,
+) -> dict:
+    """
+    Importa a tabela de materiais do contrato (upsert por contrato+material+valido_de).
+    Campos: material (nome) ou material_id; preco_unitario; opcional uom
+    (símbolo) ou uom_id — sem UoM, usa a UoM base do material; opcionais
+    valido_de/valido_ate (sem valido_de, a vigência "desde sempre").
+    Laço, lotes e resumo: importacao.importar_tabela.
+    """
+    materiais = Catalogo(
+        (await db.execute(select(Material.id, Material.nome, Material.uom_base_id))).all(),
+        nome="nome", nao_encontrado="Material não encontrado",
+    )
+    uoms = Catalogo(
+        (await db.execute(select(UnidadeMedida.id, UnidadeMedida.simbolo))).all(),
+        nome="simbolo", nao_encontrado="Unidade de medida não encontrada",
+    )
+
+    def para_schema(reg: dict) -> ContratoMaterialPrecoCreate:
+        mat = materiais.resolver(reg, "material")
+        uom = uoms.resolver(reg, "uom", opcional=True)
+        return ContratoMaterialPrecoCreate(
+            contrato_id=contrato_id,
+            material_id=mat.id,
+            uom_id=uom.id if uom else mat.uom_base_id,
+            preco_unitario=numero(reg.get("preco_unitario")),
+            **vigencia(reg),
+        )
+
+    return await importar_tabela(
+        db, contrato_id, registros,
+        model=ContratoMaterialPreco,
+        chave=("contrato_id", "material_id", "valido_de"),
+        atualizar=("preco_unitario", "uom_id", "valido_ate"),
+        obrigatorios=(("material", "material_id"), "preco_unitario"),
+        para_schema=para_schema,
+        atomico=atomico,
+    )
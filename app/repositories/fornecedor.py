@@ -3,19 +3,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.fornecedor import Fornecedor
 from app.schemas.fornecedor import FornecedorCreate, FornecedorUpdate
+from app.core.cursor import apply_page
 
 async def create(db: AsyncSession, data: FornecedorCreate) -> Fornecedor:
     obj = Fornecedor(**data.model_dump())
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def get(db: AsyncSession, fornecedor_id: int) -> Optional[Fornecedor]:
     return await db.get(Fornecedor, fornecedor_id)
 
-async def list_(db: AsyncSession, skip: int = 0, limit: int = 50) -> List[Fornecedor]:
-    res = await db.execute(select(Fornecedor).order_by(Fornecedor.id).offset(skip).limit(limit))
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (Fornecedor.id,)
+
+async def list_(db: AsyncSession, skip: int = 0, limit: int = 50, after: list | None = None) -> List[Fornecedor]:
+    res = await db.execute(apply_page(select(Fornecedor), ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def update(db: AsyncSession, fornecedor_id: int, data: FornecedorUpdate) -> Optional[Fornecedor]:
@@ -24,8 +27,7 @@ async def update(db: AsyncSession, fornecedor_id: int, data: FornecedorUpdate) -
         return None
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(obj, k, v)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def delete(db: AsyncSession, fornecedor_id: int) -> bool:
@@ -33,5 +35,5 @@ async def delete(db: AsyncSession, fornecedor_id: int) -> bool:
     if not obj:
         return False
     await db.delete(obj)
-    await db.commit()
+    await db.flush()
     return True
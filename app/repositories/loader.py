@@ -0,0 +1,143 @@
+"""
+Carregador em lote por request (estilo DataLoader) para buscas por id.
+
+Em vez de `db.get(Model, id)` linha a linha, `get_loader(db).load(Model, id)`
+enfileira o id; tudo que for pedido no mesmo tick do event loop (ex.: vários
+load() sob asyncio.gather, ou load_many) sai em UM `SELECT ... WHERE id IN (...)`
+por modelo. Os resultados (inclusive "não existe") ficam em cache até o fim
+da sessão — e a sessão é por request (deps/db.get_db).
+
+A busca roda na própria task de quem espera (sem task de fundo): o primeiro
+a esperar cede o loop uma vez, para os load() do mesmo tick enfileirarem, e
+drena a fila ele mesmo. Assim um cancelamento interrompe a query dentro da
+task cancelada e nada fica usando a sessão depois que o request termina.
+Se quem drena é cancelado, os ids não buscados voltam para a fila e outro
+que ainda espera assume.
+
+Coerência com a sessão:
+- objetos já no identity map (e não expirados) não geram query;
+- após commit, descarta ausências (podem ter sido criadas) e objetos removidos;
+- após rollback, descarta tudo (os objetos da sessão expiram).
+"""
+import asyncio
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_LOTE_MAX = 500  # ids por IN (limite de parâmetros dos drivers)
+
+
+class Loader:
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.queries = 0
+        self._cache: dict[tuple[type, Any], Any] = {}
+        self._fila: dict[type, dict[Any, asyncio.Future]] = {}
+        self._drenagem: Optional[asyncio.Future] = None  # resolvido ao fim de cada drenagem
+        event.listen(db.sync_session, "after_commit", self._apos_commit)
+        event.listen(db.sync_session, "after_rollback", self._apos_rollback)
+
+    def _da_sessao(self, model: type, id_: Any) -> Any:
+        obj = self.db.identity_map.get(self.db.identity_key(model, id_))
+        if obj is None:
+            return None
+        estado = inspect(obj)
+        return None if (estado.expired_attributes or estado.deleted) else obj
+
+    def _pedir(self, model: type, id_: Any) -> asyncio.Future:
+        """Future do objeto: já resolvido (cache/identity map) ou na fila."""
+        loop = asyncio.get_running_loop()
+        chave = (model, id_)
+        if chave not in self._cache:
+            obj = self._da_sessao(model, id_)
+            if obj is None:
+                fila = self._fila.setdefault(model, {})
+                fut = fila.get(id_)
+                if fut is None:
+                    fut = fila[id_] = loop.create_future()
+                return fut
+            self._cache[chave] = obj
+        fut = loop.create_future()
+        fut.set_result(self._cache[chave])
+        return fut
+
+    async def load(self, model: type, id_: Any) -> Any:
+        """Objeto `model` com esse id, ou None se não existir."""
+        if id_ is None:
+            return None
+        fut = self._pedir(model, id_)
+        await self._esperar([fut])
+        return fut.result()
+
+    async def load_many(self, model: type, ids: Iterable[Any]) -> dict[Any, Any]:
+        """{id: objeto} dos ids existentes (ausentes ficam de fora)."""
+        ids = list(dict.fromkeys(i for i in ids if i is not None))
+        futs = [self._pedir(model, i) for i in ids]
+        await self._esperar(futs)
+        return {i: o for i, o in zip(ids, (f.result() for f in futs)) if o is not None}
+
+    async def _esperar(self, futs: list) -> None:
+        pendentes = [f for f in futs if not f.done()]
+        while pendentes:
+            if self._drenagem is None:
+                await self._drenar()
+            else:
+                # outra task está drenando: espera o resultado ou o fim dela
+                # (se ela foi cancelada, a próxima volta assume a drenagem)
+                await asyncio.wait([*pendentes, self._drenagem], return_when=asyncio.FIRST_COMPLETED)
+            pendentes = [f for f in pendentes if not f.done()]
+
+    async def _drenar(self) -> None:
+        self._drenagem = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.sleep(0)  # deixa os load() prontos neste tick enfileirarem
+            while self._fila:
+                model, fila = self._fila.popitem()
+                try:
+                    achados = await self._buscar(model, list(fila))
+                except asyncio.CancelledError:
+                    # devolve à fila o que ninguém resolveu (inclui o que entrou enquanto isso)
+                    self._fila[model] = {**fila, **self._fila.get(model, {})}
+                    raise
+                except Exception as e:
+                    for fut in fila.values():
+                        if not fut.done():
+                            fut.set_exception(e)
+                    continue
+                for id_, fut in fila.items():
+                    obj = self._cache[(model, id_)] = achados.get(id_)
+                    if not fut.done():
+                        fut.set_result(obj)
+        finally:
+            fim, self._drenagem = self._drenagem, None
+            fim.set_result(None)
+
+    async def _buscar(self, model: type, ids: list) -> dict:
+        if len(ids) == 1:
+            # um id só: db.get (mesma query por PK, sem IN)
+            obj = await self.db.get(model, ids[0])
+            self.queries += 1
+            return {ids[0]: obj} if obj is not None else {}
+        achados = {}
+        for n in range(0, len(ids), _LOTE_MAX):
+            res = await self.db.execute(select(model).where(model.id.in_(ids[n:n + _LOTE_MAX])))
+            self.queries += 1
+            achados.update((o.id, o) for o in res.scalars())
+        return achados
+
+    def _apos_commit(self, session) -> None:
+        self._cache = {
+            k: o for k, o in self._cache.items() if o is not None and not inspect(o).detached
+        }
+
+    def _apos_rollback(self, session) -> None:
+        self._cache.clear()
+
+
+def get_loader(db: AsyncSession) -> Loader:
+    """Loader da sessão (criado no primeiro uso; vive enquanto a sessão viver)."""
+    loader = db.info.get("loader")
+    if loader is None:
+        loader = db.info["loader"] = Loader(db)
+    return loader
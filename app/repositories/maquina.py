@@ -3,19 +3,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.maquina import Maquina
 from app.schemas.maquina import MaquinaCreate, MaquinaUpdate
+from app.core.cursor import apply_page
 
 async def create(db: AsyncSession, data: MaquinaCreate) -> Maquina:
     obj = Maquina(**data.model_dump())
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def get(db: AsyncSession, maquina_id: int) -> Optional[Maquina]:
     return await db.get(Maquina, maquina_id)
 
-async def list_(db: AsyncSession, skip: int = 0, limit: int = 50) -> List[Maquina]:
-    res = await db.execute(select(Maquina).order_by(Maquina.nome).offset(skip).limit(limit))
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (Maquina.nome,)
+
+async def list_(db: AsyncSession, skip: int = 0, limit: int = 50, after: list | None = None) -> List[Maquina]:
+    res = await db.execute(apply_page(select(Maquina), ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def update(db: AsyncSession, maquina_id: int, data: MaquinaUpdate) -> Optional[Maquina]:
@@ -24,8 +27,7 @@ async def update(db: AsyncSession, maquina_id: int, data: MaquinaUpdate) -> Opti
         return None
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(obj, k, v)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def delete(db: AsyncSession, maquina_id: int) -> bool:
@@ -33,5 +35,5 @@ async def delete(db: AsyncSession, maquina_id: int) -> bool:
     if not obj:
         return False
     await db.delete(obj)
-    await db.commit()
+    await db.flush()
     return True
@@ -3,19 +3,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.material import Material
 from app.schemas.material import MaterialCreate, MaterialUpdate
+from app.core.cursor import apply_page
 
 async def create(db: AsyncSession, data: MaterialCreate) -> Material:
     obj = Material(**data.model_dump())
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def get(db: AsyncSession, material_id: int) -> Optional[Material]:
     return await db.get(Material, material_id)
 
-async def list_(db: AsyncSession, skip: int = 0, limit: int = 50) -> List[Material]:
-    res = await db.execute(select(Material).order_by(Material.nome).offset(skip).limit(limit))
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (Material.nome,)
+
+async def list_(db: AsyncSession, skip: int = 0, limit: int = 50, after: list | None = None) -> List[Material]:
+    res = await db.execute(apply_page(select(Material), ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def update(db: AsyncSession, material_id: int, data: MaterialUpdate) -> Optional[Material]:
@@ -24,8 +27,7 @@ async def update(db: AsyncSession, material_id: int, data: MaterialUpdate) -> Op
         return None
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(obj, k, v)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def delete(db: AsyncSession, material_id: int) -> bool:
@@ -33,5 +35,5 @@ async def delete(db: AsyncSession, material_id: int) -> bool:
     if not obj:
         return False
     await db.delete(obj)
-    await db.commit()
+    await db.flush()
     return True
@@ -1,11 +1,22 @@
-from typing import Optional, List
+from datetime import date, datetime, time, timedelta, timezone
+from typing import AsyncIterator, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, insert, case, literal
+from sqlalchemy import update as sql_update  # "update" é o nome da função do repositório
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException, status
 
 from app.models.orcamento import Orcamento
+from app.models.orcamento_item import OrcamentoItem
 from app.models.cliente import Cliente
 from app.models.contrato import Contrato
+from app.models.maquina import Maquina
+from app.models.material import Material
+from app.models.unidade_medida import UnidadeMedida
+from app.core.cursor import apply_page
+from app.repositories.loader import get_loader
+from app.services.precos_contrato import get_defaults, checar_vigencia_contrato
+from app.services.reprecificacao import com_precos_vigentes
 
 def _validate_tipo_contrato(tipo: str, contrato_id: int | None):
     if tipo == "CONTRATO" and not contrato_id:
@@ -20,14 +31,14 @@ def _validate_tipo_contrato(tipo: str, contrato_id: int | None):
         )
 
 async def _ensure_cliente_exists(db: AsyncSession, cliente_id: int) -> None:
-    if not await db.get(Cliente, cliente_id):
+    if not await get_loader(db).load(Cliente, cliente_id):
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Cliente informado não existe."
         )
 
 async def _ensure_contrato_belongs_to_cliente(db: AsyncSession, contrato_id: int, cliente_id: int) -> None:
-    contrato = await db.get(Contrato, contrato_id)
+    contrato = await get_loader(db).load(Contrato, contrato_id)
     if not contrato:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -48,8 +59,7 @@ async def create(db: AsyncSession, data) -> Orcamento:
         await _ensure_contrato_belongs_to_cliente(db, data.contrato_id, data.cliente_id)  # type: ignore[arg-type]
     obj = Orcamento(**data.model_dump())
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def update(db: AsyncSession, orcamento_id: int, data) -> Optional[Orcamento]:
@@ -79,15 +89,61 @@ async def update(db: AsyncSession, orcamento_id: int, data) -> Optional[Orcament
     for k, v in incoming.items():
         setattr(obj, k, v)
 
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def get(db: AsyncSession, orcamento_id: int) -> Optional[Orcamento]:
     return await db.get(Orcamento, orcamento_id)
 
-async def list_(db: AsyncSession, skip: int = 0, limit: int = 50, cliente_id: int | None = None, tipo: str | None = None) -> List[Orcamento]:
-    stmt = select(Orcamento).order_by(Orcamento.id).offset(skip).limit(limit)
+# Relações que GET /orcamentos/{id}/documento?expand= sabe carregar
+EXPAND_VALIDOS = ("itens", "maquinas", "materiais", "uoms", "cliente", "contrato")
+
+async def get_detalhe(db: AsyncSession, orcamento_id: int, expand: set[str]) -> Optional[dict]:
+    """
+    Orçamento + relações pedidas em `expand`, com número fixo de queries
+    (uma por tabela, lookups em lote via IN pelo loader) independente do nº
+    de itens. uoms inclui as unidades dos itens e, se expandidas, das
+    máquinas/materiais. Retorna None se o orçamento não existir.
+    """
+    loader = get_loader(db)
+    obj = await loader.load(Orcamento, orcamento_id)
+    if not obj:
+        return None
+    out: dict = {"orcamento": obj}
+
+    itens: List[OrcamentoItem] = []
+    if expand & {"itens", "maquinas", "materiais", "uoms"}:
+        stmt = select(OrcamentoItem).where(OrcamentoItem.orcamento_id == orcamento_id).order_by(OrcamentoItem.id)
+        itens = list((await db.execute(stmt)).scalars())
+    if "itens" in expand:
+        out["itens"] = itens
+    if "maquinas" in expand:
+        out["maquinas"] = await loader.load_many(Maquina, (i.maquina_id for i in itens))
+    if "materiais" in expand:
+        out["materiais"] = await loader.load_many(Material, (i.material_id for i in itens))
+    if "uoms" in expand:
+        uom_ids = {i.uom_id for i in itens}
+        uom_ids |= {m.uom_hh_id for m in out.get("maquinas", {}).values()}
+        uom_ids |= {m.uom_base_id for m in out.get("materiais", {}).values()}
+        out["uoms"] = await loader.load_many(UnidadeMedida, uom_ids)
+    if "cliente" in expand:
+        out["cliente"] = await loader.load(Cliente, obj.cliente_id)
+    if "contrato" in expand:
+        out["contrato"] = await loader.load(Contrato, obj.contrato_id)
+    return out
+
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (Orcamento.id,)
+
+async def list_(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 50,
+    cliente_id: int | None = None,
+    tipo: str | None = None,
+    after: list | None = None,
+) -> List[Orcamento]:
+    stmt = select(Orcamento)
     if cliente_id or tipo:
         from sqlalchemy import and_
         conds = []
@@ -95,8 +151,8 @@ async def list_(db: AsyncSession, skip: int = 0, limit: int = 50, cliente_id: in
             conds.append(Orcamento.cliente_id == cliente_id)
         if tipo:
             conds.append(Orcamento.tipo == tipo)
-        stmt = select(Orcamento).where(and_(*conds)).order_by(Orcamento.id).offset(skip).limit(limit)
-    res = await db.execute(stmt)
+        stmt = stmt.where(and_(*conds))
+    res = await db.execute(apply_page(stmt, ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def delete(db: AsyncSession, orcamento_id: int) -> bool:
@@ -104,5 +160,178 @@ async def delete(db: AsyncSession, orcamento_id: int) -> bool:
     if not obj:
         return False
     await db.delete(obj)
-    await db.commit()
+    await db.flush()
     return True
+
+async def recalcular_totais(db: AsyncSession, orcamento_id: int) -> Optional[dict]:
+    """
+    Reconciliação completa (reparo): subtotal = SUM(total_item) dos itens,
+    total = subtotal - desconto + acrescimo. Os itens mantêm os totais de
+    forma incremental; isto corrige divergências (ex.: edição manual).
+    Retorna os valores antes/depois ou None se o orçamento não existir.
+    """
+    stmt = select(Orcamento).where(Orcamento.id == orcamento_id).with_for_update()
+    obj = (await db.execute(stmt)).scalar_one_or_none()
+    if not obj:
+        return None
+    antes = {"subtotal": float(obj.subtotal), "total": float(obj.total)}
+
+    soma = select(func.coalesce(func.sum(OrcamentoItem.total_item), 0)).where(
+        OrcamentoItem.orcamento_id == orcamento_id
+    )
+    subtotal = round(float((await db.execute(soma)).scalar_one()), 2)
+    obj.subtotal = subtotal
+    obj.total = round(subtotal - float(obj.desconto or 0) + float(obj.acrescimo or 0), 2)
+    await db.flush()
+    return {
+        "orcamento": obj,
+        "antes": antes,
+        "depois": {"subtotal": float(obj.subtotal), "total": float(obj.total)},
+    }
+
+# Colunas copiadas como estão da origem no clone
+_CLONE_COLUNAS = ("item_tipo", "maquina_id", "tipo_hh", "material_id", "descricao", "quantidade")
+
+async def clonar(db: AsyncSession, orcamento_id: int, data) -> Optional[dict]:
+    """
+    Copia o orçamento e todos os itens (POST /orcamentos/{id}:clone) com
+    round-trips constantes, qualquer que seja o nº de itens: INSERT do
+    cabeçalho, um INSERT ... SELECT dos itens e um UPDATE dos totais.
+    Destino opcional (cliente/tipo/contrato, mesmas regras do create).
+    Com `reprecificar`, HH/MATERIAL recebem o preço do contrato de destino
+    vigente em `as_of` (sem preço configurado, mantêm o da origem).
+    O clone nasce RASCUNHO. Retorna {"orcamento", "itens"} ou None se a
+    origem não existir.
+    """
+    origem = await get_loader(db).load(Orcamento, orcamento_id)
+    if not origem:
+        return None
+
+    campos = data.model_fields_set
+    cliente_id = data.cliente_id or origem.cliente_id
+    tipo = data.tipo or ("CONTRATO" if data.contrato_id else origem.tipo)
+    if "contrato_id" in campos:
+        contrato_id = data.contrato_id
+    else:
+        contrato_id = origem.contrato_id if tipo == "CONTRATO" else None
+    _validate_tipo_contrato(tipo, contrato_id)
+    await _ensure_cliente_exists(db, cliente_id)
+    if tipo == "CONTRATO":
+        await _ensure_contrato_belongs_to_cliente(db, contrato_id, cliente_id)  # type: ignore[arg-type]
+    if data.reprecificar and tipo != "CONTRATO":
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="reprecificar exige orçamento de destino do tipo CONTRATO."
+        )
+
+    obj = Orcamento(
+        cliente_id=cliente_id,
+        tipo=tipo,
+        status="RASCUNHO",
+        contrato_id=contrato_id,
+        moeda=origem.moeda,
+        titulo=data.titulo if "titulo" in campos else origem.titulo,
+        observacoes=origem.observacoes,
+        subtotal=0,
+        desconto=origem.desconto,
+        acrescimo=origem.acrescimo,
+        total=0,
+    )
+    db.add(obj)
+    await db.flush()
+
+    stmt = select(literal(obj.id), *(getattr(OrcamentoItem, c) for c in _CLONE_COLUNAS)).where(
+        OrcamentoItem.orcamento_id == orcamento_id
+    )
+    preco, uom, total = OrcamentoItem.preco_unitario, OrcamentoItem.uom_id, OrcamentoItem.total_item
+    if data.reprecificar:
+        as_of = data.as_of or date.today()
+        checar_vigencia_contrato(await get_defaults(db, contrato_id), as_of)  # type: ignore[arg-type]
+        stmt, novo_preco, uom = com_precos_vigentes(stmt, contrato_id, as_of)  # type: ignore[arg-type]
+        preco = func.coalesce(novo_preco, OrcamentoItem.preco_unitario)
+        total = case(
+            (novo_preco.is_(None), OrcamentoItem.total_item),
+            else_=func.round(OrcamentoItem.quantidade * novo_preco, 2),
+        )
+    stmt = stmt.add_columns(preco, uom, total).order_by(OrcamentoItem.id)
+    res = await db.execute(insert(OrcamentoItem).from_select(
+        ["orcamento_id", *_CLONE_COLUNAS, "preco_unitario", "uom_id", "total_item"], stmt
+    ))
+
+    # totais uma vez, pela soma dos itens copiados
+    soma = (
+        select(func.round(func.coalesce(func.sum(OrcamentoItem.total_item), 0), 2))
+        .where(OrcamentoItem.orcamento_id == Orcamento.id)
+        .scalar_subquery()
+    )
+    row = (await db.execute(
+        sql_update(Orcamento)
+        .where(Orcamento.id == obj.id)
+        .values(subtotal=soma, total=soma - Orcamento.desconto + Orcamento.acrescimo)
+        .returning(Orcamento.subtotal, Orcamento.total, Orcamento.updated_at),
+        execution_options={"synchronize_session": False},
+    )).one()
+    for k in ("subtotal", "total", "updated_at"):
+        set_committed_value(obj, k, getattr(row, k))
+    return {"orcamento": obj, "itens": res.rowcount}
+
+# Colunas do export (GET /orcamentos/export): uma linha por item; orçamento
+# sem itens sai numa linha com as colunas de item vazias.
+EXPORT_COLUNAS = (
+    ("orcamento_id", Orcamento.id),
+    ("cliente_id", Orcamento.cliente_id),
+    ("cliente_nome", Cliente.nome),
+    ("tipo", Orcamento.tipo),
+    ("status", Orcamento.status),
+    ("contrato_id", Orcamento.contrato_id),
+    ("moeda", Orcamento.moeda),
+    ("titulo", Orcamento.titulo),
+    ("subtotal", Orcamento.subtotal),
+    ("desconto", Orcamento.desconto),
+    ("acrescimo", Orcamento.acrescimo),
+    ("total", Orcamento.total),
+    ("created_at", Orcamento.created_at),
+    ("item_id", OrcamentoItem.id),
+    ("item_tipo", OrcamentoItem.item_tipo),
+    ("maquina_id", OrcamentoItem.maquina_id),
+    ("tipo_hh", OrcamentoItem.tipo_hh),
+    ("material_id", OrcamentoItem.material_id),
+    ("descricao", OrcamentoItem.descricao),
+    ("uom_id", OrcamentoItem.uom_id),
+    ("quantidade", OrcamentoItem.quantidade),
+    ("preco_unitario", OrcamentoItem.preco_unitario),
+    ("total_item", OrcamentoItem.total_item),
+)
+
+async def stream_export(
+    db: AsyncSession,
+    de: date | None = None,
+    ate: date | None = None,
+    cliente_id: int | None = None,
+    status_orc: str | None = None,
+    lote: int = 500,
+) -> AsyncIterator[list]:
+    """
+    Orçamentos (created_at entre `de` e `ate`, inclusive) juntados aos itens,
+    em blocos de `lote` linhas lidas de um cursor no servidor (yield_per):
+    memória constante qualquer que seja o volume. Linhas são tuplas na ordem
+    de EXPORT_COLUNAS (colunas, não objetos ORM: nada fica no identity map).
+    """
+    stmt = (
+        select(*(col.label(nome) for nome, col in EXPORT_COLUNAS))
+        .join(Cliente, Cliente.id == Orcamento.cliente_id)
+        .outerjoin(OrcamentoItem, OrcamentoItem.orcamento_id == Orcamento.id)
+        .order_by(Orcamento.id, OrcamentoItem.id)
+    )
+    if de:
+        stmt = stmt.where(Orcamento.created_at >= datetime.combine(de, time.min, tzinfo=timezone.utc))
+    if ate:
+        stmt = stmt.where(Orcamento.created_at < datetime.combine(ate + timedelta(days=1), time.min, tzinfo=timezone.utc))
+    if cliente_id:
+        stmt = stmt.where(Orcamento.cliente_id == cliente_id)
+    if status_orc:
+        stmt = stmt.where(Orcamento.status == status_orc)
+
+    res = await db.stream(stmt.execution_options(yield_per=lote))
+    async for bloco in res.partitions():
+        yield bloco
@@ -1,12 +1,18 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, insert, cast, func, Numeric
+from sqlalchemy import update as sql_update  # "update" é o nome da função do repositório
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException, status
 
 from app.models.orcamento import Orcamento
 from app.models.orcamento_item import OrcamentoItem
+from app.models.maquina import Maquina
+from app.models.material import Material
+from app.models.unidade_medida import UnidadeMedida
+from app.repositories.loader import get_loader
 from app.schemas.orcamento_item import OrcamentoItemCreate, OrcamentoItemUpdate
-from app.services.precos_contrato import resolve_preco_hh, resolve_preco_material
+from app.services.precos_contrato import resolve_preco_hh, resolve_preco_material, resolve_precos_lote
 
 # ------ Helpers de regra de negócio ------
 
@@ -14,19 +20,44 @@ def _require(cond: bool, msg: str):
     if not cond:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=msg)
 
-async def _recalcular_totais(db: AsyncSession, orcamento_id: int) -> None:
-    stmt = select(func.coalesce(func.sum(OrcamentoItem.total_item), 0)).where(OrcamentoItem.orcamento_id == orcamento_id)
-    total_itens = (await db.execute(stmt)).scalar_one()
-    orc = await db.get(Orcamento, orcamento_id)
-    if not orc:
+async def _aplicar_delta_totais(db: AsyncSession, orc: Orcamento, delta: float) -> None:
+    """
+    Soma a variação dos itens em subtotal/total, na mesma transação do item,
+    com um UPDATE atômico (subtotal = subtotal + delta) em vez de SUM sobre
+    todos os itens. No Postgres o UPDATE trava a linha do orçamento até o
+    commit, serializando edições concorrentes do mesmo orçamento.
+    Divergências (ex.: subtotal editado à mão) são corrigidas por
+    orcamento.recalcular_totais (POST /orcamentos/{id}:recalcular).
+    """
+    delta = round(delta, 2)
+    if not delta:
         return
-    orc.subtotal = float(total_itens)
-    orc.total = float(orc.subtotal) - float(orc.desconto or 0) + float(orc.acrescimo or 0)
-    await db.commit()
-    await db.refresh(orc)
+    novo_subtotal = func.round(Orcamento.subtotal + cast(delta, Numeric(14, 2)), 2)
+    stmt = (
+        sql_update(Orcamento)
+        .where(Orcamento.id == orc.id)
+        .values(subtotal=novo_subtotal, total=novo_subtotal - Orcamento.desconto + Orcamento.acrescimo)
+        .returning(Orcamento.subtotal, Orcamento.total, Orcamento.updated_at)
+    )
+    row = (await db.execute(stmt, execution_options={"synchronize_session": False})).one()
+    # mantém o objeto da sessão coerente sem um SELECT extra
+    for k in ("subtotal", "total", "updated_at"):
+        set_committed_value(orc, k, getattr(row, k))
+
+async def _get_item_for_update(db: AsyncSession, item_id: int) -> Optional[OrcamentoItem]:
+    # FOR UPDATE no Postgres (ignorado no SQLite): o delta depende do total anterior do item
+    stmt = select(OrcamentoItem).where(OrcamentoItem.id == item_id).with_for_update()
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+def _preco_do_lote(resolved: dict) -> tuple[float, int | None]:
+    # mesmo contrato de erro do resolver unitário (422)
+    if resolved["fonte"] == "nao_configurado":
+        raise HTTPException(status_code=422, detail=resolved["erro"])
+    return resolved["preco"], resolved.get("uom_id")
 
 async def _resolver_preco_para_item(
-    db: AsyncSession, orc: Orcamento, data: OrcamentoItemCreate | OrcamentoItemUpdate
+    db: AsyncSession, orc: Orcamento, data: OrcamentoItemCreate | OrcamentoItemUpdate,
+    precos: dict | None = None,
 ) -> tuple[float, int | None]:
     """
     Retorna (preco_unitario, uom_id_resolvido)
@@ -34,6 +65,8 @@ async def _resolver_preco_para_item(
     - CONTRATO + MATERIAL -> resolve via contrato_material_preco
     - SPOT + LIVRE -> usa preco_unitario enviado
     - SPOT + HH/MATERIAL -> permitido também enviar preco_unitario manual (flexível)
+    `precos`: resultado de resolve_precos_lote (inserção em lote) – evita
+    uma consulta por item.
     """
     # valores atuais / incoming
     item_tipo = getattr(data, "item_tipo", None)
@@ -45,6 +78,8 @@ async def _resolver_preco_para_item(
         _require(getattr(data, "maquina_id", None), "maquina_id é obrigatório para item HH.")
         _require(getattr(data, "tipo_hh", None), "tipo_hh é obrigatório para item HH.")
         if orc.tipo == "CONTRATO":
+            if precos is not None:
+                return _preco_do_lote(precos["hh"][(data.maquina_id, data.tipo_hh)])
             resolved = await resolve_preco_hh(
                 db, contrato_id=orc.contrato_id,  # type: ignore[arg-type]
                 maquina_id=data.maquina_id, tipo_hh=data.tipo_hh  # type: ignore[arg-type]
@@ -59,6 +94,8 @@ async def _resolver_preco_para_item(
     if item_tipo == "MATERIAL":
         _require(getattr(data, "material_id", None), "material_id é obrigatório para item MATERIAL.")
         if orc.tipo == "CONTRATO":
+            if precos is not None:
+                return _preco_do_lote(precos["materiais"][data.material_id])
             resolved = await resolve_preco_material(
                 db, contrato_id=orc.contrato_id,  # type: ignore[arg-type]
                 material_id=data.material_id  # type: ignore[arg-type]
@@ -80,7 +117,7 @@ async def _resolver_preco_para_item(
 # ------ CRUD ------
 
 async def create(db: AsyncSession, orcamento_id: int, data: OrcamentoItemCreate) -> OrcamentoItem:
-    orc = await db.get(Orcamento, orcamento_id)
+    orc = await get_loader(db).load(Orcamento, orcamento_id)
     if not orc:
         raise HTTPException(status_code=404, detail="Orçamento não encontrado")
 
@@ -102,9 +139,8 @@ async def create(db: AsyncSession, orcamento_id: int, data: OrcamentoItemCreate)
     )
 
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
-    await _recalcular_totais(db, orcamento_id)
+    await db.flush()
+    await _aplicar_delta_totais(db, orc, total_item)
     return obj
 
 async def get(db: AsyncSession, item_id: int) -> Optional[OrcamentoItem]:
@@ -116,11 +152,12 @@ async def list_(db: AsyncSession, orcamento_id: int) -> List[OrcamentoItem]:
     return list(res.scalars())
 
 async def update(db: AsyncSession, orcamento_id: int, item_id: int, data: OrcamentoItemUpdate) -> Optional[OrcamentoItem]:
-    obj = await db.get(OrcamentoItem, item_id)
+    obj = await _get_item_for_update(db, item_id)
     if not obj or obj.orcamento_id != orcamento_id:
         return None
+    total_anterior = float(obj.total_item or 0)
 
-    orc = await db.get(Orcamento, orcamento_id)
+    orc = await get_loader(db).load(Orcamento, orcamento_id)
     if not orc:
         raise HTTPException(status_code=404, detail="Orçamento não encontrado")
 
@@ -137,16 +174,91 @@ async def update(db: AsyncSession, orcamento_id: int, item_id: int, data: Orcame
     qtd = float(obj.quantidade or 1)
     obj.total_item = round(qtd * float(obj.preco_unitario), 2)
 
-    await db.commit()
-    await db.refresh(obj)
-    await _recalcular_totais(db, orcamento_id)
+    await db.flush()
+    await _aplicar_delta_totais(db, orc, float(obj.total_item) - total_anterior)
     return obj
 
 async def delete(db: AsyncSession, orcamento_id: int, item_id: int) -> bool:
-    obj = await db.get(OrcamentoItem, item_id)
+    obj = await _get_item_for_update(db, item_id)
     if not obj or obj.orcamento_id != orcamento_id:
         return False
+    orc = await get_loader(db).load(Orcamento, orcamento_id)
     await db.delete(obj)
-    await db.commit()
-    await _recalcular_totais(db, orcamento_id)
+    await db.flush()
+    if orc:
+        await _aplicar_delta_totais(db, orc, -float(obj.total_item or 0))
     return True
+
+async def create_lote(
+    db: AsyncSession, orcamento_id: int, itens: List[OrcamentoItemCreate], atomico: bool = False
+) -> List[dict]:
+    """
+    Inserção em lote (importação de orçamentos grandes):
+    - preços de contrato resolvidos de uma vez (resolve_precos_lote);
+    - um único INSERT executemany (com RETURNING) para as linhas válidas;
+    - totais ajustados uma vez (delta do lote), tudo na mesma transação.
+    Retorna um resultado por linha, na ordem recebida:
+      {"index", "success": True, "item": OrcamentoItem} ou {"index", "success": False, "error"}.
+    Com `atomico=True`, qualquer linha inválida impede a inserção de todas.
+    """
+    orc = await get_loader(db).load(Orcamento, orcamento_id)
+    if not orc:
+        raise HTTPException(status_code=404, detail="Orçamento não encontrado")
+
+    precos = None
+    if orc.tipo == "CONTRATO":
+        precos = await resolve_precos_lote(
+            db, contrato_id=orc.contrato_id,  # type: ignore[arg-type]
+            hh=[(i.maquina_id, i.tipo_hh) for i in itens if i.item_tipo == "HH" and i.maquina_id and i.tipo_hh],
+            materiais=[i.material_id for i in itens if i.item_tipo == "MATERIAL" and i.material_id],
+        )
+
+    # referências do lote validadas com um IN por tabela (linha a linha viraria N queries)
+    loader = get_loader(db)
+    maquinas = await loader.load_many(Maquina, (i.maquina_id for i in itens))
+    materiais = await loader.load_many(Material, (i.material_id for i in itens))
+    uoms = await loader.load_many(UnidadeMedida, (i.uom_id for i in itens))
+
+    resultados: List[dict] = []
+    linhas: List[dict] = []
+    for idx, data in enumerate(itens):
+        try:
+            _require(data.maquina_id is None or data.maquina_id in maquinas, "Máquina não encontrada.")
+            _require(data.material_id is None or data.material_id in materiais, "Material não encontrado.")
+            _require(data.uom_id is None or data.uom_id in uoms, "Unidade de medida não encontrada.")
+            preco_unit, uom_res = await _resolver_preco_para_item(db, orc, data, precos=precos)
+        except HTTPException as e:
+            resultados.append({"index": idx, "success": False, "error": e.detail})
+            continue
+        qtd = float(data.quantidade or 1)
+        linhas.append({
+            "orcamento_id": orcamento_id,
+            "item_tipo": data.item_tipo,
+            "maquina_id": data.maquina_id,
+            "tipo_hh": data.tipo_hh,
+            "material_id": data.material_id,
+            "descricao": data.descricao,
+            "uom_id": (uom_res or data.uom_id),
+            "quantidade": qtd,
+            "preco_unitario": preco_unit,
+            "total_item": round(qtd * float(preco_unit), 2),
+        })
+        resultados.append({"index": idx, "success": True})
+
+    if not linhas or (atomico and len(linhas) != len(itens)):
+        return resultados
+
+    # render_nulls: mantém o mesmo conjunto de colunas em todas as linhas,
+    # senão o ORM quebra o executemany em grupos (HH/MATERIAL/LIVRE alternados).
+    # Sem sort_by_parameter_order (no SQLite ele degrada para 1 INSERT por linha):
+    # os ids são gerados na ordem do VALUES, então ordenar por id reconstitui a ordem.
+    stmt = insert(OrcamentoItem).returning(OrcamentoItem)
+    objs = (await db.scalars(stmt, linhas, execution_options={"render_nulls": True})).all()
+    inseridos = iter(sorted(objs, key=lambda o: o.id))
+    for r in resultados:
+        if r["success"]:
+            r["item"] = next(inseridos)
+
+    await _aplicar_delta_totais(db, orc, sum(float(l["total_item"]) for l in linhas))
+    await db.flush()
+    return resultados
@@ -3,19 +3,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.tipo_servico import TipoServico
 from app.schemas.tipo_servico import TipoServicoCreate, TipoServicoUpdate
+from app.core.cursor import apply_page
 
 async def create(db: AsyncSession, data: TipoServicoCreate) -> TipoServico:
     obj = TipoServico(**data.model_dump())
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def get(db: AsyncSession, tipo_id: int) -> Optional[TipoServico]:
     return await db.get(TipoServico, tipo_id)
 
-async def list_(db: AsyncSession, skip: int = 0, limit: int = 50) -> List[TipoServico]:
-    res = await db.execute(select(TipoServico).order_by(TipoServico.nome).offset(skip).limit(limit))
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (TipoServico.nome,)
+
+async def list_(db: AsyncSession, skip: int = 0, limit: int = 50, after: list | None = None) -> List[TipoServico]:
+    res = await db.execute(apply_page(select(TipoServico), ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def update(db: AsyncSession, tipo_id: int, data: TipoServicoUpdate) -> Optional[TipoServico]:
@@ -24,8 +27,7 @@ async def update(db: AsyncSession, tipo_id: int, data: TipoServicoUpdate) -> Opt
         return None
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(obj, k, v)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def delete(db: AsyncSession, tipo_id: int) -> bool:
@@ -33,5 +35,5 @@ async def delete(db: AsyncSession, tipo_id: int) -> bool:
     if not obj:
         return False
     await db.delete(obj)
-    await db.commit()
+    await db.flush()
     return True
@@ -3,21 +3,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.unidade_medida import UnidadeMedida
 from app.schemas.unidade_medida import UoMCreate, UoMUpdate
+from app.core.cursor import apply_page
 
 async def create(db: AsyncSession, data: UoMCreate) -> UnidadeMedida:
     obj = UnidadeMedida(**data.model_dump())
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def get(db: AsyncSession, uom_id: int) -> Optional[UnidadeMedida]:
     return await db.get(UnidadeMedida, uom_id)
 
-async def list_(db: AsyncSession, skip: int = 0, limit: int = 50) -> List[UnidadeMedida]:
-    res = await db.execute(
-        select(UnidadeMedida).order_by(UnidadeMedida.nome).offset(skip).limit(limit)
-    )
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (UnidadeMedida.nome,)
+
+async def list_(db: AsyncSession, skip: int = 0, limit: int = 50, after: list | None = None) -> List[UnidadeMedida]:
+    res = await db.execute(apply_page(select(UnidadeMedida), ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def update(db: AsyncSession, uom_id: int, data: UoMUpdate) -> Optional[UnidadeMedida]:
@@ -26,8 +27,7 @@ async def update(db: AsyncSession, uom_id: int, data: UoMUpdate) -> Optional[Uni
         return None
     for k, v in data.model_dump(exclude_unset=True).items():
         setattr(obj, k, v)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def delete(db: AsyncSession, uom_id: int) -> bool:
@@ -35,5 +35,5 @@ async def delete(db: AsyncSession, uom_id: int) -> bool:
     if not obj:
         return False
     await db.delete(obj)
-    await db.commit()
+    await db.flush()
     return True
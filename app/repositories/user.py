@@ -1,10 +1,60 @@
+from dataclasses import dataclass
 from typing import Optional, List
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdateSelf, UserUpdateAdmin
-from app.core.security import hash_password, verify_password
+from app.core.cache import MISS, TTLCache
+from app.core.security import hash_password_async, verify_password_async
+from app.core.settings import get_settings
+from app.core.cursor import apply_page
+from app.db.session import apos_commit
+
+settings = get_settings()
+
+# ---- Cache de autenticação ----
+# get_current_user roda em TODA rota autenticada; guardamos um snapshot
+# imutável do usuário por e-mail (sub do token) por alguns segundos.
+# Invalidado por update_self/update_admin/set_password; outros workers
+# enxergam a mudança quando o TTL expira.
+@dataclass(frozen=True, slots=True)
+class AuthUser:
+    id: int
+    email: str
+    full_name: str
+    role: str
+    is_active: bool
+
+_auth_cache = TTLCache(
+    "auth_users",
+    maxsize=settings.AUTH_CACHE_MAXSIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+def invalidar_cache_auth(*emails: str) -> None:
+    for email in emails:
+        if email:
+            _auth_cache.invalidate(email)
+
+def auth_cache_stats() -> dict:
+    return _auth_cache.stats()
+
+async def get_auth_user(db: AsyncSession, email: str) -> Optional[AuthUser]:
+    """Snapshot do usuário para autenticação/RBAC (via cache)."""
+    cached = _auth_cache.get(email)
+    if cached is not MISS:
+        return cached
+    versao = _auth_cache.versao
+    user = await get_by_email(db, email)
+    if not user:
+        return None  # não cacheamos ausência (usuário pode ser criado a seguir)
+    snap = AuthUser(
+        id=user.id, email=user.email, full_name=user.full_name,
+        role=user.role, is_active=user.is_active,
+    )
+    _auth_cache.set(email, snap, versao=versao)
+    return snap
 
 async def count_all(db: AsyncSession) -> int:
     res = await db.execute(select(func.count()).select_from(User))
@@ -19,28 +69,28 @@ async def create(db: AsyncSession, data: UserCreate) -> User:
         email=data.email,
         full_name=data.full_name,
         role=data.role,
-        hashed_password=hash_password(data.password),
+        hashed_password=await hash_password_async(data.password),
         is_active=True,
     )
     db.add(obj)
-    await db.commit()
-    await db.refresh(obj)
+    await db.flush()
     return obj
 
 async def authenticate(db: AsyncSession, email: str, password: str) -> Optional[User]:
     user = await get_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     if not user.is_active:
         return None
     return user
 
-async def list_(db: AsyncSession, skip: int = 0, limit: int = 50) -> list[User]:
-    res = await db.execute(
-        select(User).order_by(User.id).offset(skip).limit(limit)
-    )
+# Ordenação única (chave do cursor de paginação)
+ORDEM = (User.id,)
+
+async def list_(db: AsyncSession, skip: int = 0, limit: int = 50, after: list | None = None) -> list[User]:
+    res = await db.execute(apply_page(select(User), ORDEM, skip, limit, after))
     return list(res.scalars())
 
 async def get_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
@@ -67,10 +117,11 @@ async def update_self(db: AsyncSession, user: User, data: UserUpdateSelf) -> Use
     if "email" in changes:
         if await email_in_use(db, changes["email"], exclude_user_id=user.id):
             raise ValueError("email_taken")
+    email_anterior = user.email
     for k, v in changes.items():
         setattr(user, k, v)
-    await db.commit()
-    await db.refresh(user)
+    await db.flush()
+    apos_commit(db, invalidar_cache_auth, email_anterior, user.email)
     return user
 
 async def update_admin(db: AsyncSession, user: User, data: UserUpdateAdmin) -> User:
@@ -88,14 +139,15 @@ async def update_admin(db: AsyncSession, user: User, data: UserUpdateAdmin) -> U
             if ("is_active" in changes and changes["is_active"] is False) or ("role" in changes and changes["role"] != "ADMIN"):
                 raise ValueError("would_remove_last_admin")
 
+    email_anterior = user.email
     for k, v in changes.items():
         setattr(user, k, v)
-    await db.commit()
-    await db.refresh(user)
+    await db.flush()
+    apos_commit(db, invalidar_cache_auth, email_anterior, user.email)
     return user
 
 async def set_password(db: AsyncSession, user: User, new_password: str) -> User:
-    user.hashed_password = hash_password(new_password)
-    await db.commit()
-    await db.refresh(user)
+    user.hashed_password = await hash_password_async(new_password)
+    await db.flush()
+    apos_commit(db, invalidar_cache_auth, user.email)
     return user
@@ -1,6 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Literal
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from app.models.contrato_hh_preco import VIGENCIA_INICIAL
 
 TipoHH = Literal["REGULAR", "EXTRA", "FERIADO"]
 
@@ -10,6 +11,15 @@ class ContratoHHPrecoBase(BaseModel):
     tipo_hh: TipoHH
     uom_id: int = Field(..., ge=1)        # normalmente a UoM "hora"
     preco_hora: float = Field(..., ge=0)
+    # vigência: sem valido_de, vale "desde sempre"; valido_ate é inclusive
+    valido_de: date = VIGENCIA_INICIAL
+    valido_ate: Optional[date] = None
+
+    @model_validator(mode="after")
+    def _vigencia(self):
+        if self.valido_ate is not None and self.valido_ate < self.valido_de:
+            raise ValueError("valido_ate deve ser maior ou igual a valido_de")
+        return self
 
 class ContratoHHPrecoCreate(ContratoHHPrecoBase):
     pass
@@ -19,6 +29,8 @@ class ContratoHHPrecoUpdate(BaseModel):
     tipo_hh: Optional[TipoHH] = None
     uom_id: Optional[int] = Field(None, ge=1)
     preco_hora: Optional[float] = Field(None, ge=0)
+    valido_de: Optional[date] = None
+    valido_ate: Optional[date] = None
 
 class ContratoHHPrecoOut(ContratoHHPrecoBase):
     id: int
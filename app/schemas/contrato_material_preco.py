@@ -1,12 +1,22 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from app.models.contrato_hh_preco import VIGENCIA_INICIAL
 
 class ContratoMaterialPrecoBase(BaseModel):
     contrato_id: int = Field(..., ge=1)
     material_id: int = Field(..., ge=1)
     uom_id: int = Field(..., ge=1)            # normalmente UoM do material (ex.: kg)
     preco_unitario: float = Field(..., ge=0)
+    # vigência: sem valido_de, vale "desde sempre"; valido_ate é inclusive
+    valido_de: date = VIGENCIA_INICIAL
+    valido_ate: Optional[date] = None
+
+    @model_validator(mode="after")
+    def _vigencia(self):
+        if self.valido_ate is not None and self.valido_ate < self.valido_de:
+            raise ValueError("valido_ate deve ser maior ou igual a valido_de")
+        return self
 
 class ContratoMaterialPrecoCreate(ContratoMaterialPrecoBase):
     pass
@@ -14,6 +24,8 @@ class ContratoMaterialPrecoCreate(ContratoMaterialPrecoBase):
 class ContratoMaterialPrecoUpdate(BaseModel):
     uom_id: Optional[int] = Field(None, ge=1)
     preco_unitario: Optional[float] = Field(None, ge=0)
+    valido_de: Optional[date] = None
+    valido_ate: Optional[date] = None
 
 class ContratoMaterialPrecoOut(ContratoMaterialPrecoBase):
     id: int
@@ -1,5 +1,5 @@
 from typing import Optional, Literal
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, Field, ConfigDict, StrictInt
 
 TipoOrc = Literal["CONTRATO", "SPOT"]
@@ -37,8 +37,85 @@ class OrcamentoUpdate(BaseModel):
     acrescimo: Optional[float] = Field(None, ge=0)
     total: Optional[float] = Field(None, ge=0)
 
+class OrcamentoCloneInput(BaseModel):
+    # destino do clone (omitidos = os mesmos do orçamento de origem)
+    cliente_id: Optional[int] = Field(None, ge=1)
+    tipo: Optional[TipoOrc] = None
+    contrato_id: Optional[int] = Field(None, ge=1)
+    titulo: Optional[str] = Field(None, max_length=120)
+    # reaplica aos itens HH/MATERIAL os preços do contrato de destino vigentes em as_of (padrão: hoje)
+    reprecificar: bool = False
+    as_of: Optional[date] = None
+
 class OrcamentoOut(OrcamentoBase):
     id: int
     created_at: datetime
     updated_at: datetime
     model_config = ConfigDict(from_attributes=True)
+
+# Documento do orçamento (GET /orcamentos/{id}/documento): cabeçalho + as
+# relações pedidas em `expand` (as não pedidas ficam fora do JSON).
+class DocumentoItem(BaseModel):
+    id: int
+    item_tipo: str
+    maquina_id: Optional[int] = None
+    maquina_nome: Optional[str] = None
+    tipo_hh: Optional[str] = None
+    material_id: Optional[int] = None
+    material_nome: Optional[str] = None
+    descricao: Optional[str] = None
+    uom_id: Optional[int] = None
+    uom_simbolo: Optional[str] = None
+    quantidade: float
+    preco_unitario: float
+    total_item: float
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class DocumentoMaquina(BaseModel):
+    id: int
+    nome: str
+    descricao: Optional[str] = None
+    uom_hh_id: int
+
+class DocumentoMaterial(BaseModel):
+    id: int
+    nome: str
+    descricao: Optional[str] = None
+    uom_base_id: int
+
+class DocumentoUom(BaseModel):
+    id: int
+    nome: str
+    simbolo: str
+    categoria: Optional[str] = None
+
+class DocumentoCliente(BaseModel):
+    id: int
+    nome: str
+    email: Optional[str] = None
+    telefone: Optional[str] = None
+
+class DocumentoContrato(BaseModel):
+    id: int
+    cliente_id: int
+    moeda: str
+    ativo: bool
+    data_inicio: Optional[date] = None
+    data_fim: Optional[date] = None
+
+class OrcamentoDocumento(OrcamentoOut):
+    itens: Optional[list[DocumentoItem]] = None
+    maquinas: Optional[list[DocumentoMaquina]] = None
+    materiais: Optional[list[DocumentoMaterial]] = None
+    uoms: Optional[list[DocumentoUom]] = None
+    cliente: Optional[DocumentoCliente] = None
+    contrato: Optional[DocumentoContrato] = None
+
+class OrcamentoDocumentoResposta(BaseModel):
+    # envelope ok() (app/core/api.py) com o documento em `data`
+    success: bool = True
+    message: Optional[str] = None
+    data: OrcamentoDocumento
+    meta: dict
+    request_id: Optional[str] = None
@@ -0,0 +1,15 @@
+from typing import List, Literal
+from pydantic import BaseModel, Field
+
+TipoHH = Literal["REGULAR", "EXTRA", "FERIADO"]
+
+MAX_CHAVES = 2000
+
+class PrecoHHChave(BaseModel):
+    maquina_id: int = Field(..., ge=1)
+    tipo_hh: TipoHH
+
+class PrecosResolveInput(BaseModel):
+    # ex.: grade completa do contrato (máquinas × REGULAR/EXTRA/FERIADO + materiais)
+    hh: List[PrecoHHChave] = Field(default_factory=list, max_length=MAX_CHAVES)
+    material_ids: List[int] = Field(default_factory=list, max_length=MAX_CHAVES)
@@ -0,0 +1,331 @@
+# app/services/importacao.py
+"""
+Peças comuns das importações em massa (tabelas de preço de contrato):
+- leitura do corpo do request em streaming, registro a registro (CSV ou NDJSON);
+- resolução de "id ou nome" contra cadastros carregados uma vez (Catalogo);
+- upsert em lotes com ON CONFLICT DO UPDATE (Postgres e SQLite);
+- o laço de importação e o resumo (importar_tabela), iguais para todas as
+  tabelas — cada repositório só informa como um registro vira o schema;
+- a resposta da rota a partir do resumo (resposta_importacao).
+Nada aqui carrega o arquivo inteiro em memória.
+"""
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, Union
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import JSONResponse
+
+from app.core.api import fail, ok
+from app.db.session import apos_commit
+from app.services.precos_contrato import invalidar_cache_contrato
+
+LOTE_UPSERT = 500          # linhas por INSERT ... ON CONFLICT
+MAX_ERROS_LISTADOS = 200   # erros detalhados na resposta (a contagem é sempre total)
+
+
+def _erro_422(msg: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=msg)
+
+
+async def _linhas_texto(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Linhas de texto (UTF-8, BOM opcional) à medida que os bytes chegam."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    resto = ""
+    try:
+        async for chunk in chunks:
+            resto += decoder.decode(chunk)
+            *linhas, resto = resto.split("\n")
+            for linha in linhas:
+                yield linha
+        resto += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise _erro_422("Arquivo não está em UTF-8.")
+    if resto:
+        yield resto
+
+
+async def ler_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict]]:
+    """
+    (nº da linha no arquivo, registro) de um CSV com cabeçalho, separador
+    "," ou ";" (detectado no cabeçalho). Nomes de coluna em minúsculas.
+    Campos entre aspas com quebra de linha são suportados: a linha física
+    só é interpretada quando as aspas estão balanceadas.
+    """
+    cabecalho: Optional[list[str]] = None
+    sep = ","
+    pendente, inicio, n = "", 0, 0
+    async for linha in _linhas_texto(chunks):
+        n += 1
+        if not pendente:
+            inicio = n
+        pendente = pendente + "\n" + linha if pendente else linha
+        if pendente.count('"') % 2:
+            continue  # campo entre aspas continua na próxima linha
+        registro, pendente = pendente.rstrip("\r"), ""
+        if not registro.strip():
+            continue
+        if cabecalho is None:
+            sep = ";" if registro.count(";") > registro.count(",") else ","
+            cabecalho = [c.strip().lower() for c in next(csv.reader([registro], delimiter=sep))]
+            continue
+        valores = next(csv.reader([registro], delimiter=sep))
+        yield inicio, {c: (v.strip() or None) for c, v in zip(cabecalho, valores)}
+    if pendente:
+        raise _erro_422(f"Aspas não fechadas a partir da linha {inicio}.")
+
+
+async def ler_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict]]:
+    """
+    (nº da linha, registro) de um NDJSON (um objeto por linha). Valores
+    viram texto, como no CSV, para passar pela mesma resolução/validação.
+    """
+    n = 0
+    async for linha in _linhas_texto(chunks):
+        n += 1
+        if not linha.strip():
+            continue
+        try:
+            obj = json.loads(linha)
+        except ValueError:
+            raise _erro_422(f"JSON inválido na linha {n}.")
+        if not isinstance(obj, dict):
+            raise _erro_422(f"Linha {n}: esperado um objeto JSON.")
+        yield n, {
+            str(k).strip().lower(): (None if v is None or str(v).strip() == "" else str(v).strip())
+            for k, v in obj.items()
+        }
+
+
+_TIPOS_CSV = ("text/csv", "application/csv", "text/plain", "application/octet-stream")
+_TIPOS_NDJSON = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines")
+_TIPO_PRINCIPAL = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def ler_registros(
+    content_type: Optional[str],
+    chunks: AsyncIterator[bytes],
+    formatos: tuple[str, ...] = ("csv",),
+) -> AsyncIterator[tuple[int, dict]]:
+    """Leitor conforme o Content-Type do upload (415 se não suportado)."""
+    tipo = (content_type or "text/csv").split(";")[0].strip().lower()
+    if tipo in _TIPOS_CSV:
+        return ler_csv(chunks)
+    if "ndjson" in formatos and tipo in _TIPOS_NDJSON:
+        return ler_ndjson(chunks)
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail=f"Content-Type não suportado: {tipo}. Envie {' ou '.join(_TIPO_PRINCIPAL[f] for f in formatos)}.",
+    )
+
+
+def numero(valor: Optional[str]) -> Optional[str]:
+    """
+    Normaliza número vindo de planilha: aceita "1234.5", "1234,5",
+    "1.234,50" e "1,234.50" (o último separador é o decimal).
+    A conversão/validação fica com o schema.
+    """
+    if valor is None:
+        return None
+    v = valor.replace(" ", "")
+    if "," in v and "." in v:
+        milhar = "." if v.rfind(",") > v.rfind(".") else ","
+        v = v.replace(milhar, "")
+    return v.replace(",", ".")
+
+
+def data(valor: Optional[str]) -> Optional[str]:
+    """Data de planilha: "AAAA-MM-DD" passa direto; "DD/MM/AAAA" vira ISO."""
+    if valor and "/" in valor:
+        partes = valor.split("/")
+        if len(partes) == 3:
+            d, m, a = partes
+            return f"{a}-{m.zfill(2)}-{d.zfill(2)}"
+    return valor
+
+
+def vigencia(reg: dict) -> dict:
+    """valido_de/valido_ate presentes no registro (ausentes ficam com o default do schema)."""
+    return {c: data(reg[c]) for c in ("valido_de", "valido_ate") if reg.get(c)}
+
+
+def msg_validacao(e: ValidationError) -> str:
+    """Primeiro erro do Pydantic em uma frase ("campo: mensagem")."""
+    err = e.errors()[0]
+    campo = ".".join(str(p) for p in err.get("loc", ())) or "registro"
+    return f"{campo}: {err.get('msg')}"
+
+
+class Upserter:
+    """
+    Acumula linhas e grava em lotes de LOTE_UPSERT com
+    INSERT ... ON CONFLICT (chave única) DO UPDATE, na transação da sessão.
+
+    `existentes` = chaves já gravadas antes da importação (um SELECT do
+    chamador): separa inseridos de atualizados sem consultar linha a linha.
+    Chave repetida no arquivo: vale a última ocorrência.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        model,
+        chave: tuple[str, ...],
+        atualizar: tuple[str, ...],
+        existentes: Iterable[tuple],
+    ) -> None:
+        self.db = db
+        self.model = model
+        self.chave = chave
+        self.atualizar = atualizar
+        self.conhecidas = set(existentes)
+        self.inseridos = 0
+        self.atualizados = 0
+        self._lote: dict[tuple, dict] = {}
+
+    async def add(self, linha: dict) -> None:
+        k = tuple(linha[c] for c in self.chave)
+        if k in self.conhecidas:
+            self.atualizados += 1
+        else:
+            self.conhecidas.add(k)
+            self.inseridos += 1
+        self._lote[k] = linha
+        if len(self._lote) >= LOTE_UPSERT:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._lote:
+            return
+        linhas, self._lote = list(self._lote.values()), {}
+        dialeto = self.db.bind.dialect.name
+        if dialeto == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialeto == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:  # pragma: no cover
+            raise RuntimeError(f"Upsert não suportado no dialeto {dialeto}")
+        stmt = insert(self.model).values(linhas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(self.chave),
+            set_={**{c: stmt.excluded[c] for c in self.atualizar}, "updated_at": func.now()},
+        )
+        await self.db.execute(stmt)
+
+
+class Catalogo:
+    """
+    Cadastro (id + nome/símbolo e o que mais o chamador selecionar) carregado
+    uma vez, para resolver a coluna `campo_id` ou `campo` de cada registro.
+    """
+
+    def __init__(self, linhas: Iterable[Any], nome: str, nao_encontrado: str) -> None:
+        self._por_id = {linha.id: linha for linha in linhas}
+        self._por_nome = {getattr(linha, nome).casefold(): linha for linha in self._por_id.values()}
+        self.nao_encontrado = nao_encontrado
+
+    def resolver(self, reg: dict, campo: str, opcional: bool = False) -> Any:
+        """
+        Linha do cadastro pelo `campo_id` (se houver) ou pelo nome em `campo`.
+        ValueError se informado e não encontrado; sem nenhum dos dois, None
+        quando `opcional` (o chamador aplica o default).
+        """
+        valor = reg.get(f"{campo}_id")
+        if valor:
+            linha = self._por_id.get(int(valor)) if valor.isdigit() else None
+        else:
+            valor = reg.get(campo)
+            if not valor and opcional:
+                return None
+            linha = self._por_nome.get((valor or "").casefold())
+        if linha is None:
+            raise ValueError(f"{self.nao_encontrado}: {valor}.")
+        return linha
+
+
+def _faltando(reg: dict, obrigatorios: tuple[Union[str, tuple[str, ...]], ...]) -> list[str]:
+    """Campos obrigatórios ausentes no primeiro registro; tupla = alternativas."""
+    faltando = []
+    for campo in obrigatorios:
+        opcoes = campo if isinstance(campo, tuple) else (campo,)
+        if not any(c in reg for c in opcoes):
+            faltando.append(opcoes[0] + "".join(f" (ou {c})" for c in opcoes[1:]))
+    return faltando
+
+
+async def importar_tabela(
+    db: AsyncSession,
+    contrato_id: int,
+    registros: AsyncIterator[tuple[int, dict]],
+    *,
+    model,
+    chave: tuple[str, ...],
+    atualizar: tuple[str, ...],
+    obrigatorios: tuple[Union[str, tuple[str, ...]], ...],
+    para_schema: Callable[[dict], BaseModel],
+    atomico: bool = False,
+) -> dict:
+    """
+    Importa uma tabela de preços do contrato: cada registro vira o schema
+    por `para_schema` (ValueError/ValidationError = linha rejeitada) e é
+    gravado em lotes (Upserter) por `chave`, na transação do request.
+    422 se faltar campo obrigatório (checado no primeiro registro). Com
+    `atomico`, qualquer linha inválida desfaz tudo. Retorna o resumo com os
+    erros por linha (até MAX_ERROS_LISTADOS; a contagem é sempre total).
+    """
+    existentes = (await db.execute(
+        select(*(getattr(model, c) for c in chave)).where(model.contrato_id == contrato_id)
+    )).all()
+    up = Upserter(db, model, chave=chave, atualizar=atualizar, existentes=existentes)
+
+    recebidos, erros, n_erros = 0, [], 0
+    async for n_linha, reg in registros:
+        if not recebidos:
+            faltando = _faltando(reg, obrigatorios)
+            if faltando:
+                raise _erro_422(f"Campos obrigatórios ausentes: {', '.join(faltando)}.")
+        recebidos += 1
+        try:
+            dados = para_schema(reg)
+        except (ValueError, ValidationError) as e:
+            n_erros += 1
+            if len(erros) < MAX_ERROS_LISTADOS:
+                msg = msg_validacao(e) if isinstance(e, ValidationError) else str(e)
+                erros.append({"linha": n_linha, "message": msg})
+            continue
+        await up.add(dados.model_dump())
+    await up.flush()
+
+    if atomico and n_erros:
+        await db.rollback()
+        inseridos = atualizados = 0
+    else:
+        inseridos, atualizados = up.inseridos, up.atualizados
+        if inseridos or atualizados:
+            apos_commit(db, invalidar_cache_contrato, contrato_id)
+    return {
+        "recebidos": recebidos,
+        "inseridos": inseridos,
+        "atualizados": atualizados,
+        "rejeitados": n_erros,
+        "erros": erros,
+    }
+
+
+def resposta_importacao(res: dict, message: str, request: Optional[Request] = None) -> JSONResponse:
+    """
+    Resposta das rotas de importação a partir do resumo de importar_tabela:
+    422 com os erros por linha se nada foi gravado; senão ok() com o resumo.
+    """
+    if res["rejeitados"] and not (res["inseridos"] or res["atualizados"]):
+        return JSONResponse(status_code=422, content=fail(
+            message="Nenhuma linha foi importada. Corrija as linhas indicadas.",
+            errors=res["erros"],
+            status_code=422,
+            request=request,
+        ))
+    return ok(data=res, message=message, request=request)
@@ -1,67 +1,177 @@
 # app/services/precos_contrato.py
-from typing import Literal, Optional
+from bisect import bisect_right
+from datetime import date
+from typing import Iterable, Literal, Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from app.core.cache import MISS, TTLCache
+from app.core.settings import get_settings
 from app.models.contrato import Contrato
 from app.models.contrato_hh_preco import ContratoHHPreco, TIPOS_HH
 from app.models.contrato_material_preco import ContratoMaterialPreco
+from app.repositories.loader import get_loader
 
 TipoHH = Literal["REGULAR", "EXTRA", "FERIADO"]
 
+settings = get_settings()
+
+# Cache por processo. Chaves (sempre com contrato_id na posição 1):
+#   ("contrato", contrato_id)   -> defaults + ativo/vigência do contrato
+#   ("hh", contrato_id)         -> {(maquina_id, tipo_hh): Vigencias}
+#   ("material", contrato_id)   -> {material_id: Vigencias}
+# A tabela de preços do contrato inteira vem em UM SELECT no primeiro uso;
+# daí em diante qualquer (chave, data) é resolvido em memória.
+# Chave ausente no dict = "não há preço específico" (cai no default).
+_cache = TTLCache(
+    "precos_contrato",
+    maxsize=settings.PRICE_CACHE_MAXSIZE,
+    ttl=settings.PRICE_CACHE_TTL_SECONDS,
+)
+
+def invalidar_cache_contrato(contrato_id: int) -> None:
+    """
+    Remove do cache tudo que pertence ao contrato (defaults e tabelas de preço).
+    Agendado pelos repositórios para depois do commit (db.session.apos_commit).
+    """
+    _cache.invalidate_where(lambda k: k[1] == contrato_id)
+
+def cache_stats() -> dict:
+    return _cache.stats()
+
+
+class Vigencias:
+    """
+    Histórico de preço de uma chave, em ordem de valido_de. Vale, entre os
+    registros cujo intervalo contém a data, o de maior valido_de: bisect nos
+    inícios e, se esse já terminou, recua até um que ainda cubra a data
+    (ex.: o permanente por baixo de um preço temporário que expirou).
+    """
+    __slots__ = ("_inicios", "_linhas")
+
+    def __init__(self, linhas: list[tuple[date, Optional[date], float, int]]) -> None:
+        self._linhas = linhas
+        self._inicios = [linha[0] for linha in linhas]
+
+    def em(self, as_of: date) -> Optional[tuple[float, int]]:
+        """(preco, uom_id) vigente na data, ou None."""
+        for i in range(bisect_right(self._inicios, as_of) - 1, -1, -1):
+            _, ate, preco, uom_id = self._linhas[i]
+            if ate is None or as_of <= ate:
+                return preco, uom_id
+        return None
+
+
+async def _get_tabela(db: AsyncSession, tipo: str, contrato_id: int) -> dict:
+    """{chave: Vigencias} de todos os preços específicos do contrato (cacheado)."""
+    key = (tipo, contrato_id)
+    cached = _cache.get(key)
+    if cached is not MISS:
+        return cached
+    versao = _cache.versao
+    if tipo == "hh":
+        m = ContratoHHPreco
+        stmt = select(m.maquina_id, m.tipo_hh, m.valido_de, m.valido_ate, m.preco_hora, m.uom_id)
+        ordem = (m.maquina_id, m.tipo_hh, m.valido_de)
+    else:
+        m = ContratoMaterialPreco
+        stmt = select(m.material_id, m.valido_de, m.valido_ate, m.preco_unitario, m.uom_id)
+        ordem = (m.material_id, m.valido_de)
+    # a ordem segue a chave única (contrato, ..., valido_de): leitura pelo índice
+    res = await db.execute(stmt.where(m.contrato_id == contrato_id).order_by(*ordem))
+    n_chave = len(ordem) - 1
+    historicos: dict = {}
+    for r in res:
+        chave = tuple(r[:n_chave]) if n_chave > 1 else r[0]
+        de, ate, preco, uom_id = r[n_chave:]
+        historicos.setdefault(chave, []).append((de, ate, float(preco), uom_id))
+    tabela = {chave: Vigencias(linhas) for chave, linhas in historicos.items()}
+    _cache.set(key, tabela, versao=versao)
+    return tabela
+
 async def _get_contrato_or_404(db: AsyncSession, contrato_id: int) -> Contrato:
-    contrato = await db.get(Contrato, contrato_id)
+    contrato = await get_loader(db).load(Contrato, contrato_id)
     if not contrato:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contrato não encontrado")
     return contrato
 
+def _defaults_de(contrato: Contrato) -> dict:
+    def _f(v):
+        return float(v) if v is not None else None
+    return {
+        "REGULAR": _f(contrato.hh_regular_default),
+        "EXTRA": _f(contrato.hh_extra_default),
+        "FERIADO": _f(contrato.hh_feriado_default),
+        "material_kg": _f(contrato.material_kg_default),
+        "ativo": contrato.ativo,
+        "data_inicio": contrato.data_inicio,
+        "data_fim": contrato.data_fim,
+    }
+
+async def get_defaults(db: AsyncSession, contrato_id: int) -> dict:
+    """
+    Defaults e vigência do contrato (cacheados), no formato que
+    checar_vigencia_contrato espera. 404 se o contrato não existir.
+    """
+    key = ("contrato", contrato_id)
+    cached = _cache.get(key)
+    if cached is not MISS:
+        return cached
+    versao = _cache.versao
+    defaults = _defaults_de(await _get_contrato_or_404(db, contrato_id))
+    _cache.set(key, defaults, versao=versao)
+    return defaults
+
+def checar_vigencia_contrato(defaults: dict, as_of: date) -> None:
+    """422 se o contrato estiver inativo ou fora da vigência na data."""
+    if not defaults["ativo"]:
+        raise HTTPException(status_code=422, detail="Contrato inativo.")
+    inicio, fim = defaults["data_inicio"], defaults["data_fim"]
+    if (inicio and as_of < inicio) or (fim and as_of > fim):
+        raise HTTPException(
+            status_code=422,
+            detail=f"Contrato fora de vigência em {as_of.isoformat()}.",
+        )
+
 async def resolve_preco_hh(
     db: AsyncSession,
     contrato_id: int,
     maquina_id: int,
     tipo_hh: TipoHH,
+    as_of: Optional[date] = None,
 ) -> dict:
     """
-    1) Tenta preço específico (contrato_id + maquina_id + tipo_hh)
+    1) Tenta preço específico (contrato_id + maquina_id + tipo_hh) vigente em `as_of`
     2) Se não existir, usa o default do contrato conforme tipo_hh
     3) Retorna dict informando 'fonte': 'especifico' | 'default'
+    `as_of` padrão: hoje. Contrato inativo ou fora de vigência na data: 422.
+    Leituras passam pelo cache de preços (ver invalidar_cache_contrato).
     """
     if tipo_hh not in TIPOS_HH:
         raise HTTPException(status_code=400, detail=f"tipo_hh inválido. Use um de {TIPOS_HH}.")
+    as_of = as_of or date.today()
 
-    contrato = await _get_contrato_or_404(db, contrato_id)
+    defaults = await get_defaults(db, contrato_id)
+    checar_vigencia_contrato(defaults, as_of)
 
     # Preço específico?
-    stmt = (
-        select(ContratoHHPreco)
-        .where(
-            (ContratoHHPreco.contrato_id == contrato_id)
-            & (ContratoHHPreco.maquina_id == maquina_id)
-            & (ContratoHHPreco.tipo_hh == tipo_hh)
-        )
-        .limit(1)
-    )
-    res = await db.execute(stmt)
-    esp: Optional[ContratoHHPreco] = res.scalars().first()
+    vig = (await _get_tabela(db, "hh", contrato_id)).get((maquina_id, tipo_hh))
+    esp = vig.em(as_of) if vig else None
 
     if esp:
+        preco, uom_id = esp
         return {
-            "preco": float(esp.preco_hora),
+            "preco": preco,
             "fonte": "especifico",
-            "uom_id": esp.uom_id,
+            "uom_id": uom_id,
             "contrato_id": contrato_id,
             "maquina_id": maquina_id,
             "tipo_hh": tipo_hh,
         }
 
     # Fallback: default do contrato
-    default_map = {
-        "REGULAR": contrato.hh_regular_default,
-        "EXTRA": contrato.hh_extra_default,
-        "FERIADO": contrato.hh_feriado_default,
-    }
-    valor_default = default_map.get(tipo_hh)
+    valor_default = defaults.get(tipo_hh)
 
     if valor_default is None:
         # sem específico e sem default → regra de negócio: 422
@@ -71,7 +181,7 @@ async def resolve_preco_hh(
         )
 
     return {
-        "preco": float(valor_default),
+        "preco": valor_default,
         "fonte": "default",
         "uom_id": None,  # default não tem UoM específico aqui
         "contrato_id": contrato_id,
@@ -83,44 +193,100 @@ async def resolve_preco_material(
     db: AsyncSession,
     contrato_id: int,
     material_id: int,
+    as_of: Optional[date] = None,
 ) -> dict:
     """
-    1) Tenta preço específico (contrato_id + material_id)
+    1) Tenta preço específico (contrato_id + material_id) vigente em `as_of`
     2) Se não existir, usa material_kg_default do contrato
        (assumindo que a UoM de referência do default é 'kg' – simples por enquanto)
     """
-    contrato = await _get_contrato_or_404(db, contrato_id)
+    as_of = as_of or date.today()
+    defaults = await get_defaults(db, contrato_id)
+    checar_vigencia_contrato(defaults, as_of)
 
-    stmt = (
-        select(ContratoMaterialPreco)
-        .where(
-            (ContratoMaterialPreco.contrato_id == contrato_id)
-            & (ContratoMaterialPreco.material_id == material_id)
-        )
-        .limit(1)
-    )
-    res = await db.execute(stmt)
-    esp: Optional[ContratoMaterialPreco] = res.scalars().first()
+    vig = (await _get_tabela(db, "material", contrato_id)).get(material_id)
+    esp = vig.em(as_of) if vig else None
 
     if esp:
+        preco, uom_id = esp
         return {
-            "preco": float(esp.preco_unitario),
+            "preco": preco,
             "fonte": "especifico",
-            "uom_id": esp.uom_id,
+            "uom_id": uom_id,
             "contrato_id": contrato_id,
             "material_id": material_id,
         }
 
-    if contrato.material_kg_default is None:
+    if defaults["material_kg"] is None:
         raise HTTPException(
             status_code=422,
             detail="Preço de material não configurado (nem específico, nem default por kg)."
         )
 
     return {
-        "preco": float(contrato.material_kg_default),
+        "preco": defaults["material_kg"],
         "fonte": "default",
         "uom_id": None,  # default simples (por kg) – refinamos depois se precisar
         "contrato_id": contrato_id,
         "material_id": material_id,
     }
+
+def _nao_configurado(msg: str) -> dict:
+    return {"preco": None, "fonte": "nao_configurado", "uom_id": None, "erro": msg}
+
+async def resolve_precos_lote(
+    db: AsyncSession,
+    contrato_id: int,
+    hh: Iterable[tuple[int, str]] = (),
+    materiais: Iterable[int] = (),
+    as_of: Optional[date] = None,
+) -> dict:
+    """
+    Resolve vários preços do mesmo contrato de uma vez (mesma regra de
+    resolve_preco_hh/resolve_preco_material, na data `as_of`):
+    - contrato e tabelas de preço do cache (ou 1 SELECT por tabela).
+    - Retorna {"hh": {(maquina_id, tipo_hh): {...}}, "materiais": {material_id: {...}}}
+    - Chaves sem específico e sem default vêm com fonte 'nao_configurado'
+      (preco None + 'erro'), em vez de levantar 422.
+    """
+    hh_keys = list(dict.fromkeys(hh))
+    mat_ids = list(dict.fromkeys(materiais))
+    for _, tipo_hh in hh_keys:
+        if tipo_hh not in TIPOS_HH:
+            raise HTTPException(status_code=400, detail=f"tipo_hh inválido. Use um de {TIPOS_HH}.")
+    as_of = as_of or date.today()
+
+    defaults = await get_defaults(db, contrato_id)
+    checar_vigencia_contrato(defaults, as_of)
+    tabela_hh = await _get_tabela(db, "hh", contrato_id) if hh_keys else {}
+    tabela_mat = await _get_tabela(db, "material", contrato_id) if mat_ids else {}
+
+    out_hh: dict = {}
+    for maquina_id, tipo_hh in hh_keys:
+        base = {"contrato_id": contrato_id, "maquina_id": maquina_id, "tipo_hh": tipo_hh}
+        vig = tabela_hh.get((maquina_id, tipo_hh))
+        esp = vig.em(as_of) if vig else None
+        if esp:
+            out_hh[(maquina_id, tipo_hh)] = {"preco": esp[0], "fonte": "especifico", "uom_id": esp[1], **base}
+        elif defaults.get(tipo_hh) is not None:
+            out_hh[(maquina_id, tipo_hh)] = {"preco": defaults[tipo_hh], "fonte": "default", "uom_id": None, **base}
+        else:
+            out_hh[(maquina_id, tipo_hh)] = {
+                **_nao_configurado("Preço de HH não configurado (nem específico, nem default)."), **base
+            }
+
+    out_mat: dict = {}
+    for material_id in mat_ids:
+        base = {"contrato_id": contrato_id, "material_id": material_id}
+        vig = tabela_mat.get(material_id)
+        esp = vig.em(as_of) if vig else None
+        if esp:
+            out_mat[material_id] = {"preco": esp[0], "fonte": "especifico", "uom_id": esp[1], **base}
+        elif defaults["material_kg"] is not None:
+            out_mat[material_id] = {"preco": defaults["material_kg"], "fonte": "default", "uom_id": None, **base}
+        else:
+            out_mat[material_id] = {
+                **_nao_configurado("Preço de material não configurado (nem específico, nem default por kg)."), **base
+            }
+
+    return {"hh": out_hh, "materiais": out_mat}
@@ -0,0 +1,213 @@
+# app/services/reprecificacao.py
+"""
+Reprecificação dos orçamentos abertos de um contrato (POST /contratos/{id}:repricing).
+
+Os itens guardam um snapshot de preço; quando a tabela do contrato muda,
+os RASCUNHOs ficam defasados. Aqui o preço de cada item HH/MATERIAL é
+re-resolvido em SQL (mesma regra de precos_contrato: específico -> default
+do contrato), com joins sobre o conjunto inteiro — sem laço por item:
+- 1 SELECT agregado por orçamento (o relatório; é tudo que o dry-run faz);
+- 1 UPDATE ... FROM nos itens alterados;
+- 1 UPDATE nos totais dos orçamentos afetados (lotes de ids).
+A ordem (itens -> orçamento) é a mesma das rotas de item, para não inverter
+a ordem dos locks no Postgres.
+"""
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.contrato import Contrato
+from app.models.contrato_hh_preco import ContratoHHPreco
+from app.models.contrato_material_preco import ContratoMaterialPreco
+from app.models.orcamento import Orcamento
+from app.models.orcamento_item import OrcamentoItem
+from app.services.precos_contrato import get_defaults, checar_vigencia_contrato
+
+STATUS_ABERTO = "RASCUNHO"
+_LOTE_IDS = 500  # ids de orçamento por UPDATE ... IN
+
+
+def _vigente(m, contrato_id: int, chave: list, as_of: date):
+    """
+    Condição de join: registro de `m` vigente em `as_of` — entre os que cobrem
+    a data (valido_de <= data <= valido_ate), o de maior valido_de (mesma
+    regra de precos_contrato.Vigencias).
+    """
+    h = aliased(m)
+    ultimo = (
+        select(func.max(h.valido_de))
+        .where(
+            h.contrato_id == contrato_id,
+            *(getattr(h, c) == v for c, v in chave),
+            h.valido_de <= as_of,
+            or_(h.valido_ate.is_(None), h.valido_ate >= as_of),
+        )
+        .scalar_subquery()
+    )
+    return and_(m.contrato_id == contrato_id, *(getattr(m, c) == v for c, v in chave), m.valido_de == ultimo)
+
+
+def com_precos_vigentes(stmt, contrato_id: int, as_of: date):
+    """
+    Junta a `stmt` (SELECT sobre OrcamentoItem) o contrato e seus preços
+    vigentes em `as_of`. Retorna (stmt, novo_preco, novo_uom): o preço
+    re-resolvido (NULL se não configurado ou item LIVRE) e a UoM.
+    """
+    default_hh = case(
+        (OrcamentoItem.tipo_hh == "REGULAR", Contrato.hh_regular_default),
+        (OrcamentoItem.tipo_hh == "EXTRA", Contrato.hh_extra_default),
+        (OrcamentoItem.tipo_hh == "FERIADO", Contrato.hh_feriado_default),
+    )
+    e_hh = OrcamentoItem.item_tipo == "HH"
+    e_material = OrcamentoItem.item_tipo == "MATERIAL"
+    novo_preco = case(
+        (e_hh, func.coalesce(ContratoHHPreco.preco_hora, default_hh)),
+        (e_material, func.coalesce(ContratoMaterialPreco.preco_unitario, Contrato.material_kg_default)),
+    )
+    # default não tem UoM: mantém a do item (como em orcamento_item.create)
+    novo_uom = func.coalesce(
+        case((e_hh, ContratoHHPreco.uom_id), (e_material, ContratoMaterialPreco.uom_id)),
+        OrcamentoItem.uom_id,
+    )
+    stmt = (
+        stmt.join(Contrato, Contrato.id == contrato_id)
+        .outerjoin(ContratoHHPreco, and_(e_hh, _vigente(
+            ContratoHHPreco, contrato_id,
+            [("maquina_id", OrcamentoItem.maquina_id), ("tipo_hh", OrcamentoItem.tipo_hh)],
+            as_of,
+        )))
+        .outerjoin(ContratoMaterialPreco, and_(e_material, _vigente(
+            ContratoMaterialPreco, contrato_id, [("material_id", OrcamentoItem.material_id)], as_of,
+        )))
+    )
+    return stmt, novo_preco, novo_uom
+
+
+def _novos_precos(contrato_id: int, as_of: date):
+    """Subquery: itens HH/MATERIAL dos orçamentos abertos com o preço re-resolvido em `as_of`."""
+    stmt = (
+        select(
+            OrcamentoItem.id,
+            OrcamentoItem.orcamento_id,
+            OrcamentoItem.preco_unitario,
+            OrcamentoItem.total_item,
+            OrcamentoItem.uom_id,
+        )
+        .join(Orcamento, Orcamento.id == OrcamentoItem.orcamento_id)
+        .where(
+            Orcamento.contrato_id == contrato_id,
+            Orcamento.tipo == "CONTRATO",
+            Orcamento.status == STATUS_ABERTO,
+            OrcamentoItem.item_tipo.in_(("HH", "MATERIAL")),
+        )
+    )
+    stmt, novo_preco, novo_uom = com_precos_vigentes(stmt, contrato_id, as_of)
+    return stmt.add_columns(
+        novo_preco.label("novo_preco"),
+        func.round(OrcamentoItem.quantidade * novo_preco, 2).label("novo_total"),
+        novo_uom.label("novo_uom"),
+    ).subquery("novos")
+
+
+def _alterado(n):
+    """Item com preço resolvido e diferente do snapshot (preço, total ou UoM)."""
+    return and_(
+        n.c.novo_preco.is_not(None),
+        or_(
+            n.c.novo_preco != n.c.preco_unitario,
+            n.c.novo_total != n.c.total_item,
+            n.c.novo_uom.is_distinct_from(n.c.uom_id),
+        ),
+    )
+
+
+async def reprecificar(
+    db: AsyncSession, contrato_id: int, dry_run: bool = False, as_of: Optional[date] = None
+) -> dict:
+    """
+    Re-resolve os preços dos itens HH/MATERIAL dos orçamentos RASCUNHO do
+    contrato e atualiza preco_unitario/total_item/uom_id e os totais.
+    Itens sem preço configurado (nem específico, nem default) ficam como
+    estão e são contados em `sem_preco`. Com `dry_run`, só o relatório
+    (em `depois`, a projeção). Preços vigentes em `as_of` (padrão: hoje).
+    404 se o contrato não existir; 422 se inativo/fora de vigência na data.
+    """
+    as_of = as_of or date.today()
+    checar_vigencia_contrato(await get_defaults(db, contrato_id), as_of)
+    n = _novos_precos(contrato_id, as_of)
+    alterado = _alterado(n)
+
+    relatorio = (
+        select(
+            n.c.orcamento_id,
+            Orcamento.subtotal,
+            Orcamento.total,
+            func.count().label("itens"),
+            func.sum(case((alterado, 1), else_=0)).label("alterados"),
+            func.sum(case((n.c.novo_preco.is_(None), 1), else_=0)).label("sem_preco"),
+            func.sum(case((alterado, n.c.novo_total - n.c.total_item), else_=0)).label("delta"),
+        )
+        .join(Orcamento, Orcamento.id == n.c.orcamento_id)
+        .group_by(n.c.orcamento_id, Orcamento.subtotal, Orcamento.total)
+        .order_by(n.c.orcamento_id)
+    )
+    orcamentos, avaliados, itens = [], 0, 0
+    for r in await db.execute(relatorio):
+        avaliados += 1
+        itens += r.itens
+        if not (r.alterados or r.sem_preco):
+            continue
+        subtotal, total, delta = float(r.subtotal), float(r.total), round(float(r.delta or 0), 2)
+        orcamentos.append({
+            "orcamento_id": r.orcamento_id,
+            "itens": r.itens,
+            "alterados": r.alterados,
+            "sem_preco": r.sem_preco,
+            "antes": {"subtotal": subtotal, "total": total},
+            "depois": {"subtotal": round(subtotal + delta, 2), "total": round(total + delta, 2)},
+        })
+
+    afetados = [o for o in orcamentos if o["alterados"]]
+    if afetados and not dry_run:
+        await db.execute(
+            update(OrcamentoItem)
+            .where(OrcamentoItem.id == n.c.id, alterado)
+            .values(preco_unitario=n.c.novo_preco, total_item=n.c.novo_total, uom_id=n.c.novo_uom),
+            execution_options={"synchronize_session": False},
+        )
+        # totais pela soma dos itens (como orcamento.recalcular_totais)
+        soma = (
+            select(func.round(func.coalesce(func.sum(OrcamentoItem.total_item), 0), 2))
+            .where(OrcamentoItem.orcamento_id == Orcamento.id)
+            .scalar_subquery()
+        )
+        por_id = {o["orcamento_id"]: o for o in afetados}
+        ids = list(por_id)
+        for i in range(0, len(ids), _LOTE_IDS):
+            res = await db.execute(
+                update(Orcamento)
+                .where(Orcamento.id.in_(ids[i:i + _LOTE_IDS]))
+                .values(subtotal=soma, total=soma - Orcamento.desconto + Orcamento.acrescimo)
+                .returning(Orcamento.id, Orcamento.subtotal, Orcamento.total),
+                execution_options={"synchronize_session": False},
+            )
+            for r in res:
+                por_id[r.id]["depois"] = {"subtotal": float(r.subtotal), "total": float(r.total)}
+        # objetos desses orçamentos/itens já carregados na sessão ficaram velhos
+        for obj in list(db.identity_map.values()):
+            if isinstance(obj, (Orcamento, OrcamentoItem)):
+                db.expire(obj)
+
+    return {
+        "contrato_id": contrato_id,
+        "dry_run": dry_run,
+        "as_of": as_of.isoformat(),
+        "orcamentos_avaliados": avaliados,
+        "itens_avaliados": itens,
+        "itens_alterados": sum(o["alterados"] for o in afetados),
+        "itens_sem_preco": sum(o["sem_preco"] for o in orcamentos),
+        "orcamentos": orcamentos,
+    }
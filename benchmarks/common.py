@@ -0,0 +1,267 @@
+"""
+Utilidades compartilhadas pelos scripts de benchmark/carga.
+
+IMPORTANTE: configure_env() precisa rodar ANTES de importar qualquer coisa de
+`app` — Settings e o engine são criados no import e leem DATABASE_URL.
+"""
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure_env(database_url: Optional[str]) -> str:
+    """
+    Define as variáveis de ambiente da app para o benchmark e devolve a URL.
+    Sem URL: SQLite num arquivo temporário (descartável).
+    """
+    if not database_url:
+        path = os.path.join(tempfile.mkdtemp(prefix="usinagem-bench-"), "bench.db")
+        database_url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-" + "x" * 32)
+    os.environ["ENV"] = "test"  # sem meta.debug nos envelopes
+    # o benchmark mede a app, não o detector de N+1
+    os.environ.setdefault("QUERY_RECORDER_ENABLED", "false")
+    return database_url
+
+
+def is_disposable(database_url: str) -> bool:
+    return database_url.startswith("sqlite:///") and "usinagem-bench-" in database_url
+
+
+def git_info() -> dict:
+    def _git(*args) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except Exception:
+            return None
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def environment_info(database_url: str) -> dict:
+    import sqlalchemy
+    return {
+        **git_info(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "platform": platform.platform(),
+        "database": database_url.split("://", 1)[0],
+    }
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Percentil por interpolação linear (valores já ordenados)."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    f = int(k)
+    c = min(f + 1, len(sorted_values) - 1)
+    return sorted_values[f] + (sorted_values[c] - sorted_values[f]) * (k - f)
+
+
+def summarize(latencies_s: list[float], errors: int, elapsed_s: float, db_queries: int = 0) -> dict:
+    ms = sorted(x * 1000 for x in latencies_s)
+    n = len(ms)
+    return {
+        "n": n,
+        "errors": errors,
+        "error_rate": round(errors / n, 4) if n else 0.0,
+        "rps": round(n / elapsed_s, 1) if elapsed_s else None,
+        "mean_ms": round(sum(ms) / n, 3) if n else None,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p90_ms": round(percentile(ms, 90), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(ms[-1], 3) if n else None,
+        "db_queries_per_req": round(db_queries / n, 2) if n else None,
+    }
+
+
+class QueryCounter:
+    """Conta statements no engine da app (para queries/req nos resultados)."""
+
+    def __init__(self, engine) -> None:
+        from sqlalchemy import event
+        self.total = 0
+        event.listen(engine.sync_engine, "after_cursor_execute", self._inc)
+
+    def _inc(self, *args) -> None:
+        self.total += 1
+
+
+async def reset_schema(engine) -> None:
+    from app.models.base import Base
+    import app.models  # noqa: F401  (registra todos os modelos)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+# ---- seed ----
+@dataclass
+class SeedConfig:
+    clientes: int = 2000
+    contratos: int = 200
+    maquinas: int = 20
+    materiais: int = 200
+    orcamentos: int = 300
+    # tamanhos de orçamento (itens) usados nos cenários de listagem
+    tamanhos: tuple[int, ...] = (10, 100, 1000)
+    seed: int = 42
+
+
+@dataclass
+class SeedData:
+    uom_hora: int = 0
+    uom_kg: int = 0
+    cliente_ids: list[int] = field(default_factory=list)
+    contrato_ids: list[int] = field(default_factory=list)
+    maquina_ids: list[int] = field(default_factory=list)
+    material_ids: list[int] = field(default_factory=list)
+    orcamento_ids: list[int] = field(default_factory=list)
+    orcamento_por_tamanho: dict[int, int] = field(default_factory=dict)
+    # orcamento_id -> contrato_id
+    contrato_do_orcamento: dict[int, int] = field(default_factory=dict)
+    # contrato_id -> cliente_id (orçamento CONTRATO exige o cliente do contrato)
+    cliente_do_contrato: dict[int, int] = field(default_factory=dict)
+    users: dict[str, tuple[str, str]] = field(default_factory=dict)  # role -> (email, senha)
+    seconds: float = 0.0
+
+
+USER_PASSWORD = "bench-senha-123"
+
+
+async def seed(session_factory, cfg: SeedConfig) -> SeedData:
+    """
+    Popula o banco direto por INSERT em lote (sem passar pela API): clientes,
+    contratos com preço de HH por máquina e de material, orçamentos CONTRATO
+    com itens já precificados (totais coerentes) e um usuário por papel.
+    """
+    from sqlalchemy import insert, update
+    from app.core.security import hash_password
+    from app.models.cliente import Cliente
+    from app.models.contrato import Contrato
+    from app.models.contrato_hh_preco import ContratoHHPreco, TIPOS_HH
+    from app.models.contrato_material_preco import ContratoMaterialPreco
+    from app.models.maquina import Maquina
+    from app.models.material import Material
+    from app.models.orcamento import Orcamento
+    from app.models.orcamento_item import OrcamentoItem
+    from app.models.unidade_medida import UnidadeMedida
+    from app.models.user import User
+
+    rnd = random.Random(cfg.seed)
+    out = SeedData()
+    inicio = time.perf_counter()
+
+    async with session_factory() as db:
+        async def ids(model, rows) -> list[int]:
+            res = await db.scalars(insert(model).returning(model.id), rows)
+            return sorted(res.all())
+
+        hashed = hash_password(USER_PASSWORD)
+        for role in ("ADMIN", "OPERACAO", "VIEWER"):
+            email = f"{role.lower()}@bench.local"
+            out.users[role] = (email, USER_PASSWORD)
+            await db.execute(insert(User), [{
+                "email": email, "full_name": f"Bench {role}", "hashed_password": hashed,
+                "role": role, "is_active": True,
+            }])
+
+        out.uom_hora, out.uom_kg = await ids(UnidadeMedida, [
+            {"nome": "Hora", "simbolo": "h", "categoria": "tempo"},
+            {"nome": "Quilograma", "simbolo": "kg", "categoria": "massa"},
+        ])
+        out.cliente_ids = await ids(Cliente, [
+            {"nome": f"Cliente {i:05d}", "email": f"cliente{i}@bench.local"} for i in range(cfg.clientes)
+        ])
+        out.maquina_ids = await ids(Maquina, [
+            {"nome": f"Máquina {i:03d}", "uom_hh_id": out.uom_hora} for i in range(cfg.maquinas)
+        ])
+        out.material_ids = await ids(Material, [
+            {"nome": f"Material {i:04d}", "uom_base_id": out.uom_kg} for i in range(cfg.materiais)
+        ])
+        clientes_contrato = [rnd.choice(out.cliente_ids) for _ in range(cfg.contratos)]
+        out.contrato_ids = await ids(Contrato, [
+            {
+                "cliente_id": cli, "moeda": "BRL", "ativo": True,
+                "hh_regular_default": 100, "hh_extra_default": 150, "hh_feriado_default": 200,
+                "material_kg_default": 12,
+            }
+            for cli in clientes_contrato
+        ])
+        out.cliente_do_contrato = dict(zip(out.contrato_ids, clientes_contrato))
+
+        # preço específico de HH para todas as máquinas × tipos; material para ~1/4
+        precos_hh: dict[tuple[int, int, str], float] = {}
+        for cid in out.contrato_ids:
+            for mid in out.maquina_ids:
+                for tipo in TIPOS_HH:
+                    precos_hh[(cid, mid, tipo)] = round(rnd.uniform(80, 300), 2)
+        await db.execute(insert(ContratoHHPreco), [
+            {"contrato_id": c, "maquina_id": m, "tipo_hh": t, "preco_hora": p, "uom_id": out.uom_hora}
+            for (c, m, t), p in precos_hh.items()
+        ])
+        precos_mat: dict[tuple[int, int], float] = {}
+        for cid in out.contrato_ids:
+            for mid in rnd.sample(out.material_ids, max(1, len(out.material_ids) // 4)):
+                precos_mat[(cid, mid)] = round(rnd.uniform(5, 60), 2)
+        await db.execute(insert(ContratoMaterialPreco), [
+            {"contrato_id": c, "material_id": m, "preco_unitario": p, "uom_id": out.uom_kg}
+            for (c, m), p in precos_mat.items()
+        ])
+
+        # orçamentos: os maiores primeiro (um de cada tamanho), o resto com 10–50 itens
+        tamanhos = list(cfg.tamanhos) + [rnd.randint(10, 50) for _ in range(max(0, cfg.orcamentos - len(cfg.tamanhos)))]
+        contratos_orc = [rnd.choice(out.contrato_ids) for _ in tamanhos]
+        out.orcamento_ids = await ids(Orcamento, [
+            {
+                "cliente_id": out.cliente_do_contrato[cid], "tipo": "CONTRATO", "status": "RASCUNHO",
+                "contrato_id": cid, "moeda": "BRL", "titulo": f"Orçamento bench {i}",
+                "subtotal": 0, "desconto": 0, "acrescimo": 0, "total": 0,
+            }
+            for i, cid in enumerate(contratos_orc)
+        ])
+        for oid, n, cid in zip(out.orcamento_ids, tamanhos, contratos_orc):
+            out.contrato_do_orcamento[oid] = cid
+            if n in cfg.tamanhos and n not in out.orcamento_por_tamanho:
+                out.orcamento_por_tamanho[n] = oid
+            itens, subtotal = [], 0.0
+            for _ in range(n):
+                qtd = round(rnd.uniform(0.5, 40), 3)
+                if rnd.random() < 0.7:
+                    mid, tipo = rnd.choice(out.maquina_ids), rnd.choice(TIPOS_HH)
+                    preco = precos_hh[(cid, mid, tipo)]
+                    item = {"item_tipo": "HH", "maquina_id": mid, "tipo_hh": tipo, "material_id": None,
+                            "uom_id": out.uom_hora}
+                else:
+                    mid = rnd.choice(out.material_ids)
+                    preco = precos_mat.get((cid, mid), 12.0)
+                    item = {"item_tipo": "MATERIAL", "maquina_id": None, "tipo_hh": None, "material_id": mid,
+                            "uom_id": out.uom_kg}
+                total = round(qtd * preco, 2)
+                subtotal += total
+                itens.append({**item, "orcamento_id": oid, "descricao": None, "quantidade": qtd,
+                              "preco_unitario": preco, "total_item": total})
+            await db.execute(insert(OrcamentoItem), itens)
+            await db.execute(
+                update(Orcamento).where(Orcamento.id == oid).values(subtotal=round(subtotal, 2), total=round(subtotal, 2))
+            )
+        await db.commit()
+
+    out.seconds = round(time.perf_counter() - inicio, 2)
+    return out
@@ -0,0 +1,111 @@
+"""
+Micro-benchmark: custo por request das camadas de middleware.
+
+Compara, sobre uma rota trivial, três pilhas:
+  - sem middleware (linha de base)
+  - legado: RequestID + catch-all via BaseHTTPMiddleware (como era antes)
+  - atual:  RequestIDMiddleware + ExceptionEnvelopeMiddleware em ASGI puro
+
+Chama o app ASGI diretamente (sem servidor/socket), então o número medido é
+só o overhead das camadas.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.middleware_overhead [--requests 20000]
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from app.core.api import fail
+from app.core.middlewares import ExceptionEnvelopeMiddleware, RequestIDMiddleware
+
+
+# ---- pilha legada (reproduzida aqui só para comparação) ----
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        rid = request.headers.get("X-Request-Id") or str(uuid.uuid4())
+        request.state.request_id = rid
+        response = await call_next(request)
+        response.headers["X-Request-Id"] = rid
+        return response
+
+
+class LegacyCatchAllMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        try:
+            return await call_next(request)
+        except Exception as e:
+            return JSONResponse(status_code=500, content=fail("Erro interno no servidor", errors=str(e), request=request))
+
+
+async def _ping(request):
+    return PlainTextResponse("ok")
+
+
+def _app(middleware: list[Middleware]) -> Starlette:
+    return Starlette(routes=[Route("/ping", _ping)], middleware=middleware)
+
+
+PILHAS = {
+    "sem middleware": _app([]),
+    "legado (BaseHTTPMiddleware)": _app([
+        Middleware(LegacyRequestIDMiddleware),
+        Middleware(LegacyCatchAllMiddleware),
+    ]),
+    "atual (ASGI puro)": _app([
+        Middleware(RequestIDMiddleware),
+        Middleware(ExceptionEnvelopeMiddleware),
+    ]),
+}
+
+
+async def _um_request(app) -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/ping", "raw_path": b"/ping",
+        "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def _medir(app, n: int) -> float:
+    for _ in range(min(n, 500)):  # aquecimento
+        await _um_request(app)
+    inicio = time.perf_counter()
+    for _ in range(n):
+        await _um_request(app)
+    return (time.perf_counter() - inicio) / n * 1e6  # µs por request
+
+
+async def main(n: int) -> None:
+    resultados = {nome: await _medir(app, n) for nome, app in PILHAS.items()}
+    base = resultados["sem middleware"]
+    print(f"{n} requests por pilha")
+    for nome, us in resultados.items():
+        print(f"  {nome:<30} {us:8.1f} µs/req   (+{us - base:6.1f} µs de middleware)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,244 @@
+"""
+Benchmark do caminho quente de orçamentos (app real via create_app(), cliente
+ASGI em processo — sem rede).
+
+Popula o banco com dados realistas (milhares de clientes, centenas de
+contratos com preço de HH por máquina, orçamentos de 10 a 1000 itens) e mede
+vazão e latência (p50/p90/p95/p99) de:
+  login, criação/alteração/exclusão de item, listagem de itens (por tamanho
+  de orçamento), preview de preço (HH e material) e listagem de orçamentos.
+
+Grava um JSON com os resultados (commit, ambiente, parâmetros) para comparar
+commits; --compare aponta regressões de p95 contra um resultado anterior.
+
+Uso (na raiz do projeto; requer httpx — requirements-dev.txt):
+    python -m benchmarks.quoting                          # SQLite temporário
+    python -m benchmarks.quoting --database-url postgresql://u:p@localhost/bench --reset
+    python -m benchmarks.quoting --compare benchmarks/results/<anterior>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Awaitable, Callable
+
+from benchmarks.common import (
+    ROOT, SeedConfig, configure_env, environment_info, is_disposable, summarize,
+)
+
+Op = Callable[[int], Awaitable[bool]]  # recebe o índice da iteração; True = sucesso
+
+
+async def run_scenario(op: Op, iterations: int, concurrency: int, counter) -> dict:
+    latencias: list[float] = []
+    erros = 0
+    fila = iter(range(iterations))
+
+    async def worker():
+        nonlocal erros
+        for i in fila:
+            inicio = time.perf_counter()
+            try:
+                ok = await op(i)
+            except Exception:
+                ok = False
+            latencias.append(time.perf_counter() - inicio)
+            if not ok:
+                erros += 1
+
+    q0 = counter.total
+    inicio = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencias, erros, time.perf_counter() - inicio, counter.total - q0)
+
+
+async def main(args) -> int:
+    database_url = configure_env(args.database_url)
+    if not is_disposable(database_url) and not args.reset:
+        print("Banco não descartável: passe --reset para recriar o schema (APAGA os dados).", file=sys.stderr)
+        return 2
+
+    # imports da app só depois de configurar o ambiente
+    import httpx
+    from app.db.session import SessionLocal, engine
+    from app.main import create_app
+    from benchmarks.common import QueryCounter, reset_schema, seed
+
+    cfg = SeedConfig(
+        clientes=args.clientes, contratos=args.contratos, maquinas=args.maquinas,
+        materiais=args.materiais, orcamentos=args.orcamentos, seed=args.seed,
+    )
+    await reset_schema(engine)
+    dados = await seed(SessionLocal, cfg)
+    print(f"seed: {cfg} em {dados.seconds}s")
+
+    rnd = random.Random(args.seed)
+    app = create_app()
+    P = "/api/v1"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        email, senha = dados.users["ADMIN"]
+        r = await c.post(P + "/auth/login", json={"email": email, "password": senha})
+        r.raise_for_status()
+        c.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+
+        # orçamento de trabalho (tamanho médio) para create/update/delete
+        orc_trabalho = dados.orcamento_por_tamanho.get(100) or dados.orcamento_ids[0]
+        contrato_trabalho = dados.contrato_do_orcamento[orc_trabalho]
+        criados: list[int] = []
+
+        async def login(i):
+            r = await c.post(P + "/auth/login", json={"email": email, "password": senha})
+            return r.status_code == 200
+
+        async def item_create(i):
+            r = await c.post(P + f"/orcamentos/{orc_trabalho}/itens", json={
+                "item_tipo": "HH", "maquina_id": rnd.choice(dados.maquina_ids),
+                "tipo_hh": rnd.choice(("REGULAR", "EXTRA", "FERIADO")),
+                "quantidade": round(rnd.uniform(1, 20), 3),
+            })
+            if r.status_code == 201:
+                criados.append(r.json()["data"]["id"])
+                return True
+            return False
+
+        async def garantir_itens(qtd: int, nome: str) -> None:
+            """Itens de trabalho para update/delete quando item_create não rodou antes (--only)."""
+            if len(criados) >= qtd:
+                return
+            print(f"  ({nome}: criando {qtd - len(criados)} itens de trabalho)")
+            while len(criados) < qtd:
+                if not await item_create(len(criados)):
+                    raise RuntimeError(f"{nome}: não foi possível criar itens de trabalho")
+
+        async def item_update(i):
+            item_id = criados[i % len(criados)]
+            r = await c.put(P + f"/orcamentos/{orc_trabalho}/itens/{item_id}",
+                            json={"quantidade": round(rnd.uniform(1, 20), 3)})
+            return r.status_code == 200
+
+        async def item_delete(i):
+            if not criados:
+                return False
+            item_id = criados.pop()
+            r = await c.delete(P + f"/orcamentos/{orc_trabalho}/itens/{item_id}")
+            return r.status_code in (200, 204)
+
+        def item_list(oid):
+            async def _op(i):
+                r = await c.get(P + f"/orcamentos/{oid}/itens")
+                return r.status_code == 200
+            return _op
+
+        async def preview_hh(i):
+            r = await c.get(P + f"/contratos/{contrato_trabalho}/precos/hh", params={
+                "maquina_id": rnd.choice(dados.maquina_ids), "tipo_hh": "REGULAR",
+            })
+            return r.status_code == 200
+
+        async def preview_material(i):
+            r = await c.get(P + f"/contratos/{contrato_trabalho}/precos/material", params={
+                "material_id": rnd.choice(dados.material_ids),
+            })
+            return r.status_code == 200
+
+        async def orcamento_list(i):
+            r = await c.get(P + "/orcamentos", params={"page": 1 + i % 5, "size": 50})
+            return r.status_code == 200
+
+        n, conc = args.iterations, args.concurrency
+        cenarios: list[tuple[str, Op, int]] = [
+            ("login", login, max(1, n // 10)),  # bcrypt: poucas iterações bastam
+            ("item_create", item_create, n),
+            ("item_update", item_update, n),
+            ("item_delete", item_delete, n),
+            *[(f"item_list_{tam}", item_list(oid), n) for tam, oid in sorted(dados.orcamento_por_tamanho.items())],
+            ("price_preview_hh", preview_hh, n),
+            ("price_preview_material", preview_material, n),
+            ("orcamento_list", orcamento_list, n),
+        ]
+        if args.only:
+            cenarios = [c_ for c_ in cenarios if c_[0] in args.only]
+
+        counter = QueryCounter(engine)
+        resultados = {}
+        for nome, op, iters in cenarios:
+            if nome == "item_update":
+                await garantir_itens(max(conc, 10), nome)
+            elif nome == "item_delete":
+                await garantir_itens(iters, nome)
+            if nome != "item_delete":  # delete consome os itens criados; sem aquecimento
+                await run_scenario(op, min(args.warmup, iters), conc, counter)
+            resultados[nome] = res = await run_scenario(op, iters, conc, counter)
+            print(f"  {nome:<24} n={res['n']:<5} err={res['errors']:<3} {res['rps']:>8} req/s  "
+                  f"p50={res['p50_ms']:>8.2f}  p95={res['p95_ms']:>8.2f}  p99={res['p99_ms']:>8.2f} ms  "
+                  f"q/req={res['db_queries_per_req']}")
+
+    resultado = {
+        "benchmark": "quoting",
+        "environment": environment_info(database_url),
+        "params": {
+            "iterations": n, "concurrency": conc, "warmup": args.warmup,
+            "seed": {k: v for k, v in vars(cfg).items()},
+        },
+        "scenarios": resultados,
+    }
+    out = args.out or os.path.join(
+        ROOT, "benchmarks", "results",
+        f"quoting-{resultado['environment']['database'].split('+')[0]}-{resultado['environment']['commit'] or 'nogit'}.json",
+    )
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"resultados: {out}")
+
+    if args.compare:
+        return compare(args.compare, resultado, args.threshold)
+    return 0
+
+
+def compare(baseline_path: str, atual: dict, threshold_pct: float) -> int:
+    """Imprime a variação de p95 por cenário; 1 se algum piorou além do limite."""
+    with open(baseline_path, encoding="utf-8") as f:
+        base = json.load(f)
+    print(f"\ncomparação com {base['environment'].get('commit')} (limite +{threshold_pct:g}% no p95)")
+    regressoes = 0
+    for nome, res in atual["scenarios"].items():
+        antes = base["scenarios"].get(nome)
+        if not antes or not antes.get("p95_ms"):
+            print(f"  {nome:<24} (sem base)")
+            continue
+        delta = (res["p95_ms"] - antes["p95_ms"]) / antes["p95_ms"] * 100
+        marca = ""
+        if delta > threshold_pct:
+            marca = "  <-- REGRESSÃO"
+            regressoes += 1
+        print(f"  {nome:<24} p95 {antes['p95_ms']:>8.2f} -> {res['p95_ms']:>8.2f} ms ({delta:+6.1f}%){marca}")
+    return 1 if regressoes else 0
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--database-url", help="sync URL como em DATABASE_URL (padrão: SQLite temporário)")
+    p.add_argument("--reset", action="store_true", help="recria o schema (obrigatório fora do SQLite temporário)")
+    p.add_argument("--iterations", type=int, default=200)
+    p.add_argument("--concurrency", type=int, default=4)
+    p.add_argument("--warmup", type=int, default=20)
+    p.add_argument("--clientes", type=int, default=2000)
+    p.add_argument("--contratos", type=int, default=200)
+    p.add_argument("--maquinas", type=int, default=20)
+    p.add_argument("--materiais", type=int, default=200)
+    p.add_argument("--orcamentos", type=int, default=300)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--only", nargs="*", help="roda só os cenários listados")
+    p.add_argument("--out", help="arquivo JSON de saída (padrão: benchmarks/results/...)")
+    p.add_argument("--compare", help="JSON de um resultado anterior para comparar")
+    p.add_argument("--threshold", type=float, default=15.0, help="regressão de p95 tolerada (%%)")
+    return p.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,282 @@
+"""
+Carga mista simulando o uso real (orçamentistas), em processo ou contra um
+uvicorn local.
+
+Usuários virtuais (VUs), cada um logado com o próprio papel:
+  - VIEWER:   lista /orcamentos (páginas/cursor) e abre /orcamentos/{id}/itens
+  - OPERACAO: cria orçamento CONTRATO e monta item a item (HH/material),
+              ajusta quantidades, confere o orçamento
+  - ADMIN:    revisa e altera preços de HH dos contratos
+
+Os payloads são gerados pelos próprios schemas de app/schemas (o que a API
+aceita). Ao final: p50/p95/p99 e taxa de erro por endpoint e total de
+queries e commits por rota (lidos do /metrics antes/depois).
+
+Uso (na raiz do projeto; requer httpx — requirements-dev.txt):
+    python -m benchmarks.workload --duration 30 --viewers 20 --operadores 5 --admins 1
+    # contra um servidor: suba o uvicorn com o MESMO DATABASE_URL; o script
+    # recria o schema e popula antes de gerar carga
+    python -m benchmarks.workload --base-url http://127.0.0.1:8000 \\
+        --database-url sqlite:///./bench.db --reset
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.common import SeedConfig, configure_env, environment_info, is_disposable, summarize
+
+P = "/api/v1"
+
+
+class Recorder:
+    """Latência/erros por endpoint (rótulo = método + rota template)."""
+
+    def __init__(self) -> None:
+        self.lat: dict[str, list[float]] = defaultdict(list)
+        self.err: dict[str, int] = defaultdict(int)
+        self.status: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def call(self, c, label: str, method: str, url: str, ok=(200, 201, 204), **kw):
+        inicio = time.perf_counter()
+        try:
+            r = await c.request(method, url, **kw)
+        except Exception:
+            self.lat[label].append(time.perf_counter() - inicio)
+            self.err[label] += 1
+            self.status[label][0] += 1
+            return None
+        self.lat[label].append(time.perf_counter() - inicio)
+        self.status[label][r.status_code] += 1
+        if r.status_code not in ok:
+            self.err[label] += 1
+            return None
+        return r
+
+
+async def _login(c, rec: Recorder, email: str, senha: str) -> None:
+    from app.schemas.user import LoginInput
+    r = await rec.call(c, "POST /auth/login", "POST", P + "/auth/login",
+                       json=LoginInput(email=email, password=senha).model_dump())
+    if r is None:
+        raise RuntimeError(f"login falhou para {email}")
+    c.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+
+
+async def _pausa(rnd: random.Random, think_ms: float) -> None:
+    await asyncio.sleep(rnd.uniform(0, think_ms) / 1000 if think_ms else 0)
+
+
+async def viewer(c, rec, rnd, dados, deadline, think_ms):
+    while time.monotonic() < deadline:
+        if rnd.random() < 0.5:
+            await rec.call(c, "GET /orcamentos", "GET", P + "/orcamentos",
+                           params={"page": rnd.randint(1, 5), "size": 50})
+        else:
+            r = await rec.call(c, "GET /orcamentos (cursor)", "GET", P + "/orcamentos", params={"size": 50})
+            cursor = r.json()["meta"].get("next_cursor") if r is not None else None
+            if cursor:
+                await rec.call(c, "GET /orcamentos (cursor)", "GET", P + "/orcamentos",
+                               params={"size": 50, "after": cursor})
+        oid = rnd.choice(dados.orcamento_ids)
+        await rec.call(c, "GET /orcamentos/{id}/itens", "GET", P + f"/orcamentos/{oid}/itens")
+        await _pausa(rnd, think_ms)
+
+
+async def operador(c, rec, rnd, dados, deadline, think_ms):
+    from app.schemas.orcamento import OrcamentoCreate
+    from app.schemas.orcamento_item import OrcamentoItemCreate, OrcamentoItemUpdate
+
+    while time.monotonic() < deadline:
+        cid = rnd.choice(dados.contrato_ids)
+        orc = OrcamentoCreate(
+            cliente_id=dados.cliente_do_contrato[cid], tipo="CONTRATO", contrato_id=cid,
+            titulo=f"Carga {rnd.randint(1, 10**6)}",
+        )
+        r = await rec.call(c, "POST /orcamentos", "POST", P + "/orcamentos",
+                           json=orc.model_dump(mode="json", exclude_unset=True))
+        if r is None:
+            await _pausa(rnd, think_ms)
+            continue
+        oid = r.json()["data"]["id"]
+        itens: list[int] = []
+        for _ in range(rnd.randint(5, 30)):
+            if time.monotonic() >= deadline:
+                break
+            if rnd.random() < 0.7:
+                item = OrcamentoItemCreate(
+                    item_tipo="HH", maquina_id=rnd.choice(dados.maquina_ids),
+                    tipo_hh=rnd.choice(("REGULAR", "REGULAR", "EXTRA", "FERIADO")),
+                    quantidade=round(rnd.uniform(0.5, 40), 3),
+                )
+            else:
+                item = OrcamentoItemCreate(
+                    item_tipo="MATERIAL", material_id=rnd.choice(dados.material_ids),
+                    quantidade=round(rnd.uniform(1, 500), 3),
+                )
+            r = await rec.call(c, "POST /orcamentos/{id}/itens", "POST", P + f"/orcamentos/{oid}/itens",
+                               json=item.model_dump(mode="json", exclude_none=True))
+            if r is not None:
+                itens.append(r.json()["data"]["id"])
+            if itens and rnd.random() < 0.2:
+                upd = OrcamentoItemUpdate(quantidade=round(rnd.uniform(0.5, 40), 3))
+                await rec.call(c, "PUT /orcamentos/{id}/itens/{item_id}", "PUT",
+                               P + f"/orcamentos/{oid}/itens/{rnd.choice(itens)}",
+                               json=upd.model_dump(exclude_unset=True))
+            await _pausa(rnd, think_ms)
+        await rec.call(c, "GET /orcamentos/{id}/documento", "GET", P + f"/orcamentos/{oid}/documento")
+
+
+async def admin(c, rec, rnd, dados, deadline, think_ms):
+    from app.schemas.contrato_hh_preco import ContratoHHPrecoUpdate
+
+    while time.monotonic() < deadline:
+        cid = rnd.choice(dados.contrato_ids)
+        r = await rec.call(c, "GET /contratos/{id}/hh-precos", "GET", P + f"/contratos/{cid}/hh-precos",
+                           params={"size": 50})
+        precos = r.json()["data"] if r is not None else []
+        for p in rnd.sample(precos, min(3, len(precos))):
+            upd = ContratoHHPrecoUpdate(preco_hora=round(p["preco_hora"] * rnd.uniform(0.95, 1.05), 2))
+            await rec.call(c, "PUT /contratos/{id}/hh-precos/{preco_id}", "PUT",
+                           P + f"/contratos/{cid}/hh-precos/{p['id']}", json=upd.model_dump(exclude_unset=True))
+        await _pausa(rnd, think_ms * 5)  # admin mexe bem menos que os demais
+
+
+_METRIC_RE = re.compile(r'^(?P<nome>db_queries_total|db_commits_total)\{route="(?P<route>[^"]*)"\} (?P<n>[0-9.e+]+)$')
+
+
+async def _contadores_db(c) -> dict[tuple[str, str], float]:
+    """{(métrica, rota): valor} de db_queries_total/db_commits_total."""
+    r = await c.get("/metrics")
+    out = {}
+    for linha in r.text.splitlines():
+        m = _METRIC_RE.match(linha)
+        if m:
+            out[(m["nome"], m["route"])] = float(m["n"])
+    return out
+
+
+def _delta(antes: dict, depois: dict, nome: str) -> dict[str, int]:
+    return {
+        rota: int(v - antes.get((n, rota), 0))
+        for (n, rota), v in depois.items()
+        if n == nome and v - antes.get((n, rota), 0) > 0
+    }
+
+
+async def main(args) -> int:
+    if args.base_url and not args.database_url:
+        print("Com --base-url, passe --database-url (o mesmo do servidor) para o seed.", file=sys.stderr)
+        return 2
+    database_url = configure_env(args.database_url)
+    if not is_disposable(database_url) and not args.reset:
+        print("Banco não descartável: passe --reset para recriar o schema (APAGA os dados).", file=sys.stderr)
+        return 2
+
+    import httpx
+    from app.db.session import SessionLocal, engine
+    from benchmarks.common import reset_schema, seed
+
+    cfg = SeedConfig(clientes=args.clientes, contratos=args.contratos, orcamentos=args.orcamentos, seed=args.seed)
+    await reset_schema(engine)
+    dados = await seed(SessionLocal, cfg)
+    await engine.dispose()  # o servidor (ou a app em processo) abre as próprias conexões
+    print(f"seed em {dados.seconds}s")
+
+    if args.base_url:
+        def client():
+            return httpx.AsyncClient(base_url=args.base_url, timeout=30)
+        alvo = args.base_url
+    else:
+        from app.main import create_app
+        app = create_app()
+
+        def client():
+            return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://carga", timeout=30)
+        alvo = "in-process"
+
+    rec = Recorder()
+    perfis = [("VIEWER", viewer)] * args.viewers + [("OPERACAO", operador)] * args.operadores + [("ADMIN", admin)] * args.admins
+
+    async with client() as probe:
+        antes = await _contadores_db(probe)
+
+    async def vu(i, role, fn):
+        rnd = random.Random(args.seed * 1000 + i)
+        async with client() as c:
+            await _login(c, rec, *dados.users[role])
+            await fn(c, rec, rnd, dados, deadline, args.think_ms)
+
+    print(f"carga: {args.viewers} viewers, {args.operadores} operadores, {args.admins} admins "
+          f"por {args.duration}s → {alvo}")
+    inicio = time.perf_counter()
+    deadline = time.monotonic() + args.duration
+    resultados_vu = await asyncio.gather(*(vu(i, r, f) for i, (r, f) in enumerate(perfis)), return_exceptions=True)
+    elapsed = time.perf_counter() - inicio
+    falhas_vu = [repr(x) for x in resultados_vu if isinstance(x, Exception)]
+
+    async with client() as probe:
+        depois = await _contadores_db(probe)
+    queries = _delta(antes, depois, "db_queries_total")
+    commits = _delta(antes, depois, "db_commits_total")
+
+    endpoints = {label: summarize(lat, rec.err[label], elapsed) for label, lat in sorted(rec.lat.items())}
+    for label, s in endpoints.items():
+        s.pop("db_queries_per_req")
+        s["status"] = dict(rec.status[label])
+    total = sum(s["n"] for s in endpoints.values())
+    erros = sum(s["errors"] for s in endpoints.values())
+
+    print(f"\n{'endpoint':<42} {'n':>6} {'err%':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} (ms)")
+    for label, s in endpoints.items():
+        print(f"{label:<42} {s['n']:>6} {s['error_rate'] * 100:>6.2f} {s['rps']:>8} "
+              f"{s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f}")
+    print(f"\ntotal: {total} requests em {elapsed:.1f}s ({total / elapsed:.1f} req/s), "
+          f"erros {erros} ({(erros / total * 100) if total else 0:.2f}%)")
+    print(f"banco: {sum(queries.values())} queries, {sum(commits.values())} commits")
+    for rota, n in sorted(queries.items(), key=lambda x: -x[1]):
+        print(f"  {rota:<54} {n:>7} q {commits.get(rota, 0):>6} c")
+    if falhas_vu:
+        print(f"VUs que abortaram: {falhas_vu}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({
+                "benchmark": "workload",
+                "environment": {**environment_info(database_url), "target": alvo},
+                "params": {k: v for k, v in vars(args).items() if k != "out"},
+                "totals": {"requests": total, "errors": erros, "seconds": round(elapsed, 2),
+                           "db_queries": sum(queries.values()), "db_commits": sum(commits.values())},
+                "endpoints": endpoints,
+                "db_queries_by_route": queries,
+                "db_commits_by_route": commits,
+                "aborted_vus": falhas_vu,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"resultados: {args.out}")
+    return 0
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--base-url", help="servidor alvo (padrão: app em processo)")
+    p.add_argument("--database-url", help="banco a popular (padrão: SQLite temporário)")
+    p.add_argument("--reset", action="store_true", help="recria o schema (obrigatório fora do SQLite temporário)")
+    p.add_argument("--duration", type=float, default=30.0, help="segundos de carga")
+    p.add_argument("--viewers", type=int, default=20)
+    p.add_argument("--operadores", type=int, default=5)
+    p.add_argument("--admins", type=int, default=1)
+    p.add_argument("--think-ms", type=float, default=50.0, help="pausa máxima entre ações de um VU")
+    p.add_argument("--clientes", type=int, default=2000)
+    p.add_argument("--contratos", type=int, default=100)
+    p.add_argument("--orcamentos", type=int, default=300)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", help="grava o resumo em JSON")
+    return p.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,59 @@
+"""
+Fixtures comuns: SQLite num arquivo temporário e schema recriado a cada teste.
+As variáveis de ambiente precisam existir antes do primeiro import de `app`.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="usinagem-test-"), "test.db")
+os.environ.setdefault("SECRET_KEY", "test-" + "x" * 32)
+os.environ["ENV"] = "test"
+os.environ.setdefault("QUERY_RECORDER_ENABLED", "false")
+
+import pytest
+
+from app.db.session import SessionLocal, engine
+from app.models.base import Base
+import app.models  # noqa: F401  (registra todos os modelos)
+from app.repositories.user import _auth_cache
+from app.services.precos_contrato import _cache as _precos_cache
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    # ids se repetem entre testes: nada de cache de um teste no outro
+    _precos_cache.clear()
+    _auth_cache.clear()
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(schema):
+    async with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def client(schema):
+    """Cliente ASGI em processo, autenticado como ADMIN."""
+    import httpx
+    from app.main import create_app
+
+    transport = httpx.ASGITransport(app=create_app(), raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        r = await c.post("/api/v1/users", json={
+            "email": "admin@test", "full_name": "Admin", "password": "12345678", "role": "ADMIN",
+        })
+        assert r.status_code == 201, r.text
+        r = await c.post("/api/v1/auth/login", json={"email": "admin@test", "password": "12345678"})
+        c.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+        yield c
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.cursor import apply_page, decode_cursor, encode_cursor
+from app.models.cliente import Cliente
+from app.models.maquina import Maquina
+
+
+def _pagina(ordem, cursor):
+    return apply_page(select(ordem[0].class_), ordem, 0, 10, decode_cursor(cursor))
+
+
+@pytest.mark.parametrize("valores", [["abc"], [True], [1.5], [None], [[1]]])
+def test_cursor_com_tipo_errado_e_400(valores):
+    with pytest.raises(HTTPException) as e:
+        _pagina((Cliente.id,), encode_cursor(valores))
+    assert (e.value.status_code, e.value.detail) == (400, "Cursor de paginação inválido")
+
+
+def test_cursor_valido():
+    stmt = _pagina((Cliente.id,), encode_cursor([10]))
+    assert stmt.compile().params["id_1"] == 10
+    stmt = _pagina((Maquina.nome,), encode_cursor(["Torno"]))
+    assert stmt.compile().params["nome_1"] == "Torno"
+
+
+def test_cursor_de_data_volta_ao_tipo_da_coluna():
+    quando = datetime(2026, 1, 2, 3, 4, 5)
+    stmt = _pagina((Cliente.created_at,), encode_cursor([quando]))
+    assert stmt.compile().params["created_at_1"] == quando
+    with pytest.raises(HTTPException):
+        _pagina((Cliente.created_at,), encode_cursor(["ontem"]))
@@ -0,0 +1,199 @@
+import pytest
+from fastapi import HTTPException
+
+from app.repositories import contrato_hh_preco as repo_hh
+from app.services.importacao import data, ler_csv, ler_ndjson, numero
+
+pytestmark = pytest.mark.anyio
+
+P = "/api/v1"
+
+
+async def _chunks(*partes: bytes):
+    for p in partes:
+        yield p
+
+
+async def _csv(*partes: bytes) -> list:
+    return [r async for r in ler_csv(_chunks(*partes))]
+
+
+# ---- leitura (CSV) ----
+
+async def test_csv_com_virgula():
+    assert await _csv(b"Maquina, Tipo_HH ,preco_hora\nTorno,REGULAR,10\n\nFresa,,12\n") == [
+        (2, {"maquina": "Torno", "tipo_hh": "REGULAR", "preco_hora": "10"}),
+        (4, {"maquina": "Fresa", "tipo_hh": None, "preco_hora": "12"}),
+    ]
+
+
+async def test_csv_com_ponto_e_virgula_detectado_no_cabecalho():
+    assert await _csv(b"maquina;preco_hora\r\nTorno;1.234,50\r\n") == [
+        (2, {"maquina": "Torno", "preco_hora": "1.234,50"}),
+    ]
+
+
+async def test_csv_bom_e_chunks_partindo_linha_e_caractere():
+    texto = "﻿material,preco_unitario\nAço 1045,12.80\n".encode("utf-8")
+    corte = texto.index("ç".encode()) + 1  # no meio do "ç"
+    assert await _csv(texto[:corte], texto[corte:]) == [
+        (2, {"material": "Aço 1045", "preco_unitario": "12.80"}),
+    ]
+
+
+async def test_csv_campo_entre_aspas_com_quebra_de_linha():
+    linhas = await _csv(b'maquina,descricao\n"Torno","linha 1\nlinha 2"\nFresa,x\n')
+    assert linhas == [
+        (2, {"maquina": "Torno", "descricao": "linha 1\nlinha 2"}),
+        (4, {"maquina": "Fresa", "descricao": "x"}),
+    ]
+
+
+async def test_csv_aspas_nao_fechadas_e_422():
+    with pytest.raises(HTTPException) as e:
+        await _csv(b'maquina,descricao\nTorno,ok\nFresa,"sem fim\noutra\n')
+    assert e.value.status_code == 422
+    assert e.value.detail == "Aspas não fechadas a partir da linha 3."
+
+
+async def test_csv_fora_de_utf8_e_422():
+    with pytest.raises(HTTPException) as e:
+        await _csv(b"maquina\nM\xe1quina\n")
+    assert e.value.status_code == 422
+
+
+# ---- leitura (NDJSON) ----
+
+async def _ndjson(*partes: bytes) -> list:
+    return [r async for r in ler_ndjson(_chunks(*partes))]
+
+
+async def test_ndjson_valores_viram_texto():
+    linhas = await _ndjson(
+        b'{"Material_ID": 7, "preco_unitario": 12.8, "ativo": true}\n',
+        b'\n{"material": " A\\u00e7o ", "uom": "", "valido_ate": null}\n',
+    )
+    assert linhas == [
+        (1, {"material_id": "7", "preco_unitario": "12.8", "ativo": "True"}),
+        (3, {"material": "Aço", "uom": None, "valido_ate": None}),
+    ]
+
+
+@pytest.mark.parametrize("corpo, msg", [
+    (b'{"material_id": 1}\n[1, 2]\n', "Linha 2: esperado um objeto JSON."),
+    (b'{"material_id": 1}\n{"material_id": \n', "JSON inválido na linha 2."),
+])
+async def test_ndjson_linha_invalida_e_422(corpo, msg):
+    with pytest.raises(HTTPException) as e:
+        await _ndjson(corpo)
+    assert (e.value.status_code, e.value.detail) == (422, msg)
+
+
+# ---- normalização ----
+
+@pytest.mark.parametrize("entrada, saida", [
+    ("1234.5", "1234.5"),
+    ("1234,5", "1234.5"),
+    ("1.234,50", "1234.50"),
+    ("1,234.50", "1234.50"),
+    ("1 234,50", "1234.50"),
+    (None, None),
+])
+def test_numero(entrada, saida):
+    assert numero(entrada) == saida
+
+
+@pytest.mark.parametrize("entrada, saida", [
+    ("2026-01-02", "2026-01-02"),
+    ("02/01/2026", "2026-01-02"),
+    ("2/1/2026", "2026-01-02"),
+    (None, None),
+])
+def test_data(entrada, saida):
+    assert data(entrada) == saida
+
+
+# ---- colunas obrigatórias (checadas no primeiro registro) ----
+
+async def _registros(*regs):
+    for n, reg in enumerate(regs, start=2):
+        yield n, reg
+
+
+@pytest.mark.parametrize("reg, faltando", [
+    ({"tipo_hh": "REGULAR", "preco_hora": "1"}, "maquina (ou maquina_id)"),
+    ({"maquina_id": "1", "tipo_hh": "REGULAR"}, "preco_hora"),
+    ({"maquina": "Torno"}, "tipo_hh, preco_hora"),
+])
+async def test_colunas_obrigatorias(db, reg, faltando):
+    with pytest.raises(HTTPException) as e:
+        await repo_hh.importar(db, 1, _registros(reg))
+    assert e.value.status_code == 422
+    assert e.value.detail == f"Campos obrigatórios ausentes: {faltando}."
+
+
+# ---- ida e volta HTTP ----
+
+async def test_importacao_hh_http(client):
+    h = (await client.post(P + "/unidades-medida", json={"nome": "Hora", "simbolo": "h"})).json()["data"]["id"]
+    cli = (await client.post(P + "/clientes", json={"nome": "Cli"})).json()["id"]
+    await client.post(P + "/maquinas", json={"nome": "Torno", "uom_hh_id": h})
+    maq = (await client.post(P + "/maquinas", json={"nome": "Fresa", "uom_hh_id": h})).json()["data"]["id"]
+    ctr = (await client.post(P + "/contratos", json={"cliente_id": cli, "hh_regular_default": 100})).json()["data"]["id"]
+    url = P + f"/contratos/{ctr}/hh-precos:import"
+    csv_ = {"Content-Type": "text/csv"}
+
+    async def preview():
+        r = await client.get(P + f"/contratos/{ctr}/precos/hh", params={"maquina_id": maq, "tipo_hh": "REGULAR"})
+        return r.json()["data"]["preco"], r.json()["data"]["fonte"]
+
+    assert await preview() == (100.0, "default")  # fica no cache
+
+    r = await client.post(url, content="maquina;tipo_hh;preco_hora\nfresa;regular;1.234,50\n", headers=csv_)
+    assert r.status_code == 200, r.text
+    assert r.json()["data"] == {"recebidos": 1, "inseridos": 1, "atualizados": 0, "rejeitados": 0, "erros": []}
+    assert await preview() == (1234.5, "especifico")  # cache invalidado após o commit
+
+    r = await client.post(url, content=f"maquina_id,tipo_hh,preco_hora\n{maq},REGULAR,150\n", headers=csv_)
+    assert (r.json()["data"]["inseridos"], r.json()["data"]["atualizados"]) == (0, 1)
+    assert await preview() == (150.0, "especifico")
+
+    # atomico: a linha inválida desfaz também a válida
+    r = await client.post(
+        url, params={"atomico": "true"}, headers=csv_,
+        content="maquina,tipo_hh,preco_hora\nFresa,EXTRA,200\nInexistente,REGULAR,1\n",
+    )
+    assert r.status_code == 422
+    assert r.json()["errors"] == [{"linha": 3, "message": "Máquina não encontrada: Inexistente."}]
+    r = await client.get(P + f"/contratos/{ctr}/hh-precos")
+    assert [(p["tipo_hh"], p["preco_hora"]) for p in r.json()["data"]] == [("REGULAR", 150.0)]
+
+    # sem atomico: grava as válidas e lista as rejeitadas
+    r = await client.post(url, headers=csv_, content="maquina,tipo_hh,preco_hora\nFresa,EXTRA,200\nFresa,XPTO,1\n")
+    assert r.status_code == 200
+    assert (r.json()["data"]["inseridos"], r.json()["data"]["rejeitados"]) == (1, 1)
+
+
+async def test_importacao_material_ndjson_http(client):
+    kg = (await client.post(P + "/unidades-medida", json={"nome": "Quilo", "simbolo": "kg"})).json()["data"]["id"]
+    cli = (await client.post(P + "/clientes", json={"nome": "Cli"})).json()["id"]
+    mat = (await client.post(P + "/materiais", json={"nome": "Aço", "uom_base_id": kg})).json()["data"]["id"]
+    ctr = (await client.post(P + "/contratos", json={"cliente_id": cli, "material_kg_default": 5})).json()["data"]["id"]
+
+    r = await client.post(
+        P + f"/contratos/{ctr}/material-precos:import",
+        headers={"Content-Type": "application/x-ndjson"},
+        content=f'{{"material_id": {mat}, "preco_unitario": 12.8, "valido_de": "01/01/2020"}}\n'
+                '{"material_id": 999, "preco_unitario": 1}\n',
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["data"]["inseridos"] == 1
+    assert r.json()["data"]["erros"] == [{"linha": 2, "message": "Material não encontrado: 999."}]
+    r = await client.get(P + f"/contratos/{ctr}/precos/material", params={"material_id": mat})
+    assert (r.json()["data"]["preco"], r.json()["data"]["uom_id"]) == (12.8, kg)
+
+    # NDJSON só onde a rota aceita: a tabela de HH é só CSV
+    r = await client.post(
+        P + f"/contratos/{ctr}/hh-precos:import", headers={"Content-Type": "application/x-ndjson"}, content="{}\n",
+    )
+    assert r.status_code == 415
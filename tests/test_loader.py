@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from app.db.session import SessionLocal
+from app.models.cliente import Cliente
+from app.repositories.loader import get_loader
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def clientes(schema):
+    async with SessionLocal() as s:
+        s.add_all(Cliente(nome=f"Cli {i}") for i in range(1, 4))
+        await s.commit()
+
+
+async def test_loads_no_mesmo_tick_saem_em_uma_query(clientes):
+    async with SessionLocal() as db:
+        loader = get_loader(db)
+        objs = await asyncio.gather(*(loader.load(Cliente, i) for i in (1, 2, 3, 99)))
+        assert [o and o.nome for o in objs] == ["Cli 1", "Cli 2", "Cli 3", None]
+        assert loader.queries == 1
+        assert await loader.load_many(Cliente, [3, 1, 99]) == {3: objs[2], 1: objs[0]}
+        assert loader.queries == 1  # tudo do cache
+
+
+async def test_load_sozinho_nao_cria_task(clientes, monkeypatch):
+    async with SessionLocal() as db:
+        loop = asyncio.get_running_loop()
+        criar = loop.create_task
+        tasks = []
+        monkeypatch.setattr(loop, "create_task", lambda *a, **k: tasks.append(1) or criar(*a, **k))
+        assert (await get_loader(db).load(Cliente, 2)).nome == "Cli 2"
+        assert tasks == []
+
+
+@pytest.mark.parametrize("ticks", range(6))
+async def test_cancelar_durante_a_busca_nao_deixa_a_sessao_em_uso(clientes, ticks):
+    antes = asyncio.all_tasks()
+    async with SessionLocal() as db:
+        t = asyncio.create_task(get_loader(db).load(Cliente, 1))
+        for _ in range(ticks):  # cancela em pontos diferentes da busca
+            await asyncio.sleep(0)
+        t.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await t
+    # sair do "async with" fechou a sessão sem IllegalStateChangeError e
+    # nenhuma task ficou usando a sessão
+    assert asyncio.all_tasks() <= antes
+
+
+async def test_quem_drena_cancelado_passa_a_vez(clientes):
+    async with SessionLocal() as db:
+        loader = get_loader(db)
+        primeiro = asyncio.create_task(loader.load(Cliente, 1))
+        segundo = asyncio.create_task(loader.load(Cliente, 2))
+        await asyncio.sleep(0)  # ambos enfileirados; o primeiro está drenando
+        primeiro.cancel()
+        assert (await segundo).nome == "Cli 2"
+        with pytest.raises(asyncio.CancelledError):
+            await primeiro
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from app.api.v1.endpoints import health
+from app.core.loop_lag import LoopLagMonitor, monitor
+
+pytestmark = pytest.mark.anyio
+
+INTERVALO = 0.01
+
+
+async def _bloquear(vezes: int, segundos: float = 0.25) -> None:
+    """Bloqueia o loop `vezes` vezes, deixando o monitor amostrar entre elas."""
+    for _ in range(vezes):
+        time.sleep(segundos)
+        await asyncio.sleep(INTERVALO * 3)
+
+
+async def test_bloqueio_entre_amostras_fica_registrado():
+    m = LoopLagMonitor(intervalo=INTERVALO, n=50)
+    m.iniciar()
+    try:
+        await asyncio.sleep(INTERVALO * 5)
+        assert m.acima(100) == 0
+        await _bloquear(1)
+        # o bloqueio já passou, mas continua nas amostras
+        assert m.max_recente() >= 200
+        assert m.acima(200) == 1
+    finally:
+        await m.parar()
+
+
+async def test_amostras_antigas_saem():
+    m = LoopLagMonitor(intervalo=INTERVALO, n=5)
+    m.iniciar()
+    try:
+        await asyncio.sleep(INTERVALO * 2)
+        await _bloquear(1, 0.15)
+        assert m.acima(100) == 1
+        await asyncio.sleep(INTERVALO * 20)
+        assert m.acima(100) == 0
+    finally:
+        await m.parar()
+
+
+@pytest.fixture
+async def monitor_rapido(schema, monkeypatch):
+    monkeypatch.setattr(monitor, "intervalo", INTERVALO)
+    monkeypatch.setattr(health.settings, "READY_LOOP_LAG_MS_MAX", 200.0)
+    monkeypatch.setattr(health.settings, "READY_LOOP_LAG_SUSTAINED", 3)
+    monitor.iniciar()
+    await asyncio.sleep(INTERVALO * 5)
+    yield
+    await monitor.parar()
+
+
+async def test_pico_isolado_nao_reprova_readiness(monitor_rapido):
+    await _bloquear(1)
+    status_code, corpo = await health._run_ready_checks()
+    assert status_code == 200, corpo["reasons"]
+    assert corpo["checks"]["loop_lag_ms"] >= 200  # visível, mas não decisivo
+    assert corpo["checks"]["loop_lag_samples_over_limit"] == 1
+
+
+async def test_lag_sustentado_reprova_readiness(monitor_rapido):
+    await _bloquear(3)
+    status_code, corpo = await health._run_ready_checks()
+    assert status_code == 503
+    assert corpo["checks"]["loop_lag_samples_over_limit"] == 3
+    assert any(m.startswith("event loop:") for m in corpo["reasons"])
@@ -0,0 +1,58 @@
+import re
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+P = "/api/v1"
+_LINHA = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+
+async def _metricas(client) -> dict:
+    """{(nome, frozenset(labels)): valor} do /metrics."""
+    r = await client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    out = {}
+    for linha in r.text.splitlines():
+        m = _LINHA.match(linha)
+        if m:
+            labels = frozenset(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', m.group(2)))
+            out[(m.group(1), labels)] = float(m.group(3))
+    return out
+
+
+def _valor(metricas: dict, nome: str, **labels) -> float:
+    return metricas.get((nome, frozenset((k, str(v)) for k, v in labels.items())), 0.0)
+
+
+async def test_requests_rotulados_pelo_template_da_rota(client):
+    cli = (await client.post(P + "/clientes", json={"nome": "Cli"})).json()["id"]
+    antes = await _metricas(client)
+    ids = []
+    for _ in range(2):
+        ids.append((await client.post(P + "/orcamentos", json={"cliente_id": cli})).json()["data"]["id"])
+    for oid in ids:
+        assert (await client.get(P + f"/orcamentos/{oid}")).status_code == 200
+    await client.get(P + "/orcamentos/999999")
+    depois = await _metricas(client)
+
+    rota = "/api/v1/orcamentos/{orcamento_id}"
+    get_ok = dict(method="GET", route=rota, status=200)
+    assert _valor(depois, "http_requests_total", **get_ok) - _valor(antes, "http_requests_total", **get_ok) == 2
+    get_404 = dict(method="GET", route=rota, status=404)
+    assert _valor(depois, "http_requests_total", **get_404) - _valor(antes, "http_requests_total", **get_404) == 1
+    # o path cru nunca vira label (cardinalidade)
+    assert not any(("route", f"/api/v1/orcamentos/{oid}") in labels for _, labels in depois for oid in ids)
+    assert _valor(depois, "http_request_duration_seconds_count", method="GET", route=rota) >= 3
+
+
+async def test_escrita_conta_queries_e_commit_da_rota(client):
+    rota = "/api/v1/clientes"
+    antes = await _metricas(client)
+    assert (await client.post(P + "/clientes", json={"nome": "Cli"})).status_code == 201
+    depois = await _metricas(client)
+
+    assert _valor(depois, "db_commits_total", route=rota) - _valor(antes, "db_commits_total", route=rota) == 1
+    assert _valor(depois, "db_queries_total", route=rota) - _valor(antes, "db_queries_total", route=rota) >= 1
+    assert _valor(depois, "db_query_seconds_total", route=rota) > _valor(antes, "db_query_seconds_total", route=rota)
@@ -0,0 +1,45 @@
+import pytest
+
+from app.main import create_app
+from app.schemas.orcamento import OrcamentoDocumentoResposta
+
+pytestmark = pytest.mark.anyio
+
+P = "/api/v1"
+
+
+def test_openapi_declara_os_dois_formatos():
+    paths = create_app().openapi()["paths"]
+    ok = paths["/api/v1/orcamentos/{orcamento_id}"]["get"]["responses"]["200"]
+    assert ok["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/OrcamentoOut"}
+    doc = paths["/api/v1/orcamentos/{orcamento_id}/documento"]["get"]["responses"]["200"]
+    assert doc["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/OrcamentoDocumentoResposta"}
+
+
+async def test_um_formato_por_url(client):
+    h = (await client.post(P + "/unidades-medida", json={"nome": "Hora", "simbolo": "h"})).json()["data"]["id"]
+    cli = (await client.post(P + "/clientes", json={"nome": "Cli"})).json()["id"]
+    maq = (await client.post(P + "/maquinas", json={"nome": "Torno", "uom_hh_id": h})).json()["data"]["id"]
+    orc = (await client.post(P + "/orcamentos", json={"cliente_id": cli})).json()["data"]["id"]
+    await client.post(P + f"/orcamentos/{orc}/itens", json={
+        "item_tipo": "LIVRE", "descricao": "Usinagem", "quantidade": 2, "preco_unitario": 10, "maquina_id": maq,
+    })
+
+    r = await client.get(P + f"/orcamentos/{orc}", params={"expand": "itens"})
+    assert r.status_code == 200
+    assert r.json()["id"] == orc and "itens" not in r.json()  # sem envelope, expand ignorado
+
+    r = await client.get(P + f"/orcamentos/{orc}/documento")
+    corpo = r.json()
+    assert r.status_code == 200 and corpo["success"]
+    assert corpo["data"]["id"] == orc and corpo["data"]["cliente"]["nome"] == "Cli"
+    assert [i["total_item"] for i in corpo["data"]["itens"]] == [20.0]
+    OrcamentoDocumentoResposta.model_validate(corpo)  # o corpo bate com o schema anunciado
+    assert corpo["meta"]["expand"] == sorted(["itens", "maquinas", "materiais", "uoms", "cliente", "contrato"])
+
+    r = await client.get(P + f"/orcamentos/{orc}/documento", params={"expand": "cliente"})
+    assert set(r.json()["data"]) >= {"cliente"} and "itens" not in r.json()["data"]
+    r = await client.get(P + f"/orcamentos/{orc}/documento", params={"expand": "foo"})
+    assert r.status_code == 422
+    r = await client.get(P + "/orcamentos/999/documento")
+    assert r.status_code == 404
@@ -0,0 +1,89 @@
+import json
+import logging
+
+import httpx
+import pytest
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import query_recorder
+from app.deps.db import get_db
+from app.models.cliente import Cliente
+
+pytestmark = pytest.mark.anyio
+
+P = "/api/v1"
+
+
+@pytest.fixture
+def recorder(monkeypatch, caplog):
+    """Liga o gravador com só os limites que cada teste define."""
+    s = query_recorder.settings
+    for nome, valor in {
+        "QUERY_RECORDER_ENABLED": True,
+        "QUERY_BUDGET_COUNT": 0,
+        "QUERY_BUDGET_MS": 0,
+        "SLOW_QUERY_MS": 0,
+        "N_PLUS_ONE_MIN_REPEATS": 0,
+    }.items():
+        monkeypatch.setattr(s, nome, valor)
+    caplog.set_level(logging.WARNING, logger="usinagem.queries")
+    return s
+
+
+@pytest.fixture
+async def client_n1(schema):
+    """App com uma rota que busca cliente a cliente (N+1 de propósito)."""
+    from app.main import create_app
+
+    app = create_app()
+
+    @app.get("/_teste/n1")
+    async def um_a_um(db: AsyncSession = Depends(get_db)):
+        for i in range(1, 7):
+            await db.execute(select(Cliente).where(Cliente.id == i))
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+def _eventos(caplog) -> list[dict]:
+    return [json.loads(r.getMessage()) for r in caplog.records if r.name == "usinagem.queries"]
+
+
+async def test_loga_request_acima_do_orcamento(client, recorder, monkeypatch, caplog):
+    monkeypatch.setattr(recorder, "QUERY_BUDGET_COUNT", 1)
+    r = await client.post(P + "/clientes", json={"nome": "Cli"}, headers={"X-Request-Id": "req-orcamento"})
+    assert r.status_code == 201
+
+    (ev,) = [e for e in _eventos(caplog) if e["request_id"] == "req-orcamento"]
+    assert ev["event"] == "query_budget"
+    assert ev["problems"] == ["query_count"]
+    assert ev["method"] == "POST" and ev["route"] == "/api/v1/clientes"
+    assert ev["queries"] > ev["budget"]["queries"] == 1
+
+
+async def test_loga_candidato_n_mais_um(client_n1, recorder, monkeypatch, caplog):
+    monkeypatch.setattr(recorder, "N_PLUS_ONE_MIN_REPEATS", 5)
+    r = await client_n1.get("/_teste/n1", headers={"X-Request-Id": "req-n1"})
+    assert r.status_code == 200
+
+    (ev,) = _eventos(caplog)
+    assert ev["problems"] == ["n_plus_one"]
+    assert ev["request_id"] == "req-n1" and ev["route"] == "/_teste/n1"
+    (cand,) = ev["n_plus_one"]
+    assert cand["executions"] == 6
+    assert "FROM clientes" in cand["sql"]
+
+
+async def test_desligado_nao_loga(client, client_n1, recorder, monkeypatch, caplog):
+    monkeypatch.setattr(recorder, "QUERY_BUDGET_COUNT", 1)
+    monkeypatch.setattr(recorder, "N_PLUS_ONE_MIN_REPEATS", 5)
+    monkeypatch.setattr(recorder, "QUERY_RECORDER_ENABLED", False)
+
+    assert (await client.post(P + "/clientes", json={"nome": "Cli"})).status_code == 201
+    assert (await client_n1.get("/_teste/n1")).status_code == 200
+    assert _eventos(caplog) == []
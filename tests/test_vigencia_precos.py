@@ -0,0 +1,122 @@
+"""
+Vigência dos preços de contrato: um preço temporário só vale no seu intervalo;
+antes e depois dele volta o preço permanente (não o default do contrato).
+O mesmo vale para a resolução em memória (Vigencias/cache) e em SQL
+(reprecificação e clone com reprecificar).
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.models.cliente import Cliente
+from app.models.contrato import Contrato
+from app.models.contrato_hh_preco import ContratoHHPreco, VIGENCIA_INICIAL
+from app.models.contrato_material_preco import ContratoMaterialPreco
+from app.models.maquina import Maquina
+from app.models.material import Material
+from app.models.orcamento import Orcamento
+from app.models.orcamento_item import OrcamentoItem
+from app.models.unidade_medida import UnidadeMedida
+from app.repositories import orcamento as repo_orcamento
+from app.schemas.orcamento import OrcamentoCloneInput
+from app.services.precos_contrato import Vigencias, resolve_preco_hh, resolve_preco_material
+from app.services.reprecificacao import reprecificar
+
+pytestmark = pytest.mark.anyio
+
+ANTES, DURANTE, DEPOIS = date(2019, 6, 1), date(2020, 6, 1), date(2021, 6, 1)
+
+
+def test_vigencias_volta_ao_permanente_depois_do_temporario():
+    v = Vigencias([
+        (VIGENCIA_INICIAL, None, 133.88, 1),
+        (date(2020, 1, 1), date(2020, 12, 31), 777.0, 1),
+    ])
+    assert v.em(ANTES) == (133.88, 1)
+    assert v.em(DURANTE) == (777.0, 1)
+    assert v.em(date(2020, 12, 31)) == (777.0, 1)
+    assert v.em(DEPOIS) == (133.88, 1)
+    assert v.em(date(1899, 12, 31)) is None
+
+
+def test_vigencias_sem_registro_cobrindo_a_data():
+    v = Vigencias([
+        (date(2020, 1, 1), date(2020, 12, 31), 100.0, 1),
+        (date(2022, 1, 1), None, 120.0, 1),
+    ])
+    assert v.em(DEPOIS) is None
+    assert v.em(date(2022, 1, 1)) == (120.0, 1)
+
+
+@pytest.fixture
+async def contrato(db):
+    h = UnidadeMedida(nome="Hora", simbolo="h")
+    kg = UnidadeMedida(nome="Quilo", simbolo="kg")
+    db.add_all([h, kg])
+    await db.flush()
+    cli = Cliente(nome="Cli")
+    maq = Maquina(nome="Torno", uom_hh_id=h.id)
+    mat = Material(nome="Aço", uom_base_id=kg.id)
+    db.add_all([cli, maq, mat])
+    await db.flush()
+    ctr = Contrato(cliente_id=cli.id, hh_regular_default=200, material_kg_default=5)
+    db.add(ctr)
+    await db.flush()
+    db.add_all([
+        ContratoHHPreco(contrato_id=ctr.id, maquina_id=maq.id, tipo_hh="REGULAR", uom_id=h.id, preco_hora=133.88),
+        ContratoHHPreco(
+            contrato_id=ctr.id, maquina_id=maq.id, tipo_hh="REGULAR", uom_id=h.id, preco_hora=777,
+            valido_de=date(2020, 1, 1), valido_ate=date(2020, 12, 31),
+        ),
+        ContratoMaterialPreco(contrato_id=ctr.id, material_id=mat.id, uom_id=kg.id, preco_unitario=8),
+        ContratoMaterialPreco(
+            contrato_id=ctr.id, material_id=mat.id, uom_id=kg.id, preco_unitario=9,
+            valido_de=date(2020, 1, 1), valido_ate=date(2020, 12, 31),
+        ),
+    ])
+    orc = Orcamento(cliente_id=cli.id, tipo="CONTRATO", status="RASCUNHO", contrato_id=ctr.id)
+    db.add(orc)
+    await db.flush()
+    db.add_all([
+        OrcamentoItem(orcamento_id=orc.id, item_tipo="HH", maquina_id=maq.id, tipo_hh="REGULAR",
+                      quantidade=1, preco_unitario=1, total_item=1),
+        OrcamentoItem(orcamento_id=orc.id, item_tipo="MATERIAL", material_id=mat.id,
+                      quantidade=1, preco_unitario=1, total_item=1),
+    ])
+    await db.commit()
+    return {"contrato": ctr.id, "maquina": maq.id, "material": mat.id, "orcamento": orc.id}
+
+
+async def _precos_itens(db, orcamento_id: int) -> list[float]:
+    res = await db.execute(
+        select(OrcamentoItem.preco_unitario)
+        .where(OrcamentoItem.orcamento_id == orcamento_id)
+        .order_by(OrcamentoItem.id)
+    )
+    return [float(p) for p in res.scalars()]
+
+
+@pytest.mark.parametrize("as_of, hh, material", [(ANTES, 133.88, 8), (DURANTE, 777, 9), (DEPOIS, 133.88, 8)])
+async def test_resolve_em_memoria(db, contrato, as_of, hh, material):
+    r = await resolve_preco_hh(db, contrato["contrato"], contrato["maquina"], "REGULAR", as_of=as_of)
+    assert (r["preco"], r["fonte"]) == (hh, "especifico")
+    r = await resolve_preco_material(db, contrato["contrato"], contrato["material"], as_of=as_of)
+    assert (r["preco"], r["fonte"]) == (material, "especifico")
+
+
+@pytest.mark.parametrize("as_of, hh, material", [(ANTES, 133.88, 8), (DURANTE, 777, 9), (DEPOIS, 133.88, 8)])
+async def test_reprecificacao_em_sql(db, contrato, as_of, hh, material):
+    res = await reprecificar(db, contrato["contrato"], as_of=as_of)
+    await db.commit()
+    assert res["itens_alterados"] == 2
+    assert await _precos_itens(db, contrato["orcamento"]) == [hh, material]
+
+
+@pytest.mark.parametrize("as_of, hh, material", [(DURANTE, 777, 9), (DEPOIS, 133.88, 8)])
+async def test_clone_reprecificado_em_sql(db, contrato, as_of, hh, material):
+    res = await repo_orcamento.clonar(
+        db, contrato["orcamento"], OrcamentoCloneInput(reprecificar=True, as_of=as_of)
+    )
+    await db.commit()
+    assert await _precos_itens(db, res["orcamento"].id) == [hh, material]